@@ -0,0 +1,29 @@
+"""add status to alert sync logs
+
+Revision ID: 20261018001
+Revises: 20250530001
+Create Date: 2026-10-18 00:01:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018001'
+down_revision = '20250530001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    sync_status = sa.Enum('COMPLETED', 'NOT_MODIFIED', name='syncstatus')
+    sync_status.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'alert_sync_logs',
+        sa.Column('status', sync_status, nullable=False, server_default='COMPLETED')
+    )
+
+
+def downgrade():
+    op.drop_column('alert_sync_logs', 'status')
+    op.execute('DROP TYPE syncstatus')
@@ -0,0 +1,28 @@
+"""add fetch failed status and error message to alert sync logs
+
+Revision ID: 20261018002
+Revises: 20261018001
+Create Date: 2026-10-18 00:02:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018002'
+down_revision = '20261018001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD VALUE cannot be used inside the migration transaction on older PostgreSQL
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE syncstatus ADD VALUE IF NOT EXISTS 'FETCH_FAILED'")
+    op.add_column('alert_sync_logs', sa.Column('error_message', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('alert_sync_logs', 'error_message')
+    # PostgreSQL cannot drop an enum value; move rows off it and leave the type as is
+    op.execute("UPDATE alert_sync_logs SET status = 'COMPLETED' WHERE status = 'FETCH_FAILED'")
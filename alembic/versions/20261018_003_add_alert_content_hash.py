@@ -0,0 +1,28 @@
+"""add content hash to alerts and update counters to alert sync logs
+
+Revision ID: 20261018003
+Revises: 20261018002
+Create Date: 2026-10-18 00:03:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018003'
+down_revision = '20261018002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing alerts have no hash yet; they are treated as changed once and get one
+    op.add_column('alerts', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('alert_sync_logs', sa.Column('updated_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('alert_sync_logs', sa.Column('unchanged_count', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('alert_sync_logs', 'unchanged_count')
+    op.drop_column('alert_sync_logs', 'updated_count')
+    op.drop_column('alerts', 'content_hash')
@@ -0,0 +1,29 @@
+"""add stage timings and throughput to alert sync logs
+
+Revision ID: 20261018004
+Revises: 20261018003
+Create Date: 2026-10-18 00:04:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018004'
+down_revision = '20261018003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alert_sync_logs', sa.Column('duration_ms', sa.Float(), nullable=True))
+    op.add_column('alert_sync_logs', sa.Column('stage_timings', sa.JSON(), nullable=True))
+    op.add_column('alert_sync_logs', sa.Column('rows_written', sa.JSON(), nullable=True))
+    op.add_column('alert_sync_logs', sa.Column('statement_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('alert_sync_logs', 'statement_count')
+    op.drop_column('alert_sync_logs', 'rows_written')
+    op.drop_column('alert_sync_logs', 'stage_timings')
+    op.drop_column('alert_sync_logs', 'duration_ms')
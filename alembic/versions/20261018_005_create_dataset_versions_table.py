@@ -0,0 +1,32 @@
+"""create dataset_versions table
+
+Revision ID: 20261018005
+Revises: 20261018004
+Create Date: 2026-10-18 00:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+# revision identifiers, used by Alembic.
+revision = '20261018005'
+down_revision = '20261018004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'dataset_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Existing imports count as the first version of the zipcode dataset
+    op.execute("INSERT INTO dataset_versions (name, version) VALUES ('zipcode_dataset', 1)")
+
+
+def downgrade():
+    op.drop_table('dataset_versions')
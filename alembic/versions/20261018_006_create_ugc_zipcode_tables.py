@@ -0,0 +1,49 @@
+"""create nws_zone_counties and ugc_zipcodes tables
+
+Revision ID: 20261018006
+Revises: 20261018005
+Create Date: 2026-10-18 00:06:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018006'
+down_revision = '20261018005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'nws_zone_counties',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ugc_code', sa.String(10), nullable=False),
+        sa.Column('state_code', sa.String(2), nullable=False),
+        sa.Column('zone_name', sa.String(100), nullable=True),
+        sa.Column('county_fips', sa.String(5), nullable=False),
+        sa.Column('county_name', sa.String(100), nullable=True),
+        sa.Column('cwa', sa.String(10), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ugc_code', 'county_fips', name='uq_nws_zone_counties_ugc_county')
+    )
+    op.create_index(op.f('ix_nws_zone_counties_id'), 'nws_zone_counties', ['id'], unique=False)
+    op.create_index(op.f('ix_nws_zone_counties_ugc_code'), 'nws_zone_counties', ['ugc_code'], unique=False)
+    op.create_index(op.f('ix_nws_zone_counties_county_fips'), 'nws_zone_counties', ['county_fips'], unique=False)
+
+    # The primary key (ugc_code, zip) is the index ingestion reads through
+    op.create_table(
+        'ugc_zipcodes',
+        sa.Column('ugc_code', sa.String(10), nullable=False),
+        sa.Column('zip', sa.String(10), nullable=False),
+        sa.PrimaryKeyConstraint('ugc_code', 'zip')
+    )
+
+
+def downgrade():
+    op.drop_table('ugc_zipcodes')
+    op.drop_index(op.f('ix_nws_zone_counties_county_fips'), table_name='nws_zone_counties')
+    op.drop_index(op.f('ix_nws_zone_counties_ugc_code'), table_name='nws_zone_counties')
+    op.drop_index(op.f('ix_nws_zone_counties_id'), table_name='nws_zone_counties')
+    op.drop_table('nws_zone_counties')
@@ -0,0 +1,57 @@
+"""create county_zipcodes table and add weight to ugc_zipcodes
+
+Revision ID: 20261018007
+Revises: 20261018006
+Create Date: 2026-10-18 00:07:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018007'
+down_revision = '20261018006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'county_zipcodes',
+        sa.Column('county_fips', sa.String(5), nullable=False),
+        sa.Column('zip', sa.String(10), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('county_fips', 'zip')
+    )
+    op.create_index(op.f('ix_county_zipcodes_zip'), 'county_zipcodes', ['zip'], unique=False)
+    op.add_column('ugc_zipcodes', sa.Column('weight', sa.Float(), nullable=True))
+
+    # Index the zip codes already imported; county_weights holds percentages per county
+    op.execute("""
+        INSERT INTO county_zipcodes (county_fips, zip, weight)
+        SELECT DISTINCT ON (c.county_fips, d.zip)
+            c.county_fips,
+            d.zip,
+            COALESCE(
+                (d.county_weights::jsonb ->> c.county_fips)::float / 100,
+                1.0 / array_length(string_to_array(d.county_fips_all, '|'), 1)
+            )
+        FROM zipcode_dataset d
+        CROSS JOIN LATERAL unnest(string_to_array(d.county_fips_all, '|')) AS c(county_fips)
+        WHERE length(c.county_fips) = 5
+        ORDER BY c.county_fips, d.zip
+    """)
+    # Zip codes without county_fips_all keep their primary county
+    op.execute("""
+        INSERT INTO county_zipcodes (county_fips, zip, weight)
+        SELECT DISTINCT d.county_fips, d.zip, 1.0
+        FROM zipcode_dataset d
+        WHERE length(d.county_fips) = 5
+          AND NOT EXISTS (SELECT 1 FROM county_zipcodes c WHERE c.zip = d.zip)
+    """)
+
+
+def downgrade():
+    op.drop_column('ugc_zipcodes', 'weight')
+    op.drop_index(op.f('ix_county_zipcodes_zip'), table_name='county_zipcodes')
+    op.drop_table('county_zipcodes')
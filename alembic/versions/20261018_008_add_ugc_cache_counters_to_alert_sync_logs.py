@@ -0,0 +1,25 @@
+"""add UGC resolution cache counters to alert sync logs
+
+Revision ID: 20261018008
+Revises: 20261018007
+Create Date: 2026-10-18 00:08:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018008'
+down_revision = '20261018007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alert_sync_logs', sa.Column('ugc_cache_hits', sa.Integer(), nullable=True))
+    op.add_column('alert_sync_logs', sa.Column('ugc_cache_misses', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('alert_sync_logs', 'ugc_cache_misses')
+    op.drop_column('alert_sync_logs', 'ugc_cache_hits')
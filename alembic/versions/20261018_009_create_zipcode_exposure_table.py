@@ -0,0 +1,95 @@
+"""create zipcode_exposure table maintained by policyholder triggers
+
+Revision ID: 20261018009
+Revises: 20261018008
+Create Date: 2026-10-18 00:09:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018009'
+down_revision = '20261018008'
+branch_labels = None
+depends_on = None
+
+# Adds the signed per-zipcode deltas of a statement to zipcode_exposure; updates that
+# leave the totals unchanged (name, address, ...) write nothing
+UPSERT_DELTAS = """
+        INSERT INTO zipcode_exposure (zipcode_id, policyholder_count, total_premium, total_claims, updated_at)
+        SELECT zipcode_id, sum(direction), sum(direction * coalesce(premium, 0)), sum(direction * coalesce(claims, 0)), now()
+        FROM ({rows}) AS delta
+        GROUP BY zipcode_id
+        HAVING sum(direction) <> 0 OR sum(direction * coalesce(premium, 0)) <> 0 OR sum(direction * coalesce(claims, 0)) <> 0
+        ON CONFLICT (zipcode_id) DO UPDATE SET
+            policyholder_count = zipcode_exposure.policyholder_count + EXCLUDED.policyholder_count,
+            total_premium = zipcode_exposure.total_premium + EXCLUDED.total_premium,
+            total_claims = zipcode_exposure.total_claims + EXCLUDED.total_claims,
+            updated_at = now();
+"""
+NEW_ROWS = "SELECT zipcode_id, 1 AS direction, premium, claims FROM new_rows WHERE status IS TRUE"
+OLD_ROWS = "SELECT zipcode_id, -1 AS direction, premium, claims FROM old_rows WHERE status IS TRUE"
+
+
+def upgrade():
+    op.create_table(
+        'zipcode_exposure',
+        sa.Column('zipcode_id', sa.Integer(), nullable=False),
+        sa.Column('policyholder_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_premium', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('total_claims', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['zipcode_id'], ['zipcodes.id'], ),
+        sa.PrimaryKeyConstraint('zipcode_id')
+    )
+
+    # Statement-level triggers see every row of a multi-row INSERT/COPY/UPDATE at once
+    # through transition tables and apply one aggregated delta per zipcode. Soft deletes
+    # (status -> false) are updates that only subtract.
+    op.execute(f"""
+        CREATE FUNCTION apply_zipcode_exposure_deltas() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {UPSERT_DELTAS.format(rows=NEW_ROWS)}
+            ELSIF TG_OP = 'DELETE' THEN
+                {UPSERT_DELTAS.format(rows=OLD_ROWS)}
+            ELSE
+                {UPSERT_DELTAS.format(rows=NEW_ROWS + " UNION ALL " + OLD_ROWS)}
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER policyholders_exposure_insert
+        AFTER INSERT ON policyholders REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_zipcode_exposure_deltas()
+    """)
+    op.execute("""
+        CREATE TRIGGER policyholders_exposure_update
+        AFTER UPDATE ON policyholders REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_zipcode_exposure_deltas()
+    """)
+    op.execute("""
+        CREATE TRIGGER policyholders_exposure_delete
+        AFTER DELETE ON policyholders REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_zipcode_exposure_deltas()
+    """)
+
+    # Totals of the policyholders already stored
+    op.execute("""
+        INSERT INTO zipcode_exposure (zipcode_id, policyholder_count, total_premium, total_claims)
+        SELECT zipcode_id, count(*), coalesce(sum(premium), 0), coalesce(sum(claims), 0)
+        FROM policyholders
+        WHERE status IS TRUE
+        GROUP BY zipcode_id
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER policyholders_exposure_delete ON policyholders")
+    op.execute("DROP TRIGGER policyholders_exposure_update ON policyholders")
+    op.execute("DROP TRIGGER policyholders_exposure_insert ON policyholders")
+    op.execute("DROP FUNCTION apply_zipcode_exposure_deltas()")
+    op.drop_table('zipcode_exposure')
@@ -0,0 +1,41 @@
+"""create zipcode_zone_county mapping and index affected areas by alert
+
+Revision ID: 20261018010
+Revises: 20261018009
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018010'
+down_revision = '20261018009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'zipcode_zone_county',
+        sa.Column('zone_county_id', sa.Integer(), nullable=False),
+        sa.Column('zipcode_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['zone_county_id'], ['zones_counties.id'], ),
+        sa.ForeignKeyConstraint(['zipcode_id'], ['zipcodes.id'], ),
+        sa.PrimaryKeyConstraint('zone_county_id', 'zipcode_id')
+    )
+    op.create_index(op.f('ix_zipcode_zone_county_zipcode_id'), 'zipcode_zone_county', ['zipcode_id'], unique=False)
+    op.create_index(
+        'ix_alert_affected_areas_alert_id_zone_county_id',
+        'alert_affected_areas',
+        ['alert_id', 'zone_county_id'],
+        unique=False
+    )
+
+    # Filled from the datasets by 20261018011
+
+
+def downgrade():
+    op.drop_index('ix_alert_affected_areas_alert_id_zone_county_id', table_name='alert_affected_areas')
+    op.drop_index(op.f('ix_zipcode_zone_county_zipcode_id'), table_name='zipcode_zone_county')
+    op.drop_table('zipcode_zone_county')
@@ -0,0 +1,61 @@
+"""index zipcode_zone_county by zipcode and zone, rebuild it from the datasets
+
+Revision ID: 20261018011
+Revises: 20261018010
+Create Date: 2026-10-18 00:11:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018011'
+down_revision = '20261018010'
+branch_labels = None
+depends_on = None
+
+# Every known zone/county with its zipcodes: counties from county_zipcodes (the default
+# zipcode_dataset backend), zones from ugc_zipcodes
+ZONE_ZIPCODES = """
+    SELECT zc.id AS zone_county_id, c.zip
+    FROM zones_counties zc
+    JOIN county_zipcodes c ON c.county_fips = zc.fips
+    WHERE zc.type = 'COUNTY'
+    UNION
+    SELECT zc.id, u.zip
+    FROM zones_counties zc
+    JOIN ugc_zipcodes u ON u.ugc_code = zc.code
+    WHERE zc.type = 'ZONE'
+"""
+
+
+def upgrade():
+    op.drop_index(op.f('ix_zipcode_zone_county_zipcode_id'), table_name='zipcode_zone_county')
+    op.create_index(
+        'ix_zipcode_zone_county_zipcode_id_zone_county_id',
+        'zipcode_zone_county',
+        ['zipcode_id', 'zone_county_id'],
+        unique=False
+    )
+
+    # Replace every pair with those of the datasets, as rebuild_zipcode_zone_county
+    # does. Zipcodes rows come from the seeders: zones with a zipcode that has no row
+    # yet stay unmapped and are resolved (and mapped) by the next sync that needs them
+    op.execute("DELETE FROM zipcode_zone_county")
+    op.execute(f"""
+        INSERT INTO zipcode_zone_county (zone_county_id, zipcode_id)
+        SELECT s.zone_county_id, z.id
+        FROM ({ZONE_ZIPCODES}) s
+        JOIN zipcodes z ON z.code = s.zip
+        WHERE s.zone_county_id NOT IN (
+            SELECT m.zone_county_id
+            FROM ({ZONE_ZIPCODES}) m
+            LEFT JOIN zipcodes mz ON mz.code = m.zip
+            WHERE mz.id IS NULL
+        )
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_zipcode_zone_county_zipcode_id_zone_county_id', table_name='zipcode_zone_county')
+    op.create_index(op.f('ix_zipcode_zone_county_zipcode_id'), 'zipcode_zone_county', ['zipcode_id'], unique=False)
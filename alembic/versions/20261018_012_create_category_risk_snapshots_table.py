@@ -0,0 +1,35 @@
+"""create category_risk_snapshots table
+
+Revision ID: 20261018012
+Revises: 20261018011
+Create Date: 2026-10-18 00:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018012'
+down_revision = '20261018011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'category_risk_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sync_log_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('alert_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('build_ms', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['sync_log_id'], ['alert_sync_logs.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_category_risk_snapshots_id'), 'category_risk_snapshots', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_category_risk_snapshots_id'), table_name='category_risk_snapshots')
+    op.drop_table('category_risk_snapshots')
@@ -0,0 +1,46 @@
+"""create alert_categories table
+
+Revision ID: 20261018013
+Revises: 20261018012
+Create Date: 2026-10-18 00:13:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018013'
+down_revision = '20261018012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'alert_categories',
+        sa.Column('alert_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('alert_id', 'category_id', 'event_id')
+    )
+    op.create_index(
+        'ix_alert_categories_category_id_alert_id', 'alert_categories', ['category_id', 'alert_id'], unique=False
+    )
+
+    # Link the stored alerts: a mapped event matches when its name occurs in the
+    # alert's event_type, case-insensitively
+    op.execute("""
+        INSERT INTO alert_categories (alert_id, category_id, event_id)
+        SELECT DISTINCT a.id, m.category_id, m.event_id
+        FROM alerts a
+        JOIN events e ON e.name <> '' AND position(lower(e.name) IN lower(a.event_type)) > 0
+        JOIN category_event_mappings m ON m.event_id = e.id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_alert_categories_category_id_alert_id', table_name='alert_categories')
+    op.drop_table('alert_categories')
@@ -0,0 +1,31 @@
+"""add include to category_risk_snapshots
+
+Revision ID: 20261018014
+Revises: 20261018013
+Create Date: 2026-10-18 00:14:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018014'
+down_revision = '20261018013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing snapshots hold the whole hierarchy
+    op.add_column(
+        'category_risk_snapshots',
+        sa.Column('include', sa.String(length=30), nullable=False, server_default='policyholders')
+    )
+    op.create_index(
+        'ix_category_risk_snapshots_include_id', 'category_risk_snapshots', ['include', 'id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_category_risk_snapshots_include_id', table_name='category_risk_snapshots')
+    op.drop_column('category_risk_snapshots', 'include')
@@ -7,6 +7,8 @@ from app.schemas.common.category import CategoryCreate, CategoryUpdate, Category
 from app.api.v1.endpoints.auth import get_current_user
 from app.models.common.category_event_mappings import CategoryEventMapping
 from app.models.common.events import Event
+from app.services.monitoring.alert_category_service import relink_events
+from app.services.monitoring.category_risk_snapshot_service import schedule_category_risk_snapshot_rebuild
 
 
 router = APIRouter()
@@ -97,6 +99,8 @@ def update_category(
                 detail="Category with this name already exists"
             )
         raise
+    # The snapshot lists the active categories with their names
+    schedule_category_risk_snapshot_rebuild()
     return category
 
 @router.delete("/categories/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -115,6 +119,7 @@ def delete_category(
     category.status = False
     category.updated_by = current_user.id
     db.commit()
+    schedule_category_risk_snapshot_rebuild()
     return None
 
 @router.post("/categories/map-event", status_code=status.HTTP_201_CREATED)
@@ -147,7 +152,10 @@ def map_category_to_event(
         event_id=mapping_in.event_id
     )
     db.add(mapping)
-    db.commit()
+    db.flush()
+    # Link the stored alerts of the event to the category (commits with the mapping)
+    relink_events(db, [mapping_in.event_id])
+    schedule_category_risk_snapshot_rebuild()
     db.refresh(mapping)
     return {"message": "Category mapped to event successfully"}
 
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.session import get_db
 from app.models.common.events import Event
+from app.services.monitoring.alert_category_service import relink_events
+from app.services.monitoring.category_risk_snapshot_service import schedule_category_risk_snapshot_rebuild
 from app.schemas.common.event import EventCreate, EventUpdate, EventResponse
 from app.api.v1.endpoints.auth import get_current_user
 
@@ -79,11 +81,18 @@ def update_event(
     update_data = event_in.dict(exclude_unset=True)
     update_data["updated_by"] = current_user.id
     
+    name_changed = "name" in update_data and update_data["name"] != event.name
     for field, value in update_data.items():
         setattr(event, field, value)
     
     try:
-        db.commit()
+        if name_changed:
+            # Relink the alerts matched by the old or the new name (commits with the update)
+            db.flush()
+            relink_events(db, [event.id])
+            schedule_category_risk_snapshot_rebuild()
+        else:
+            db.commit()
         db.refresh(event)
     except Exception as e:
         db.rollback()
@@ -111,4 +120,5 @@ def delete_event(
     event.status = False
     event.updated_by = current_user.id
     db.commit()
+    schedule_category_risk_snapshot_rebuild()
     return None
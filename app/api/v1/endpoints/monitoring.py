@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -6,8 +7,16 @@ import asyncio
 from app.db.session import get_db, SessionLocal
 from app.models.monitoring.alert import Alert, AlertStatus, AlertSeverity
 from app.schemas.monitoring.alert import AlertResponse
-from app.services.monitoring.alert_service import fetch_weather_alerts, process_weather_alerts, get_alerts_grouped_by_category
-from app.services.monitoring.alert_group_service import get_alerts_grouped_by_category_with_zipcodes
+from app.services.monitoring.alert_service import run_weather_alert_sync, get_alerts_grouped_by_category, get_sync_timings
+from app.services.monitoring.alert_group_service import (
+    get_category_risk_page, stream_category_risk_ndjson, stream_category_risk_json, CATEGORY_RISK_INCLUDES,
+    resolve_category_risk_includes
+)
+from app.services.monitoring.category_risk_snapshot_service import (
+    get_latest_category_risk_snapshot, snapshot_etag, SNAPSHOT_INCLUDES
+)
+from app.services.monitoring.weather_client import WeatherFeedError
+from app.services.monitoring.alert_sync_worker import loop_lag_monitor
 from sqlalchemy import desc, distinct
 from app.core.config import settings
 
@@ -19,14 +28,10 @@ async def fetch_alerts_job():
     global _background_task
     while True:
         try:
-            db = SessionLocal()
-            alerts = await fetch_weather_alerts()
-            process_weather_alerts(db, alerts)
+            # Ingestion runs on the dedicated worker with its own session
+            await run_weather_alert_sync()
         except Exception as e:
             print(f"Error in background task: {str(e)}")
-        finally:
-            if db:
-                db.close()
         await asyncio.sleep(settings.ALERT_FETCH_INTERVAL_SECONDS)  # Sleep for configured interval
 
 @router.on_event("startup")
@@ -36,6 +41,39 @@ async def start_background_tasks():
         _background_task = asyncio.create_task(fetch_alerts_job())
         print("Weather alerts background task started")
 
+async def stop_background_tasks():
+    """Cancel the periodic fetch and wait for it to end, so that it submits nothing to
+    the ingestion worker once that is shut down."""
+    global _background_task
+    if _background_task is not None:
+        _background_task.cancel()
+        try:
+            await _background_task
+        except asyncio.CancelledError:
+            pass
+        _background_task = None
+        print("Weather alerts background task stopped")
+
+@router.get("/sync/loop-lag")
+def get_sync_loop_lag():
+    """
+    Event loop lag percentiles (ms) sampled while idle and while an alert sync runs.
+    Every request served by the event loop pays at least this lag, so the "sync"
+    p99 should stay in line with the "idle" p99.
+    """
+    return loop_lag_monitor.stats()
+
+@router.get("/sync/timings")
+def get_sync_stage_timings(
+    db: Session = Depends(get_db),
+    limit: int = Query(default=50, ge=1, le=500)
+):
+    """
+    Per-stage wall times, statement counts and rows written of the most recent
+    completed alert syncs, with p50/p95/p99 over those syncs.
+    """
+    return get_sync_timings(db, limit)
+
 @router.get("/alerts", response_model=List[AlertResponse])
 def get_alerts(
     db: Session = Depends(get_db),
@@ -114,37 +152,121 @@ def get_alerts_by_state(
     return query.offset(skip).limit(limit).all()
 
 @router.post("/fetch-alerts")
-async def trigger_alert_fetch(db: Session = Depends(get_db)):
+async def trigger_alert_fetch():
     """Manually trigger weather alert fetch and return grouped alerts with zipcode details"""
     try:
-        alerts = await fetch_weather_alerts()
-        result = process_weather_alerts(db, alerts)
+        result = await run_weather_alert_sync()
         if result:
             return result
         return {"message": "No new alerts to process"}
+    except WeatherFeedError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/alerts/category-risk-with-zipcodes", response_model=List[Dict[str, Any]])
 def fetch_category_risk_alerts_with_zipcodes(
+    request: Request,
     db: Session = Depends(get_db),
     state: Optional[str] = None,
     severity: Optional[AlertSeverity] = None,
     category: Optional[str] = None,
+    include: str = Query(default="alerts,affected_areas"),
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    alerts_limit: Optional[int] = Query(default=None, ge=1),
+    policyholders_limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None,
 ):
     """
     Fetch already synced alerts grouped by category with detailed zipcode information
     for policyholder data collection. Returns alerts with state->county/zone->zipcode hierarchy.
+    - include: comma-separated levels among alerts, affected_areas, policyholders (each
+      implies the previous ones); individual policyholders are left out by default
+    - fields: comma-separated alert fields to return (all by default)
+    - limit / alerts_limit / policyholders_limit: page sizes of the categories, of the
+      alerts of a category and of the policyholders of a zipcode
+    - cursor: continue a list; the next page of categories is in the X-Next-Cursor header,
+      those of truncated alerts and policyholders lists in cat_events_next_cursor and
+      policyholders_next_cursor
+    Unfiltered, unpaged requests for the default or the whole payload (no fields) are served from
+    the snapshot of that shape materialized after the last change of the alerts; its
+    ETag is the snapshot version, so polling with If-None-Match gets 304 until it changes.
     """
+    includes = [name.strip() for name in include.split(",") if name.strip()]
+    field_names = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    # Deepest level asked for, each level implying the ones before it
+    deepest = max(
+        (CATEGORY_RISK_INCLUDES.index(name) for name in includes if name in CATEGORY_RISK_INCLUDES), default=-1
+    )
+    snapshot_include = CATEGORY_RISK_INCLUDES[deepest] if deepest >= 0 else None
     try:
-        result = get_alerts_grouped_by_category_with_zipcodes(db=db, state=state, severity=severity, category=category)
-        if not result:
-            return []
-        return result
+        if (
+            snapshot_include in SNAPSHOT_INCLUDES and set(includes) <= set(CATEGORY_RISK_INCLUDES)
+            and field_names is None and not (limit or alerts_limit or policyholders_limit or cursor)
+            and all(value in (None, "all") for value in (state, severity, category))
+        ):
+            version, body = get_latest_category_risk_snapshot(db, snapshot_include)
+            etag = snapshot_etag(version)
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag in [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]:
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        results, next_cursor = get_category_risk_page(
+            db, state=state, severity=severity, category=category,
+            include=includes, fields=field_names, limit=limit, alerts_limit=alerts_limit,
+            policyholders_limit=policyholders_limit, cursor=cursor,
+        )
+        headers = {"Cache-Control": "no-cache"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return JSONResponse(content=results, headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error in fetch_category_risk_alerts_with_zipcodes: {str(e)}")  # Add logging
         raise HTTPException(status_code=500, detail=f"Error fetching alerts: {str(e)}")
     
+@router.get("/alerts/category-risk-with-zipcodes/stream")
+def stream_category_risk_alerts_with_zipcodes(
+    format: str = Query(default="ndjson", enum=["ndjson", "json"]),
+    state: Optional[str] = None,
+    severity: Optional[AlertSeverity] = None,
+    category: Optional[str] = None,
+    include: str = Query(default="alerts,affected_areas"),
+):
+    """
+    Live version of /alerts/category-risk-with-zipcodes written while it is read from
+    the database: alerts come through a server-side cursor and are sent one at a time,
+    so the first bytes go out after the category counts and memory stays flat whatever
+    the size of the outbreak. state, severity, category and include filter and shape it
+    as on the paged endpoint.
+    - format=ndjson: one line per category header, then one {"cat_id", "cat_event"} line per alert
+    - format=json: the same JSON array as the paged endpoint
+    """
+    includes = [name.strip() for name in include.split(",") if name.strip()]
+    # Checked before the first byte goes out, while an error status can still be sent
+    try:
+        resolve_category_risk_includes(includes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    options = {"state": state, "severity": severity, "category": category, "include": includes}
+
+    def body():
+        # The response outlives the request's dependencies, so it reads with its own session
+        db = SessionLocal()
+        try:
+            if format == "json":
+                yield from stream_category_risk_json(db, **options)
+            else:
+                yield from stream_category_risk_ndjson(db, **options)
+        finally:
+            db.close()
+
+    media_type = "application/json" if format == "json" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+    
 @router.get("/alerts/category-risk")
 def fetch_category_risk_alerts(
     db: Session = Depends(get_db),
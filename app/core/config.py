@@ -23,6 +23,35 @@ class Settings(BaseSettings):
     
     # Alert Monitoring Settings
     ALERT_FETCH_INTERVAL_SECONDS: int = 300  # Default to 5 minutes
+    ALERT_FEED_STREAMING: bool = False  # Parse and persist features while the feed downloads
+    ALERT_FEED_SPOOL_BYTES: int = 8 * 1024 * 1024  # Streamed feeds without ETag/Last-Modified are hashed before parsing, buffered in memory up to this size, on disk beyond
+    ALERT_FETCH_BY_STATE: bool = False  # One area-scoped request per configured state instead of the national feed
+    ALERT_FETCH_CONCURRENCY: int = 4  # Per-state requests in flight at once
+    ALERT_LOOP_LAG_SAMPLE_SECONDS: float = 0.1  # Event loop lag probe interval
+    ALERT_INGEST_MODE: str = "per_alert"  # "per_alert" (one savepoint per alert) or "bulk" (set-based batches)
+    ALERT_BULK_BATCH_SIZE: int = 1000  # Alerts written per set-based batch in bulk mode
+    ALERT_BULK_WRITER: str = "insert"  # "insert" (multi-row INSERT) or "copy" (PostgreSQL COPY FROM STDIN)
+    ALERT_LOOKUP_CHUNK_SIZE: int = 1000  # Keys bound per existing-row lookup (= ANY(array) on PostgreSQL)
+    ZIPCODE_BACKEND: str = "zipcode_dataset"  # Zipcode source of counties, UGC zones and polygons: "zipcode_dataset" or "zipcode2_dataset"
+    ZIPCODE_INDEX_ENABLED: bool = True  # Answer county FIPS -> zipcodes from an in-memory snapshot of ZIPCODE_BACKEND
+    UGC_CACHE_MAX_ENTRIES: int = 20000  # Resolved UGC codes kept across syncs (LRU), 0 disables the cache
+    UGC_CACHE_TTL_SECONDS: int = 3600  # Age after which a cached UGC resolution is resolved again
+    ALERT_GEOMETRY_TARGETING: bool = False  # Limit alerts with a polygon to the zipcodes whose centroid is inside it
+    ALERT_GEOMETRY_GRID_DEGREES: float = 0.5  # Cell size of the zipcode centroid grid used to prune polygon tests
+    ALERT_AREA_STORAGE: str = "zipcode"  # "zipcode" (one affected-area row per zipcode) or "zone" (one row per fully alerted zone)
+    ALERT_AREA_EXPANSION: str = "python"  # Bulk mode: "python" or "sql" (PostgreSQL expands UGC codes into affected areas)
+    CATEGORY_RISK_SNAPSHOTS_KEPT: int = 5  # Category-risk snapshot versions kept after each rebuild
+    CATEGORY_RISK_STREAM_BATCH_SIZE: int = 100  # Alerts fetched and serialized per batch by the streaming endpoint
+
+    # weather.gov HTTP client settings (one pooled client per application)
+    WEATHER_API_USER_AGENT: str = "cat-api"  # weather.gov asks clients to identify themselves
+    WEATHER_API_HTTP2: bool = True
+    WEATHER_API_TIMEOUT_SECONDS: float = 30.0
+    WEATHER_API_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    WEATHER_API_MAX_CONNECTIONS: int = 10
+    WEATHER_API_MAX_RETRIES: int = 3
+    WEATHER_API_BACKOFF_BASE_SECONDS: float = 0.5
+    WEATHER_API_BACKOFF_MAX_SECONDS: float = 10.0
     
     @property
     def sync_database_url(self) -> str:
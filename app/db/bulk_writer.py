@@ -0,0 +1,58 @@
+import enum
+import io
+from typing import Any, Dict, List, Type
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one value as a PostgreSQL CSV field: unquoted empty for NULL, quoted otherwise."""
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        value = value.value
+    elif isinstance(value, bool):
+        value = "true" if value else "false"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_rows(db: Session, model: Type[Any], rows: List[Dict[str, Any]]) -> int:
+    """
+    Stream `rows` into the model's table with COPY FROM STDIN on the session's
+    current connection, so the rows belong to the open transaction/savepoint.
+    All rows must share the keys of the first row. Returns the number of rows copied.
+    """
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_copy_value(row.get(column)) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    table = model.__table__.name
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def write_rows(db: Session, model: Type[Any], rows: List[Dict[str, Any]]) -> int:
+    """
+    Write plain rows for a high-volume ingestion table using the writer selected by
+    ALERT_BULK_WRITER: "copy" (PostgreSQL COPY) or "insert" (multi-row INSERT).
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    if settings.ALERT_BULK_WRITER == "copy" and db.get_bind().dialect.name == "postgresql":
+        return copy_rows(db, model, rows)
+    db.execute(insert(model), rows)
+    return len(rows)
@@ -0,0 +1,23 @@
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def lookup_chunks(values: List[Any], size: Optional[int] = None) -> Iterator[List[Any]]:
+    """Split lookup keys into chunks of at most ALERT_LOOKUP_CHUNK_SIZE values."""
+    size = size or settings.ALERT_LOOKUP_CHUNK_SIZE
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def matches_any(db: Session, column, values: List[Any]):
+    """Filter `column` against a list of keys. PostgreSQL gets `column = ANY(:array)`,
+    one bound array whatever the chunk length, so the statement and its plan on the
+    unique index are reused; other dialects fall back to IN (...)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(values, ARRAY(column.type)))
+    return column.in_(values)
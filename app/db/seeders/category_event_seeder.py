@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from app.models.common.category_event_mappings import CategoryEventMapping
 from app.models.common.category import Category
 from app.models.common.events import Event
+from app.services.monitoring.alert_category_service import rebuild_alert_categories
+from app.services.monitoring.category_risk_snapshot_service import build_category_risk_snapshot
 
 async def seed_category_events(db: Session):
     print("Seeding category-event mappings...")
@@ -37,5 +39,8 @@ async def seed_category_events(db: Session):
                 )
                 db.add(new_mapping)
     
-    db.commit()
+    db.flush()
+    # Relink the stored alerts to the seeded mappings (commits) and regroup the snapshot
+    rebuild_alert_categories(db)
+    build_category_risk_snapshot(db)
     print("Category-event mappings seeded successfully!")
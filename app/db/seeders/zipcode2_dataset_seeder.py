@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Session
 from app.models.common.zipcode2_dataset import ZipCode2Dataset
+from app.services.common.dataset_version_service import bump_dataset_version, ZIPCODE2_DATASET
+from app.services.monitoring.affected_area_service import rebuild_zipcode_zone_county
+from app.services.monitoring.ugc_zipcode_service import rebuild_ugc_zipcodes
 import csv
 import os
 import json
@@ -65,5 +68,10 @@ async def seed_zipcode2_dataset(db: Session):
         if batch:
             db.bulk_save_objects(batch)
             db.commit()
-    
+
+    # Let in-memory snapshots of the dataset, the UGC -> zipcode lookup and the
+    # zone <-> zipcode association rebuild
+    bump_dataset_version(db, ZIPCODE2_DATASET)
+    rebuild_ugc_zipcodes(db)
+    rebuild_zipcode_zone_county(db)
     print("Zipcode2 dataset seeded successfully!")
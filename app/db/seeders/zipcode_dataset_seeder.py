@@ -1,5 +1,9 @@
 from sqlalchemy.orm import Session
 from app.models.common.zipcode_dataset import ZipCodeDataset
+from app.services.common.dataset_version_service import bump_dataset_version, ZIPCODE_DATASET
+from app.services.monitoring.ugc_zipcode_service import rebuild_ugc_zipcodes
+from app.services.monitoring.affected_area_service import rebuild_zipcode_zone_county
+from app.services.monitoring.county_zipcode_service import rebuild_county_zipcodes
 import csv
 import os
 import json
@@ -55,4 +59,10 @@ async def seed_zipcode_dataset(db: Session):
             db.bulk_save_objects(batch)
             db.commit()
     
+    # Let in-memory indexes, the UGC -> zipcode lookup and the zone <-> zipcode
+    # association over the dataset rebuild
+    rebuild_county_zipcodes(db)
+    bump_dataset_version(db, ZIPCODE_DATASET)
+    rebuild_ugc_zipcodes(db)
+    rebuild_zipcode_zone_county(db)
     print("Zipcode dataset seeded successfully!")
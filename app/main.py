@@ -1,7 +1,43 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.monitoring import stop_background_tasks
+from app.services.monitoring.weather_client import open_weather_client, close_weather_client
+from app.services.monitoring.alert_sync_worker import loop_lag_monitor, shutdown_ingest_worker, run_in_ingest_worker
+from app.services.monitoring.zipcode_index import refresh_county_zip_index
+from app.services.monitoring.geometry_targeting import refresh_zip_centroid_grid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled weather.gov client for the whole application lifetime
+    open_weather_client()
+    loop_lag_monitor.start()
+    try:
+        # Load the county FIPS -> zipcode index before the first sync needs it
+        await run_in_ingest_worker(refresh_county_zip_index)
+    except Exception as e:
+        # The first sync retries the build; lookups fall back to queries meanwhile
+        logger.error(f"Error building county FIPS -> zipcode index: {str(e)}")
+    try:
+        # Polygon targeting tests zipcode centroids through a grid built once here
+        await run_in_ingest_worker(refresh_zip_centroid_grid)
+    except Exception as e:
+        logger.error(f"Error building zipcode centroid grid: {str(e)}")
+    yield
+    # Stop the periodic fetch before the worker it submits to, then wait for a running
+    # ingest batch off the event loop
+    await stop_background_tasks()
+    await loop_lag_monitor.stop()
+    await asyncio.to_thread(shutdown_ingest_worker)
+    await close_weather_client()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,7 +52,8 @@ app = FastAPI(
     * Use the token with format `Bearer your-token` in the Authorize button
     """,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware configuration
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Float
+from app.db.session import Base
+
+class CountyZipcode(Base):
+    """Inverted index of zipcode_dataset: one row per county a zip code overlaps,
+    parsed from county_fips_all / county_weights, so that zip codes straddling a
+    county line are found from every county they belong to."""
+    __tablename__ = "county_zipcodes"
+
+    county_fips = Column(String(5), primary_key=True)
+    zip = Column(String(10), primary_key=True, index=True)
+    weight = Column(Float, nullable=True)  # Share of the zip code in this county, 0-1
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class DatasetVersion(Base):
+    """Version counter of a reference dataset, bumped whenever the dataset is (re)imported
+    so that in-memory indexes built from it know when to rebuild."""
+    __tablename__ = "dataset_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.db.session import Base
+
+class NwsZoneCounty(Base):
+    """One row of the NWS zone-county correlation file: a public forecast zone
+    (UGC SSZnnn) and one of the counties it overlaps."""
+    __tablename__ = "nws_zone_counties"
+    __table_args__ = (UniqueConstraint("ugc_code", "county_fips", name="uq_nws_zone_counties_ugc_county"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    ugc_code = Column(String(10), index=True, nullable=False)  # e.g. ALZ001
+    state_code = Column(String(2), nullable=False)
+    zone_name = Column(String(100))
+    county_fips = Column(String(5), index=True, nullable=False)
+    county_name = Column(String(100))
+    cwa = Column(String(10))  # Issuing forecast office
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Float
+from app.db.session import Base
+
+class UgcZipcode(Base):
+    """Materialized UGC code -> zip code lookup for county (SSCnnn) and zone (SSZnnn)
+    codes, rebuilt whenever the zipcode dataset or the NWS zone-county file is loaded."""
+    __tablename__ = "ugc_zipcodes"
+
+    ugc_code = Column(String(10), primary_key=True)
+    zip = Column(String(10), primary_key=True)
+    weight = Column(Float, nullable=True)  # Share of the zip code inside the county/zone, 0-1
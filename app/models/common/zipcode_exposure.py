@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class ZipcodeExposure(Base):
+    """Active policyholder totals per zipcode. Maintained by statement-level triggers on
+    policyholders (see migration 20261018009), never written by the application."""
+    __tablename__ = "zipcode_exposure"
+
+    zipcode_id = Column(Integer, ForeignKey("zipcodes.id"), primary_key=True)
+    policyholder_count = Column(Integer, nullable=False, default=0)  # Policyholders with status = true
+    total_premium = Column(Float, nullable=False, default=0.0)
+    total_claims = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
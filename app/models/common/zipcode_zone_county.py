@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.db.session import Base
+
+class ZipcodeZoneCounty(Base):
+    """Zone/county <-> zipcode association. The primary key serves zone -> zipcodes
+    reads, the (zipcode_id, zone_county_id) index the reverse direction."""
+    __tablename__ = "zipcode_zone_county"
+    __table_args__ = (
+        Index("ix_zipcode_zone_county_zipcode_id_zone_county_id", "zipcode_id", "zone_county_id"),
+    )
+
+    zone_county_id = Column(Integer, ForeignKey("zones_counties.id"), primary_key=True)
+    zipcode_id = Column(Integer, ForeignKey("zipcodes.id"), primary_key=True)
@@ -27,6 +27,7 @@ class Alert(Base):
     event_type = Column(String, index=True, nullable=True)
     external_id = Column(String, unique=True, index=True)
     event_timestamp = Column(DateTime(timezone=True))
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the feed properties used for change detection
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.db.session import Base
+
+class AlertCategory(Base):
+    """Category of an alert, through each mapped event whose name occurs in the alert's
+    event_type. Written at ingestion and when event names or mappings change."""
+    __tablename__ = "alert_categories"
+    __table_args__ = (
+        Index("ix_alert_categories_category_id_alert_id", "category_id", "alert_id"),
+    )
+
+    alert_id = Column(Integer, ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
@@ -1,23 +1,40 @@
-from sqlalchemy import Column, Integer, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Enum, Float
 from sqlalchemy.sql import func
 from app.db.session import Base
+import enum
+
+class SyncStatus(str, enum.Enum):
+    COMPLETED = "COMPLETED"
+    NOT_MODIFIED = "NOT_MODIFIED"
+    FETCH_FAILED = "FETCH_FAILED"
 
 class AlertSyncLog(Base):
     """Model to track alert synchronization process results."""
     __tablename__ = "alert_sync_logs"
 
     id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(SyncStatus), nullable=False, default=SyncStatus.COMPLETED)
     total_alerts = Column(Integer, nullable=False)
     processed_count = Column(Integer, nullable=False, default=0)
+    updated_count = Column(Integer, nullable=False, default=0)  # Stored alerts whose content changed
+    unchanged_count = Column(Integer, nullable=False, default=0)  # Stored alerts skipped by content hash
     ignored_by_state = Column(Integer, nullable=False, default=0)
     ignored_by_missing_data = Column(Integer, nullable=False, default=0)
     error_count = Column(Integer, nullable=False, default=0)
     missing_states = Column(JSON, nullable=True)  # Store missing states as JSON array
+    error_message = Column(String, nullable=True)  # Set when the feed fetch failed
     # Zipcode processing summary fields
     processed_same_codes = Column(Integer, nullable=False, default=0)
     skipped_same_codes = Column(Integer, nullable=False, default=0)
     found_zipcodes = Column(Integer, nullable=False, default=0)
     created_zipcode_mappings = Column(Integer, nullable=False, default=0)
     used_zipcode_mappings = Column(Integer, nullable=False, default=0)
+    # Performance instrumentation
+    duration_ms = Column(Float, nullable=True)  # Wall time of the whole sync, fetch included
+    stage_timings = Column(JSON, nullable=True)  # Milliseconds per stage (fetch, parse, validation, ...)
+    rows_written = Column(JSON, nullable=True)  # Rows written per table
+    statement_count = Column(Integer, nullable=True)  # SQL statements executed by the sync
+    ugc_cache_hits = Column(Integer, nullable=True)  # UGC codes served by the cross-sync resolution cache
+    ugc_cache_misses = Column(Integer, nullable=True)  # UGC codes resolved from the database
     sync_timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
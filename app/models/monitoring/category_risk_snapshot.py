@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class CategoryRiskSnapshot(Base):
+    """Alerts grouped by category with their zipcode hierarchy, materialized after a
+    sync commits, one row per payload shape. The id is the snapshot version served as ETag."""
+    __tablename__ = "category_risk_snapshots"
+    __table_args__ = (
+        Index("ix_category_risk_snapshots_include_id", "include", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sync_log_id = Column(Integer, ForeignKey("alert_sync_logs.id"), nullable=True)  # Sync that triggered the build
+    include = Column(String(30), nullable=False, default="policyholders")  # Deepest level of the payload
+    payload = Column(JSON, nullable=False)  # get_alerts_grouped_by_category_with_zipcodes result
+    alert_count = Column(Integer, nullable=False, default=0)
+    build_ms = Column(Float, nullable=True)  # Time spent computing the payload
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -15,7 +15,7 @@ class AlertBase(BaseModel):
     event_type: str
 
 class AlertCreate(AlertBase):
-    pass
+    content_hash: Optional[str] = None  # Hash of the feed properties, see alert_content_hash
 
 class AlertUpdate(AlertBase):
     title: Optional[str] = None
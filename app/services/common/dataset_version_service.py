@@ -0,0 +1,45 @@
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+from app.models.common.dataset_version import DatasetVersion
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dataset names
+ZIPCODE_DATASET = "zipcode_dataset"
+ZIPCODE2_DATASET = "zipcode2_dataset"
+UGC_ZIPCODES = "ugc_zipcodes"
+# Bumped by anything that rewrites or deletes zones_counties or zipcodes rows outside ingestion
+ZONES_ZIPCODES = "zones_zipcodes"
+# Bumped when event names or category -> event mappings change
+CATEGORY_EVENTS = "category_events"
+
+
+def get_dataset_version(db: Session, name: str) -> int:
+    """Current version of a reference dataset, 0 when it was never versioned."""
+    version = db.query(DatasetVersion.version).filter(DatasetVersion.name == name).scalar()
+    return version or 0
+
+
+def get_dataset_versions(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Current versions of several reference datasets in one query, 0 for the ones
+    that were never versioned."""
+    names = list(names)
+    versions = dict(
+        db.query(DatasetVersion.name, DatasetVersion.version).filter(DatasetVersion.name.in_(names)).all()
+    )
+    return {name: versions.get(name) or 0 for name in names}
+
+
+def bump_dataset_version(db: Session, name: str) -> int:
+    """Increment the version of a reference dataset after it was (re)imported and commit.
+    Returns the new version."""
+    dataset_version = db.query(DatasetVersion).filter(DatasetVersion.name == name).with_for_update().first()
+    if dataset_version is None:
+        dataset_version = DatasetVersion(name=name, version=0)
+        db.add(dataset_version)
+    dataset_version.version += 1
+    db.commit()
+    print(f"Dataset {name} is now at version {dataset_version.version}")
+    return dataset_version.version
@@ -0,0 +1,341 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+import logging
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.lookups import lookup_chunks, matches_any
+from app.models.common.zipcode_zone_county import ZipcodeZoneCounty
+from app.models.common.zipcodes import Zipcode
+from app.models.common.zones_counties import RegionType
+from app.models.monitoring.alert_affected_area import AlertAffectedArea, RegionType as AreaRegionType
+from app.services.common.dataset_version_service import bump_dataset_version, ZONES_ZIPCODES
+from app.services.monitoring.zipcode_backends import get_zipcode_backend
+from app.services.monitoring.policyholder_service import MOCK_ADDRESSES, MOCK_EMAIL_PHONE_MAP
+
+logger = logging.getLogger(__name__)
+
+# (zone_county_id, zip) of every known zone/county, resolved like ingestion does:
+# counties by FIPS through the zipcode backend, zones through ugc_zipcodes
+ZONE_ZIPCODES_SQL = """
+SELECT zc.id AS zone_county_id, c.zip
+FROM zones_counties zc
+JOIN ({county_zipcodes}) c ON c.county_fips = zc.fips
+WHERE zc.type = 'COUNTY'
+UNION
+SELECT zc.id, u.zip
+FROM zones_counties zc
+JOIN ugc_zipcodes u ON u.ugc_code = zc.code
+WHERE zc.type = 'ZONE'
+"""
+
+# Zipcodes missing from zipcodes are created for the first zone/county they belong to
+CREATE_ZIPCODES_SQL = """
+INSERT INTO zipcodes (code, name, zone_county_id, status)
+SELECT s.zip, 'ZIP ' || s.zip, min(s.zone_county_id), true
+FROM ({zone_zipcodes}) s
+GROUP BY s.zip
+ON CONFLICT (code) DO NOTHING
+"""
+
+REBUILD_ZIPCODE_ZONE_COUNTY_SQL = """
+INSERT INTO zipcode_zone_county (zone_county_id, zipcode_id)
+SELECT s.zone_county_id, z.id
+FROM ({zone_zipcodes}) s
+JOIN zipcodes z ON z.code = s.zip
+"""
+
+# Server-side expansion of a batch of (alert id, UGC code) pairs, sent as two arrays:
+# zipcode rows (one zone/county row per zone in zone storage) from the zone <-> zipcode
+# association, zone/county rows for alerts without any zipcode, and 1-2 mock
+# policyholders per zipcode of each alert. Returns the affected-area rows of every alert.
+EXPAND_UGC_CODES_SQL = """
+WITH batch AS (
+    SELECT DISTINCT b.alert_id, zc.id AS zone_county_id, zc.type, zc.state_id, zc.fips
+    FROM unnest(CAST(:alert_ids AS integer[]), CAST(:ugc_codes AS text[])) AS b(alert_id, ugc_code)
+    JOIN zones_counties zc ON zc.code = b.ugc_code
+),
+expanded AS (
+    SELECT b.alert_id, b.zone_county_id, b.type, b.state_id, m.zipcode_id
+    FROM batch b
+    JOIN zipcode_zone_county m ON m.zone_county_id = b.zone_county_id
+    WHERE b.fips IS NOT NULL
+),
+areas AS (
+    INSERT INTO alert_affected_areas (alert_id, zone_county_id, zipcode_id, region_type)
+    SELECT alert_id, zone_county_id, zipcode_id, 'ZIPCODE'::regiontype_alert
+    FROM expanded
+    WHERE NOT :zone_storage
+    UNION ALL
+    SELECT DISTINCT alert_id, zone_county_id, NULL::integer,
+        (CASE WHEN type = 'ZONE' THEN 'ZONE' ELSE 'COUNTY' END)::regiontype_alert
+    FROM expanded
+    WHERE :zone_storage
+    UNION ALL
+    SELECT b.alert_id, b.zone_county_id, NULL::integer,
+        (CASE WHEN b.type = 'ZONE' THEN 'ZONE' ELSE 'COUNTY' END)::regiontype_alert
+    FROM batch b
+    WHERE NOT EXISTS (SELECT 1 FROM expanded e WHERE e.alert_id = b.alert_id)
+    RETURNING alert_id
+),
+alert_zipcodes AS (
+    -- A zipcode in several alerted zones of one alert draws its policyholders once
+    SELECT DISTINCT ON (e.alert_id, e.zipcode_id) e.zipcode_id, e.zone_county_id, e.state_id
+    FROM expanded e
+    ORDER BY e.alert_id, e.zipcode_id, e.zone_county_id
+),
+draws AS (
+    SELECT z.zipcode_id, z.zone_county_id, z.state_id,
+        1 + (random() < 0.5)::int AS holder_count,
+        1 + floor(random() * cardinality(CAST(:emails AS text[])))::int AS contact,
+        1 + floor(random() * cardinality(CAST(:addresses AS text[])))::int AS address
+    FROM alert_zipcodes z
+),
+holders AS (
+    INSERT INTO policyholders (
+        policy_id, name, zipcode_id, claims, premium, status,
+        state_id, county_id, address, email, phoneno
+    )
+    SELECT
+        'POL-' || upper(substr(md5(random()::text || d.zipcode_id), 1, 8)),
+        'Test Policy ' || chr(65 + floor(random() * 26)::int) || (1000 + floor(random() * 9000)::int),
+        d.zipcode_id,
+        floor(random() * 6)::int,
+        round((500 + random() * 4500)::numeric, 2),
+        true,
+        d.state_id,
+        d.zone_county_id,
+        (CAST(:addresses AS text[]))[d.address],
+        (CAST(:emails AS text[]))[d.contact],
+        (CAST(:phones AS text[]))[d.contact]
+    FROM draws d
+    CROSS JOIN LATERAL generate_series(1, d.holder_count)
+    RETURNING 1
+)
+SELECT alert_id, count(*), (SELECT count(*) FROM holders)
+FROM areas
+GROUP BY alert_id
+"""
+
+# Replace the zipcode rows of an alert's zone/county with one zone/county row when they
+# cover every zipcode the mapping holds for the zone (and nothing outside it)
+COMPACT_AFFECTED_AREAS_SQL = """
+WITH alert_zones AS (
+    SELECT a.alert_id, a.zone_county_id
+    FROM alert_affected_areas a
+    LEFT JOIN zipcode_zone_county m
+        ON m.zone_county_id = a.zone_county_id AND m.zipcode_id = a.zipcode_id
+    WHERE a.alert_id >= :first_id AND a.alert_id < :last_id
+      AND a.region_type = 'ZIPCODE' AND a.zone_county_id IS NOT NULL
+    GROUP BY a.alert_id, a.zone_county_id
+    HAVING bool_and(m.zipcode_id IS NOT NULL)
+       AND count(DISTINCT a.zipcode_id) = (
+           SELECT count(*) FROM zipcode_zone_county c WHERE c.zone_county_id = a.zone_county_id
+       )
+),
+deleted AS (
+    DELETE FROM alert_affected_areas a
+    USING alert_zones z
+    WHERE a.alert_id = z.alert_id AND a.zone_county_id = z.zone_county_id AND a.region_type = 'ZIPCODE'
+    RETURNING a.alert_id, a.zone_county_id
+)
+INSERT INTO alert_affected_areas (alert_id, zone_county_id, zipcode_id, region_type)
+SELECT DISTINCT d.alert_id, d.zone_county_id, NULL::integer,
+    (CASE WHEN zc.type = 'ZONE' THEN 'ZONE' ELSE 'COUNTY' END)::regiontype_alert
+FROM deleted d
+JOIN zones_counties zc ON zc.id = d.zone_county_id
+"""
+
+# Inverse of the compaction: zone/county rows without zipcode rows back to one row
+# per zipcode of the mapping. Zones without mapped zipcodes keep their row.
+EXPAND_AFFECTED_AREAS_SQL = """
+WITH zone_rows AS (
+    DELETE FROM alert_affected_areas a
+    WHERE a.alert_id >= :first_id AND a.alert_id < :last_id
+      AND a.region_type <> 'ZIPCODE' AND a.zipcode_id IS NULL
+      AND EXISTS (SELECT 1 FROM zipcode_zone_county m WHERE m.zone_county_id = a.zone_county_id)
+      AND NOT EXISTS (
+          SELECT 1 FROM alert_affected_areas z
+          WHERE z.alert_id = a.alert_id AND z.zone_county_id = a.zone_county_id AND z.region_type = 'ZIPCODE'
+      )
+    RETURNING a.alert_id, a.zone_county_id
+)
+INSERT INTO alert_affected_areas (alert_id, zone_county_id, zipcode_id, region_type)
+SELECT r.alert_id, r.zone_county_id, m.zipcode_id, 'ZIPCODE'::regiontype_alert
+FROM zone_rows r
+JOIN zipcode_zone_county m ON m.zone_county_id = r.zone_county_id
+"""
+
+
+def zone_storage_enabled() -> bool:
+    """Whether fully alerted zones are stored as one zone/county row (ALERT_AREA_STORAGE=zone)."""
+    return settings.ALERT_AREA_STORAGE == "zone"
+
+
+def zone_area_type(region_type: RegionType) -> AreaRegionType:
+    return AreaRegionType.ZONE if region_type == RegionType.ZONE else AreaRegionType.COUNTY
+
+
+def store_zone_zipcodes(db: Session, pairs: Iterable[Tuple[int, int]]) -> int:
+    """Record (zone_county_id, zipcode_id) pairs in the zone -> zipcode mapping;
+    pairs already stored are left alone. Returns the number of pairs sent."""
+    rows = [{"zone_county_id": zone_county_id, "zipcode_id": zipcode_id} for zone_county_id, zipcode_id in set(pairs)]
+    for start in range(0, len(rows), settings.ALERT_LOOKUP_CHUNK_SIZE):
+        db.execute(
+            pg_insert(ZipcodeZoneCounty).on_conflict_do_nothing(),
+            rows[start:start + settings.ALERT_LOOKUP_CHUNK_SIZE]
+        )
+    return len(rows)
+
+
+def rebuild_zipcode_zone_county(db: Session) -> int:
+    """
+    Recompute the zone/county <-> zipcode association of every known zone/county from
+    the reference datasets with set-based statements, creating the zipcodes it needs,
+    and bump the zones/zipcodes version (which commits). Run after the datasets or
+    ZIPCODE_BACKEND change. Returns the number of pairs.
+    """
+    zone_zipcodes = ZONE_ZIPCODES_SQL.format(county_zipcodes=get_zipcode_backend().county_zipcodes_sql)
+    db.execute(text(CREATE_ZIPCODES_SQL.format(zone_zipcodes=zone_zipcodes)))
+    db.query(ZipcodeZoneCounty).delete(synchronize_session=False)
+    db.execute(text(REBUILD_ZIPCODE_ZONE_COUNTY_SQL.format(zone_zipcodes=zone_zipcodes)))
+    count = db.query(func.count()).select_from(ZipcodeZoneCounty).scalar()
+    bump_dataset_version(db, ZONES_ZIPCODES)
+    print(f"Mapped {count} zone/county -> zipcode pairs")
+    return count
+
+
+def get_zone_zipcodes(db: Session, zone_county_ids: Iterable[int]) -> Dict[int, Tuple[Tuple[str, int], ...]]:
+    """(zip code, zipcode id) pairs of several zones/counties keyed by zone id, one join
+    of the association with zipcodes per lookup chunk. Zones not mapped yet are left out."""
+    result = defaultdict(list)
+    for chunk in lookup_chunks(list(set(zone_county_ids))):
+        for zone_county_id, code, zipcode_id in db.query(
+            ZipcodeZoneCounty.zone_county_id, Zipcode.code, Zipcode.id
+        ).join(Zipcode, Zipcode.id == ZipcodeZoneCounty.zipcode_id).filter(
+            matches_any(db, ZipcodeZoneCounty.zone_county_id, chunk)
+        ).order_by(ZipcodeZoneCounty.zone_county_id, Zipcode.code).all():
+            result[zone_county_id].append((code, zipcode_id))
+    return {zone_county_id: tuple(zipcodes) for zone_county_id, zipcodes in result.items()}
+
+
+def get_mapped_zone_ids(db: Session, zone_county_ids: Iterable[int]) -> Set[int]:
+    """The zones/counties among `zone_county_ids` that the association maps, without
+    loading their zipcodes."""
+    mapped = set()
+    for chunk in lookup_chunks(list(set(zone_county_ids))):
+        mapped.update(
+            zone_county_id for (zone_county_id,) in db.query(ZipcodeZoneCounty.zone_county_id).filter(
+                matches_any(db, ZipcodeZoneCounty.zone_county_id, chunk)
+            ).distinct().all()
+        )
+    return mapped
+
+
+def server_side_expansion_enabled(db: Session) -> bool:
+    """Whether bulk batches expand UGC codes into affected areas inside PostgreSQL
+    (ALERT_AREA_EXPANSION=sql)."""
+    return settings.ALERT_AREA_EXPANSION == "sql" and db.get_bind().dialect.name == "postgresql"
+
+
+def expand_affected_areas(
+    db: Session,
+    alert_ugcs: List[Tuple[int, str]],
+    zone_storage: bool
+) -> Tuple[Dict[int, int], int]:
+    """
+    Write the affected areas and mock policyholders of stored alerts from their
+    (alert id, UGC code) pairs with one INSERT ... SELECT over the zone <-> zipcode
+    association; the zones must be mapped already. Nothing but the two arrays goes to
+    the server. Returns the affected-area rows written per alert id and the number of
+    policyholders written.
+    """
+    emails = list(MOCK_EMAIL_PHONE_MAP)
+    rows = db.execute(text(EXPAND_UGC_CODES_SQL), {
+        "alert_ids": [alert_id for alert_id, _ in alert_ugcs],
+        "ugc_codes": [ugc_code for _, ugc_code in alert_ugcs],
+        "zone_storage": zone_storage,
+        "emails": emails,
+        "phones": [MOCK_EMAIL_PHONE_MAP[email] for email in emails],
+        "addresses": [address["address"] for address in MOCK_ADDRESSES],
+    }).all()
+    area_counts = {alert_id: count for alert_id, count, _ in rows}
+    policyholders = rows[0][2] if rows else 0
+    return area_counts, policyholders
+
+
+def get_zone_zipcode_ids(db: Session, zone_county_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Zipcode ids of several zones/counties from the mapping's primary key, keyed by zone id."""
+    result = defaultdict(list)
+    for chunk in lookup_chunks(list(set(zone_county_ids))):
+        for zone_county_id, zipcode_id in db.query(
+            ZipcodeZoneCounty.zone_county_id, ZipcodeZoneCounty.zipcode_id
+        ).filter(matches_any(db, ZipcodeZoneCounty.zone_county_id, chunk)).order_by(
+            ZipcodeZoneCounty.zone_county_id, ZipcodeZoneCounty.zipcode_id
+        ).all():
+            result[zone_county_id].append(zipcode_id)
+    return dict(result)
+
+
+def get_alerts_zone_zipcode_ids(db: Session, alert_ids: Iterable[int]) -> Dict[int, Dict[int, List[int]]]:
+    """
+    Alerted zipcode ids of several alerts keyed by alert id, then zone/county id,
+    whatever the storage mode: zipcode rows are read as stored, zone/county rows
+    without zipcode rows are expanded through the zone -> zipcode mapping. Zones
+    without zipcodes map to an empty list. One query for the rows and one for the
+    mapping per lookup chunk.
+    """
+    rows = []
+    for chunk in lookup_chunks(list(set(alert_ids))):
+        rows.extend(db.query(
+            AlertAffectedArea.alert_id,
+            AlertAffectedArea.zone_county_id,
+            AlertAffectedArea.zipcode_id,
+            AlertAffectedArea.region_type
+        ).filter(matches_any(db, AlertAffectedArea.alert_id, chunk)).order_by(AlertAffectedArea.id).all())
+
+    zipcode_ids = defaultdict(dict)
+    zone_rows = []
+    for alert_id, zone_county_id, zipcode_id, region_type in rows:
+        if not zone_county_id:
+            continue
+        zipcode_ids[alert_id].setdefault(zone_county_id, [])
+        if region_type == AreaRegionType.ZIPCODE:
+            if zipcode_id:
+                zipcode_ids[alert_id][zone_county_id].append(zipcode_id)
+        else:
+            zone_rows.append((alert_id, zone_county_id))
+
+    expand = [(alert_id, zone_county_id) for alert_id, zone_county_id in zone_rows
+              if not zipcode_ids[alert_id][zone_county_id]]
+    if expand:
+        zone_zipcode_ids = get_zone_zipcode_ids(db, [zone_county_id for _, zone_county_id in expand])
+        for alert_id, zone_county_id in expand:
+            zipcode_ids[alert_id][zone_county_id] = list(zone_zipcode_ids.get(zone_county_id, []))
+    return dict(zipcode_ids)
+
+
+def rewrite_affected_areas(db: Session, expand: bool = False, batch_size: int = 1000) -> int:
+    """
+    Compact stored zipcode rows into zone/county rows (or expand them back with
+    `expand`), `batch_size` alerts per statement, committing after each batch so the
+    table is never locked as a whole. PostgreSQL only. Returns the rows removed.
+    """
+    statement = text(EXPAND_AFFECTED_AREAS_SQL if expand else COMPACT_AFFECTED_AREAS_SQL)
+    first_id, last_id = db.query(
+        func.min(AlertAffectedArea.alert_id), func.max(AlertAffectedArea.alert_id)
+    ).one()
+    if first_id is None:
+        return 0
+
+    before = db.query(func.count(AlertAffectedArea.id)).scalar()
+    for start in range(first_id, last_id + 1, batch_size):
+        db.execute(statement, {"first_id": start, "last_id": start + batch_size})
+        db.commit()
+        print(f"{'Expanded' if expand else 'Compacted'} alerts {start} to {min(start + batch_size, last_id + 1) - 1}")
+    after = db.query(func.count(AlertAffectedArea.id)).scalar()
+    print(f"alert_affected_areas: {before} -> {after} rows")
+    return before - after
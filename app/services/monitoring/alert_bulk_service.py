@@ -0,0 +1,339 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.common.policyholders import Policyholder
+from app.models.common.state import State
+from app.models.common.zipcodes import Zipcode
+from app.models.common.zones_counties import ZoneCounty, RegionType
+from app.models.monitoring.alert import Alert
+from app.models.monitoring.alert_affected_area import AlertAffectedArea, RegionType as AreaRegionType
+from app.schemas.monitoring.alert import AlertCreate
+from app.services.monitoring.ugc_zipcode_service import resolve_ugc_zipcodes
+from app.services.monitoring.ugc_cache import ugc_cache, ResolvedUgc
+from app.services.monitoring.affected_area_service import (
+    zone_storage_enabled, zone_area_type, store_zone_zipcodes, get_zone_zipcodes, get_mapped_zone_ids,
+    server_side_expansion_enabled, expand_affected_areas
+)
+from app.services.monitoring.alert_category_service import link_alert_categories
+from app.services.monitoring.policyholder_service import mock_policyholder_count, mock_policyholder_values
+from app.services.monitoring.sync_metrics import sync_stage
+from app.db.bulk_writer import write_rows
+from app.db.lookups import lookup_chunks, matches_any
+
+logger = logging.getLogger(__name__)
+
+# (alert_data, properties, regions, target_zipcodes); target_zipcodes limits the
+# alert to the zipcodes inside its polygon, None expands its UGC codes
+ResolvedAlert = Tuple[AlertCreate, dict, List[Tuple[str, str, RegionType, str, State]], Optional[Set[str]]]
+
+
+def _ensure_zones(
+    db: Session,
+    batch: List[ResolvedAlert],
+    existing_zones: Dict[str, ZoneCounty]
+) -> Dict[str, ZoneCounty]:
+    """Insert every zone/county of the batch that is not cached yet in one statement
+    and load them back. Returns the newly loaded zones keyed by UGC code."""
+    new_zone_rows = {}
+    for _, _, regions, _ in batch:
+        for ugc_code, state_code, region_type, region_code, state in regions:
+            if ugc_code in existing_zones or ugc_code in new_zone_rows:
+                continue
+            new_zone_rows[ugc_code] = {
+                "code": ugc_code,
+                "name": f"{state_code} {region_type.name} {region_code}",
+                "fips": f"{state.fips}{region_code}",
+                "type": region_type,
+                "state_id": state.id,
+                "status": True,
+            }
+
+    if not new_zone_rows:
+        return {}
+
+    db.execute(
+        pg_insert(ZoneCounty).on_conflict_do_nothing(index_elements=[ZoneCounty.code]),
+        list(new_zone_rows.values())
+    )
+    new_zones = {}
+    for codes in lookup_chunks(list(new_zone_rows)):
+        for zone in db.query(ZoneCounty).filter(matches_any(db, ZoneCounty.code, codes)).all():
+            new_zones[zone.code] = zone
+    return new_zones
+
+
+def load_stored_alerts(db: Session, external_ids: List[str]) -> Dict[str, Tuple[int, Optional[str]]]:
+    """Return (id, content_hash) of the stored alerts among `external_ids`, keyed by
+    external id. Only the given keys are looked up, chunk by chunk, on the unique index."""
+    stored = {}
+    for chunk in lookup_chunks(external_ids):
+        for alert_id, external_id, content_hash in db.query(
+            Alert.id, Alert.external_id, Alert.content_hash
+        ).filter(matches_any(db, Alert.external_id, chunk)).all():
+            stored[external_id] = (alert_id, content_hash)
+    return stored
+
+
+def _load_zipcode_ids(db: Session, codes: Set[str]) -> Dict[str, int]:
+    zipcode_ids = {}
+    for chunk in lookup_chunks(list(codes)):
+        for zipcode_id, code in db.query(Zipcode.id, Zipcode.code).filter(matches_any(db, Zipcode.code, chunk)).all():
+            zipcode_ids[code] = zipcode_id
+    return zipcode_ids
+
+
+def persist_alerts_bulk(
+    db: Session,
+    batch: List[ResolvedAlert],
+    existing_zones: Dict[str, ZoneCounty]
+) -> Dict[str, Any]:
+    """
+    Write a batch of resolved alerts with a fixed number of set-based statements:
+    every UGC code of the batch missing from the UGC cache is resolved to zipcodes at once
+    (one join of the zone <-> zipcode association, the datasets for zones it does not
+    map yet), then zones/counties, zipcodes,
+    alerts, mock policyholders and affected areas are each written with multi-row
+    INSERT ... ON CONFLICT statements.
+
+    Alerts that cannot be planned are counted as errors without affecting the rest
+    of the batch. Database errors roll back the whole batch savepoint and are
+    re-raised so the caller can fall back to per-alert processing.
+    Returns a summary with the counters and the zones created by the batch.
+    """
+    summary = {
+        "processed_count": 0,
+        "error_count": 0,
+        "skipped_existing": 0,
+        "new_zones": {},
+        "rows_written": {"alert_affected_areas": 0, "policyholders": 0},
+        "zipcode_summary": {
+            "processed_same_codes": 0,
+            "skipped_same_codes": 0,
+            "found_zipcodes": 0,
+            "created_mappings": 0,
+            "existing_mappings": 0
+        },
+    }
+    zipcode_summary = summary["zipcode_summary"]
+
+    with db.begin_nested():
+        # Zones/counties for every UGC code in the batch
+        with sync_stage("ugc_resolution"):
+            new_zones = _ensure_zones(db, batch, existing_zones)
+        zones = {**existing_zones, **new_zones}
+
+        # Zipcodes for every zone in the batch, one UGC lookup
+        batch_zones = {
+            ugc_code: zones[ugc_code]
+            for _, _, regions, _ in batch
+            for ugc_code, *_ in regions
+            if ugc_code in zones
+        }
+        # With server-side expansion the zipcodes of mapped zones stay in the database,
+        # only zones of polygon-targeted alerts are loaded
+        server_side = server_side_expansion_enabled(db)
+        loaded_zone_ids = {
+            zones[ugc_code].id
+            for _, _, regions, target_zipcodes in batch if not server_side or target_zipcodes is not None
+            for ugc_code, *_ in regions if ugc_code in zones
+        }
+        cached_zones = {}
+        for ugc_code, zone_county in batch_zones.items():
+            if zone_county.fips and zone_county.id in loaded_zone_ids:
+                cached = ugc_cache.get(ugc_code, zone_county.id)
+                if cached is not None:
+                    cached_zones[ugc_code] = cached
+        with sync_stage("zipcode_resolution"):
+            lookup_ids = [
+                zone_county.id for ugc_code, zone_county in batch_zones.items() if ugc_code not in cached_zones
+            ]
+            mapped_zones = get_zone_zipcodes(db, [zone_id for zone_id in lookup_ids if zone_id in loaded_zone_ids])
+            server_zone_ids = get_mapped_zone_ids(
+                db, [zone_id for zone_id in lookup_ids if zone_id not in loaded_zone_ids]
+            )
+            unmapped_zones = [
+                zone_county for ugc_code, zone_county in batch_zones.items()
+                if ugc_code not in cached_zones
+                and zone_county.id not in mapped_zones and zone_county.id not in server_zone_ids
+            ]
+            dataset_zipcodes = resolve_ugc_zipcodes(db, unmapped_zones)
+            zipcode_ids = _load_zipcode_ids(db, set().union(*dataset_zipcodes.values()))
+        for ugc_code, cached in cached_zones.items():
+            dataset_zipcodes[ugc_code] = {zip_code for zip_code, _ in cached.zipcodes}
+            zipcode_ids.update(cached.zipcodes)
+        for ugc_code, zone_county in batch_zones.items():
+            if zone_county.id in mapped_zones:
+                dataset_zipcodes[ugc_code] = {zip_code for zip_code, _ in mapped_zones[zone_county.id]}
+                zipcode_ids.update(mapped_zones[zone_county.id])
+
+        # Plan every alert in memory; a bad alert only costs itself
+        plans = []
+        known_zipcodes = set(zipcode_ids)
+        new_zipcode_rows = {}
+        for alert_data, properties, regions, target_zipcodes in batch:
+            try:
+                alert_zones = [
+                    (zones[ugc_code], region_type)
+                    for ugc_code, state_code, region_type, region_code, state in regions
+                    if ugc_code in zones
+                ]
+                if not alert_zones:
+                    print(f"❌ No valid zones for alert: {alert_data.title}")
+                    summary["error_count"] += 1
+                    continue
+
+                zone_zipcodes = []
+                for zone_county, region_type in alert_zones:
+                    if not zone_county.fips:
+                        print(f"Zone {zone_county.code} has no FIPS code, skipping")
+                        continue
+                    if zone_county.id in server_zone_ids and target_zipcodes is None:
+                        continue
+                    zipcode_summary["processed_same_codes"] += 1
+                    zips = dataset_zipcodes.get(zone_county.code)
+                    if zips and target_zipcodes is not None:
+                        zips = zips & target_zipcodes
+                    if not zips:
+                        zipcode_summary["skipped_same_codes"] += 1
+                        continue
+                    zipcode_summary["found_zipcodes"] += len(zips)
+                    for zip_code in zips:
+                        if zip_code in known_zipcodes:
+                            zipcode_summary["existing_mappings"] += 1
+                        else:
+                            # New zipcodes keep the first zone that needed them
+                            known_zipcodes.add(zip_code)
+                            zipcode_summary["created_mappings"] += 1
+                            new_zipcode_rows[zip_code] = {
+                                "code": zip_code,
+                                "name": f"ZIP {zip_code}",
+                                "zone_county_id": zone_county.id,
+                                "status": True,
+                            }
+                    zone_zipcodes.append((zone_county, zips))
+
+                plans.append((alert_data, alert_zones, zone_zipcodes, target_zipcodes))
+            except Exception as e:
+                print(f"❌ Error planning alert {alert_data.external_id}: {str(e)}")
+                summary["error_count"] += 1
+
+        # New zipcodes
+        if new_zipcode_rows:
+            inserted = db.execute(
+                pg_insert(Zipcode)
+                .on_conflict_do_nothing(index_elements=[Zipcode.code])
+                .returning(Zipcode.id, Zipcode.code),
+                list(new_zipcode_rows.values())
+            ).all()
+            zipcode_ids.update({code: zipcode_id for zipcode_id, code in inserted})
+            missing = set(new_zipcode_rows) - set(zipcode_ids)
+            if missing:
+                zipcode_ids.update(_load_zipcode_ids(db, missing))
+
+        # Alerts
+        alert_ids = {}
+        if plans:
+            inserted = db.execute(
+                pg_insert(Alert)
+                .on_conflict_do_nothing(index_elements=[Alert.external_id])
+                .returning(Alert.id, Alert.external_id),
+                [alert_data.dict() for alert_data, *_ in plans]
+            ).all()
+            alert_ids = {external_id: alert_id for alert_id, external_id in inserted}
+            link_alert_categories(db, [
+                (alert_ids[alert_data.external_id], alert_data.event_type)
+                for alert_data, *_ in plans if alert_data.external_id in alert_ids
+            ])
+
+        # Affected areas and mock policyholders
+        area_rows = []
+        policyholder_rows = []
+        server_side_ugcs = []
+        zone_storage = zone_storage_enabled()
+        for alert_data, alert_zones, zone_zipcodes, target_zipcodes in plans:
+            alert_id = alert_ids.get(alert_data.external_id)
+            if alert_id is None:
+                print(f"⏩ Skipping existing alert: {alert_data.external_id}")
+                summary["skipped_existing"] += 1
+                continue
+
+            if server_side and target_zipcodes is None:
+                server_side_ugcs.extend((alert_id, zone_county.code) for zone_county, _ in alert_zones)
+                summary["processed_count"] += 1
+                continue
+
+            if zone_zipcodes:
+                # Zone of each zipcode of the alert; a zipcode in several alerted zones
+                # gets its mock policyholders once, like the per-alert path
+                zipcode_zones = {}
+                for zone_county, zips in zone_zipcodes:
+                    for zip_code in zips:
+                        zipcode_zones[zipcode_ids[zip_code]] = zone_county
+                    if zone_storage and target_zipcodes is None:
+                        # The whole zone is alerted, expanded through the zone -> zipcode mapping
+                        area_rows.append({
+                            "alert_id": alert_id,
+                            "zipcode_id": None,
+                            "zone_county_id": zone_county.id,
+                            "region_type": zone_area_type(zone_county.type),
+                        })
+                        continue
+                    for zip_code in zips:
+                        area_rows.append({
+                            "alert_id": alert_id,
+                            "zipcode_id": zipcode_ids[zip_code],
+                            "zone_county_id": zone_county.id,
+                            "region_type": AreaRegionType.ZIPCODE,
+                        })
+                for zipcode_id, zone_county in zipcode_zones.items():
+                    for _ in range(mock_policyholder_count()):
+                        policyholder_rows.append(mock_policyholder_values(zipcode_id, zone_county))
+            else:
+                # No zipcodes found at all, keep zone/county areas
+                for zone_county, region_type in alert_zones:
+                    area_rows.append({
+                        "alert_id": alert_id,
+                        "zipcode_id": None,
+                        "zone_county_id": zone_county.id,
+                        "region_type": zone_area_type(region_type),
+                    })
+            summary["processed_count"] += 1
+
+        written_policyholders = write_rows(db, Policyholder, policyholder_rows)
+        written_areas = write_rows(db, AlertAffectedArea, area_rows)
+
+        # Zones resolved from the datasets join the zone <-> zipcode association
+        store_zone_zipcodes(db, [
+            (zone_county.id, zipcode_ids[zip_code])
+            for zone_county in unmapped_zones
+            for zip_code in dataset_zipcodes.get(zone_county.code, ()) if zip_code in zipcode_ids
+        ])
+
+        # The remaining alerts are expanded by PostgreSQL from their UGC codes
+        if server_side_ugcs:
+            with sync_stage("server_side_expansion"):
+                area_counts, server_policyholders = expand_affected_areas(db, server_side_ugcs, zone_storage)
+            written_areas += sum(area_counts.values())
+            written_policyholders += server_policyholders
+
+    # The batch is stored: its new resolutions serve the next batches and syncs
+    for ugc_code, zone_county in batch_zones.items():
+        if not zone_county.fips or ugc_code in cached_zones or zone_county.id in server_zone_ids:
+            continue
+        zips = sorted(dataset_zipcodes.get(ugc_code, ()))
+        if all(zip_code in zipcode_ids for zip_code in zips):
+            ugc_cache.stage(
+                ugc_code, ResolvedUgc(zone_county.id, tuple((zip_code, zipcode_ids[zip_code]) for zip_code in zips))
+            )
+
+    summary["new_zones"] = new_zones
+    summary["rows_written"]["policyholders"] = written_policyholders
+    summary["rows_written"]["alert_affected_areas"] = written_areas
+    print(
+        f"Bulk batch: {summary['processed_count']} alerts, {len(new_zones)} new zones/counties, "
+        f"{len(new_zipcode_rows)} new zipcodes, {written_areas} affected areas"
+    )
+    return summary
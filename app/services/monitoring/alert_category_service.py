@@ -0,0 +1,162 @@
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy import insert, literal
+from sqlalchemy.orm import Session
+
+from app.db.lookups import lookup_chunks, matches_any
+from app.models.common.category_event_mappings import CategoryEventMapping
+from app.models.common.events import Event
+from app.models.monitoring.alert import Alert
+from app.models.monitoring.alert_category import AlertCategory
+from app.services.common.dataset_version_service import get_dataset_version, bump_dataset_version, CATEGORY_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class EventNameMatcher:
+    """
+    Aho-Corasick automaton over the lowercased names of every mapped event: one pass
+    over an event_type finds all event names it contains, as the former per-name
+    `event_type ILIKE '%name%'` queries did.
+    """
+
+    def __init__(self, version: int, mappings: Iterable[Tuple[int, int, str]]):
+        self.version = version
+        # (category_id, event_id) pairs reached through each event name
+        self._links: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for category_id, event_id, name in mappings:
+            if name:
+                self._links[name.lower()].append((category_id, event_id))
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[str]] = [[]]
+        for name in self._links:
+            state = 0
+            for char in name:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(name)
+
+        # Breadth-first failure links; every state inherits the outputs of its fallback
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    @classmethod
+    def build(cls, db: Session) -> "EventNameMatcher":
+        version = get_dataset_version(db, CATEGORY_EVENTS)
+        mappings = db.query(
+            CategoryEventMapping.category_id, CategoryEventMapping.event_id, Event.name
+        ).join(Event, CategoryEventMapping.event_id == Event.id).all()
+        return cls(version, mappings)
+
+    def event_names(self, event_type: Optional[str]) -> Set[str]:
+        """Lowercased mapped event names occurring in `event_type`."""
+        found = set()
+        state = 0
+        for char in (event_type or "").lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found.update(self._output[state])
+        return found
+
+    def links(self, event_type: Optional[str]) -> List[Tuple[int, int]]:
+        """(category_id, event_id) of every mapping whose event name occurs in `event_type`."""
+        return [link for name in self.event_names(event_type) for link in self._links[name]]
+
+
+# Matcher shared by all syncs; rebuilt when the category events version changes
+_matcher: Optional[EventNameMatcher] = None
+
+
+def refresh_event_matcher(db: Session) -> EventNameMatcher:
+    """Build the matcher on first use and rebuild it after event names or mappings
+    changed. One primary-key lookup otherwise."""
+    global _matcher
+    if _matcher is None or _matcher.version != get_dataset_version(db, CATEGORY_EVENTS):
+        _matcher = EventNameMatcher.build(db)
+    return _matcher
+
+
+def link_alert_categories(db: Session, alerts: Iterable[Tuple[int, Optional[str]]], replace: bool = False) -> int:
+    """
+    Write the alert_categories rows of (alert id, event_type) pairs with the current
+    matcher; `replace` first deletes the rows of those alerts (their event_type may
+    have changed). Returns the number of rows written.
+    """
+    alerts = list(alerts)
+    matcher = _matcher or refresh_event_matcher(db)
+    if replace:
+        for chunk in lookup_chunks([alert_id for alert_id, _ in alerts]):
+            db.query(AlertCategory).filter(
+                matches_any(db, AlertCategory.alert_id, chunk)
+            ).delete(synchronize_session=False)
+    rows = [
+        {"alert_id": alert_id, "category_id": category_id, "event_id": event_id}
+        for alert_id, event_type in alerts
+        for category_id, event_id in set(matcher.links(event_type))
+    ]
+    if rows:
+        db.execute(insert(AlertCategory), rows)
+    return len(rows)
+
+
+def _link_event_types(db: Session, matcher: EventNameMatcher, event_ids: Optional[Set[int]] = None) -> int:
+    """Link the stored alerts by distinct event_type: the matcher runs once per distinct
+    value and the alerts are selected by equality on the indexed column. With
+    `event_ids`, only the links through those events are written."""
+    written = 0
+    event_types = [event_type for (event_type,) in db.query(Alert.event_type).distinct().all() if event_type]
+    for event_type in event_types:
+        links = {
+            (category_id, event_id) for category_id, event_id in matcher.links(event_type)
+            if event_ids is None or event_id in event_ids
+        }
+        for category_id, event_id in links:
+            written += db.execute(
+                insert(AlertCategory).from_select(
+                    ["alert_id", "category_id", "event_id"],
+                    db.query(Alert.id, literal(category_id), literal(event_id)).filter(Alert.event_type == event_type)
+                )
+            ).rowcount
+    return written
+
+
+def relink_events(db: Session, event_ids: Iterable[int]) -> int:
+    """
+    Incremental rebuild after the name or the mappings of some events changed: their
+    links are deleted and recomputed over the stored alerts, other links are left
+    alone. Bumps the category events version (which commits). Returns the rows written.
+    """
+    event_ids = set(event_ids)
+    db.query(AlertCategory).filter(AlertCategory.event_id.in_(event_ids)).delete(synchronize_session=False)
+    matcher = EventNameMatcher.build(db)
+    written = _link_event_types(db, matcher, event_ids)
+    bump_dataset_version(db, CATEGORY_EVENTS)
+    print(f"Relinked {written} alert categories for events {sorted(event_ids)}")
+    return written
+
+
+def rebuild_alert_categories(db: Session) -> int:
+    """Recompute every alert_categories row and bump the category events version
+    (which commits). Returns the rows written."""
+    db.query(AlertCategory).delete(synchronize_session=False)
+    written = _link_event_types(db, EventNameMatcher.build(db))
+    bump_dataset_version(db, CATEGORY_EVENTS)
+    print(f"Linked {written} alert categories")
+    return written
+
@@ -1,101 +1,226 @@
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple
+from sqlalchemy.orm import Session, aliased, joinedload, lazyload, load_only
+from sqlalchemy import and_, or_, func
 from app.models.monitoring.alert import Alert, AlertSeverity
 from app.models.common.category import Category
-from app.models.common.category_event_mappings import CategoryEventMapping
-from app.models.common.events import Event
+from app.models.monitoring.alert_category import AlertCategory
 from app.models.common.state import State
 from app.models.common.zones_counties import ZoneCounty, RegionType
-from app.models.monitoring.alert_affected_area import AlertAffectedArea, RegionType as AreaRegionType
 from app.models.common.zipcodes import Zipcode
 from app.models.common.policyholders import Policyholder
+from app.services.monitoring.exposure_service import get_zipcode_exposures
+from app.services.monitoring.affected_area_service import get_alerts_zone_zipcode_ids
+from app.services.monitoring.county_zipcode_service import get_county_zipcode_weights
+from app.services.monitoring.ugc_zipcode_service import get_ugc_zipcode_weights
+from app.db.lookups import lookup_chunks, matches_any
+from app.core.config import settings
+from collections import defaultdict
+import base64
+import itertools
+import json
 
 import logging
 
 logger = logging.getLogger(__name__)
 
-def alert_to_dict(alert: Alert, db: Session = None) -> Dict[str, Any]:
-    """Convert Alert model to dictionary."""
-    # Get state code if state is available
-    state_code = None
-    if hasattr(alert, 'state') and alert.state:
-        state_code = alert.state.code
-
-    # Initialize affected_areas structure
-    alert_affected_areas = []
-    
-    if db:
-        # Get affected areas for this alert
-        affected_areas = (
-            db.query(AlertAffectedArea)
-            .filter(AlertAffectedArea.alert_id == alert.id)
-            .all()
-        )
+# Statements get_alerts_grouped_by_category_with_zipcodes may run when every lookup fits
+# in one ALERT_LOOKUP_CHUNK_SIZE chunk: categories, alerts through alert_categories, then
+# the hierarchy (affected areas, zone mapping, exposures, zipcodes, policyholders,
+# zones/counties, county weights, zone weights, states). Checked by
+# tests/test_query_budget.py.
+CATEGORY_RISK_QUERY_BUDGET = 11
+
+# Levels of the category-risk payload below the categories, each requiring the previous one
+CATEGORY_RISK_INCLUDES = ("alerts", "affected_areas", "policyholders")
+
+# Serialized alert fields with the column each one is read from
+ALERT_FIELDS = {
+    "id": (Alert.id, lambda alert: alert.id),
+    "event_id": (Alert.external_id, lambda alert: alert.external_id),
+    "event_type": (Alert.event_type, lambda alert: alert.event_type),
+    "event_timestamp": (
+        Alert.event_timestamp, lambda alert: alert.event_timestamp.isoformat() if alert.event_timestamp else None
+    ),
+    "event_title": (Alert.title, lambda alert: alert.title),
+    "event_description": (Alert.description, lambda alert: alert.description),
+    "severity": (Alert.severity, lambda alert: alert.severity.value if alert.severity else None),
+    "status": (Alert.status, lambda alert: alert.status.value if alert.status else None),
+    "source": (Alert.source, lambda alert: alert.source),
+}
+
+# Keys of the position held by each kind of pagination cursor
+CURSOR_KEYS = {
+    "categories": ("after",),
+    "alerts": ("category", "after"),
+    "policyholders": ("alert", "zipcode", "after"),
+}
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Opaque pagination cursor: the position after the last item of a page."""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Position held by a cursor from encode_cursor; ValueError when it is not one."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or position.get("k") not in CURSOR_KEYS or any(
+        key not in position for key in CURSOR_KEYS[position["k"]]
+    ):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def _policyholders_query(db: Session, zipcode_ids: List[int], after_id: Optional[int], limit: Optional[int]):
+    """Active policyholders of several zipcodes by id, at most `limit` + 1 per zipcode
+    (the extra one tells that a next page exists)."""
+    query = db.query(Policyholder).filter(
+        matches_any(db, Policyholder.zipcode_id, zipcode_ids),
+        Policyholder.status == True
+    )
+    if after_id:
+        query = query.filter(Policyholder.id > after_id)
+    if not limit:
+        return query.order_by(Policyholder.id)
+    rank = func.row_number().over(partition_by=Policyholder.zipcode_id, order_by=Policyholder.id).label("rank")
+    ranked = query.add_columns(rank).subquery()
+    holder = aliased(Policyholder, ranked)
+    return db.query(holder).filter(ranked.c.rank <= limit + 1).order_by(holder.id)
+
+
+def load_alert_hierarchies(
+    db: Session,
+    alerts: List[Alert],
+    include_policyholders: bool = True,
+    policyholders_limit: Optional[int] = None,
+    policyholders_after: Optional[Tuple[int, int]] = None,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Build the state -> county/zone -> zipcode -> policyholder hierarchy of several
+    alerts, keyed by alert id, with a fixed number of queries per lookup chunk whatever
+    the number of alerts, zones, zipcodes or policyholders. Only zipcodes with active
+    policyholders are listed; policyholder totals come from zipcode_exposure, and are
+    also given weighted by the share of the zipcode inside the zone/county (from
+    county_zipcodes for counties, ugc_zipcodes for zones; 1 when unknown).
+
+    Without `include_policyholders` the policyholders are not queried at all and only
+    the totals are listed. `policyholders_limit` pages the policyholders of each zipcode,
+    a truncated list gets a policyholders_next_cursor. `policyholders_after` (zipcode id,
+    policyholder id) narrows the hierarchy to the page of that cursor.
+    """
+    zone_zipcode_ids = get_alerts_zone_zipcode_ids(db, [alert.id for alert in alerts])
+    if policyholders_after:
+        zone_zipcode_ids = {
+            alert_id: {
+                zone_id: [zipcode_id for zipcode_id in zipcode_ids if zipcode_id == policyholders_after[0]]
+                for zone_id, zipcode_ids in zones.items()
+            }
+            for alert_id, zones in zone_zipcode_ids.items()
+        }
+    all_zipcode_ids = {
+        zipcode_id
+        for zones in zone_zipcode_ids.values()
+        for zipcode_ids in zones.values()
+        for zipcode_id in zipcode_ids
+    }
 
+    exposures = get_zipcode_exposures(db, all_zipcode_ids)
+    exposed_ids = [zipcode_id for zipcode_id, exposure in exposures.items() if exposure.policyholder_count > 0]
+    zipcodes = {}
+    policyholders_by_zipcode = defaultdict(list)
+    for chunk in lookup_chunks(exposed_ids):
+        zipcodes.update({z.id: z for z in db.query(Zipcode).filter(matches_any(db, Zipcode.id, chunk)).all()})
+    for chunk in lookup_chunks(exposed_ids if include_policyholders else []):
+        after_id = policyholders_after[1] if policyholders_after else None
+        for p in _policyholders_query(db, chunk, after_id, policyholders_limit).all():
+            policyholders_by_zipcode[p.zipcode_id].append(p)
+
+    # Zones/counties of the alerts and of the policyholders, and the policyholders' states
+    policyholders = [p for holders in policyholders_by_zipcode.values() for p in holders]
+    zone_ids = {zone_id for zones in zone_zipcode_ids.values() for zone_id in zones}
+    zone_ids.update(p.county_id for p in policyholders if p.county_id)
+    zone_counties = {}
+    for chunk in lookup_chunks(list(zone_ids)):
+        zone_counties.update({z.id: z for z in db.query(ZoneCounty).filter(matches_any(db, ZoneCounty.id, chunk)).all()})
+    # Share of each zipcode inside the alerted zones/counties, from the weighted indexes:
+    # a zipcode straddling a county line only counts for its part of the county
+    alert_zones = [
+        zone_counties[zone_id]
+        for zone_id in {zone_id for zones in zone_zipcode_ids.values() for zone_id in zones}
+        if zone_id in zone_counties
+    ]
+    county_weights = get_county_zipcode_weights(
+        db, {zone.fips for zone in alert_zones if zone.type == RegionType.COUNTY and zone.fips}
+    )
+    zone_weights = get_ugc_zipcode_weights(db, {zone.code for zone in alert_zones if zone.type != RegionType.COUNTY})
+    state_names = {}
+    state_ids = list({p.state_id for p in policyholders if p.state_id})
+    for chunk in lookup_chunks(state_ids):
+        state_names.update(db.query(State.id, State.name).filter(matches_any(db, State.id, chunk)).all())
+
+    hierarchies = {}
+    for alert in alerts:
+        # Get state code if state is available
+        state_code = alert.state.code if alert.state else None
         state_details = {}
-        processed_zones = set()
 
-        for area in affected_areas:
-            if not area.zone_county_id or area.zone_county_id in processed_zones:
-                continue
-
-            processed_zones.add(area.zone_county_id)
-            zone_county = db.query(ZoneCounty).filter(ZoneCounty.id == area.zone_county_id).first()
+        for zone_county_id, zipcode_ids in zone_zipcode_ids.get(alert.id, {}).items():
+            zone_county = zone_counties.get(zone_county_id)
             if not zone_county:
                 continue
 
-            # Get all zipcodes for this zone/county
-            zipcode_areas = (
-                db.query(AlertAffectedArea)
-                .filter(
-                    and_(
-                        AlertAffectedArea.alert_id == alert.id,
-                        AlertAffectedArea.zone_county_id == zone_county.id,
-                        AlertAffectedArea.region_type == AreaRegionType.ZIPCODE
-                    )
-                )
-                .all()
-            )
-
+            if zone_county.type == RegionType.COUNTY:
+                weights = county_weights.get(zone_county.fips, {})
+            else:
+                weights = zone_weights.get(zone_county.code, {})
             zipcode_details = []
             policyholders_info = []
-            for zip_area in zipcode_areas:
-                if not zip_area.zipcode_id:
-                    continue
-
-                zipcode = db.query(Zipcode).filter(Zipcode.id == zip_area.zipcode_id).first()
+            for zipcode_id in zipcode_ids:
+                zipcode = zipcodes.get(zipcode_id)
                 if zipcode:
-                     # Get actual policyholder count for this zipcode
-                        policyholder_count = db.query(Policyholder).filter(
-                            Policyholder.zipcode_id == zip_area.zipcode_id,
-                            Policyholder.status == True
-                        ).count()
-                        
-                        if policyholder_count > 0:
-                            zipcode_details.append(zipcode.code)
-                            policyholders_info.append({
-                                "zipcode": zipcode.code,
-                                "policyholder_count": policyholder_count,
-                                "policyholders": [
-                                    {
-                                        "id": p.id,
-                                        "policy_id": p.policy_id,
-                                        "name": p.name,
-                                        "email": p.email,
-                                        "phoneno": p.phoneno,
-                                        "address": p.address,
-                                        "state": db.query(State).filter(State.id == p.state_id).first().name if p.state_id else None,
-                                        "county": db.query(ZoneCounty).filter(ZoneCounty.id == p.county_id).first().code if p.county_id else None,
-                                        "claims": p.claims,
-                                        "premium": p.premium
-                                    }
-                                    for p in db.query(Policyholder).filter(
-                                        Policyholder.zipcode_id == zip_area.zipcode_id,
-                                        Policyholder.status == True
-                                    ).all()
-                                ]
-                            })
+                    exposure = exposures[zipcode_id]
+                    zipcode_details.append(zipcode.code)
+                    zipcode_info = {
+                        "zipcode": zipcode.code,
+                        "policyholder_count": exposure.policyholder_count,
+                        "total_premium": exposure.total_premium,
+                        "total_claims": exposure.total_claims,
+                    }
+                    weight = weights.get(zipcode.code)
+                    weight = 1.0 if weight is None else weight
+                    zipcode_info.update({
+                        "weight": weight,
+                        "weighted_policyholder_count": exposure.policyholder_count * weight,
+                        "weighted_total_premium": exposure.total_premium * weight,
+                        "weighted_total_claims": exposure.total_claims * weight,
+                    })
+                    policyholders_info.append(zipcode_info)
+                    if not include_policyholders:
+                        continue
+                    holders = policyholders_by_zipcode[zipcode_id]
+                    if policyholders_limit and len(holders) > policyholders_limit:
+                        holders = holders[:policyholders_limit]
+                        zipcode_info["policyholders_next_cursor"] = encode_cursor({
+                            "k": "policyholders", "alert": alert.id, "zipcode": zipcode_id, "after": holders[-1].id
+                        })
+                    zipcode_info["policyholders"] = [
+                            {
+                                "id": p.id,
+                                "policy_id": p.policy_id,
+                                "name": p.name,
+                                "email": p.email,
+                                "phoneno": p.phoneno,
+                                "address": p.address,
+                                "state": state_names.get(p.state_id) if p.state_id else None,
+                                "county": zone_counties[p.county_id].code if p.county_id in zone_counties else None,
+                                "claims": p.claims,
+                                "premium": p.premium
+                            }
+                            for p in holders
+                        ]
 
             if zipcode_details:  # Only add if there are zipcodes
                 if state_code not in state_details:
@@ -103,7 +228,7 @@ def alert_to_dict(alert: Alert, db: Session = None) -> Dict[str, Any]:
                         "state": state_code,
                         "county_zone": [],
                     }
-                
+
                 zone_info = {
                     "type": zone_county.type.value,
                     "name": zone_county.name,
@@ -113,202 +238,249 @@ def alert_to_dict(alert: Alert, db: Session = None) -> Dict[str, Any]:
                 }
                 state_details[state_code]["county_zone"].append(zone_info)
 
-        alert_affected_areas = list(state_details.values())
+        hierarchies[alert.id] = list(state_details.values())
+    return hierarchies
 
-    return {
-        "id": alert.id,
-        "event_id": alert.external_id,
-        "event_type": alert.event_type,
-        "event_timestamp": alert.event_timestamp.isoformat() if alert.event_timestamp else None,
-        "event_title": alert.title,
-        "event_description": alert.description,
-        "severity": alert.severity.value if alert.severity else None,
-        "status": alert.status.value if alert.status else None,
-        # "state": state_code,
-        "source": alert.source,
-        # "created_at": alert.created_at.isoformat() if alert.created_at else None,
-        # "updated_at": alert.updated_at.isoformat() if alert.updated_at else None,
-        "affected_areas": alert_affected_areas
+
+def _alert_dict(
+    alert: Alert, affected_areas: Optional[List[Dict[str, Any]]], fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Serialize the ALERT_FIELDS listed in `fields` (all by default); only their columns
+    are read. affected_areas is left out when None."""
+    item = {
+        name: serialize(alert) for name, (_, serialize) in ALERT_FIELDS.items() if fields is None or name in fields
     }
+    if affected_areas is not None:
+        item["affected_areas"] = affected_areas
+    return item
+
+
+def alerts_to_dicts(db: Session, alerts: List[Alert]) -> List[Dict[str, Any]]:
+    """Convert several Alert models to dictionaries with one batched hierarchy load."""
+    hierarchies = load_alert_hierarchies(db, alerts)
+    return [_alert_dict(alert, hierarchies.get(alert.id, [])) for alert in alerts]
+
+
+def alert_to_dict(alert: Alert, db: Session = None) -> Dict[str, Any]:
+    """Convert Alert model to dictionary; the affected areas are only loaded with a session."""
+    if db:
+        return alerts_to_dicts(db, [alert])[0]
+    return _alert_dict(alert, [])
+
+
+def resolve_category_risk_includes(include: Optional[Iterable[str]]) -> Set[str]:
+    """The levels of CATEGORY_RISK_INCLUDES to load for `include` (everything when None),
+    each level adding the ones before it. Raises ValueError for an unknown level."""
+    include = set(CATEGORY_RISK_INCLUDES if include is None else include)
+    unknown = include - set(CATEGORY_RISK_INCLUDES)
+    if unknown:
+        raise ValueError(f"Unknown include {', '.join(sorted(unknown))}, expected {', '.join(CATEGORY_RISK_INCLUDES)}")
+    for level, parent in reversed(list(zip(CATEGORY_RISK_INCLUDES[1:], CATEGORY_RISK_INCLUDES))):
+        if level in include:
+            include.add(parent)
+    return include
+
+
+def _categories_query(db: Session, category: Optional[str]):
+    """Active categories by id, only the one named `category` unless it is None or "all"."""
+    query = db.query(Category).filter(Category.status == True).order_by(Category.id)
+    if category and category != "all":
+        query = query.filter(func.lower(Category.name) == category.lower())
+    return query
+
+
+def _link_filters(
+    db: Session, category_ids: List[int], state: Optional[str], severity: Optional[AlertSeverity]
+) -> list:
+    """Filters on alert_categories keeping the links of `category_ids` to the alerts of a
+    state code and of a severity ("all" or None for no filter)."""
+    link_filters = [AlertCategory.category_id.in_(category_ids)]
+    alert_filters = []
+    if state and state != "all":
+        alert_filters.append(Alert.state_id.in_(db.query(State.id).filter(State.code == state)))
+    if severity and severity != "all":
+        alert_filters.append(Alert.severity == severity)
+    if alert_filters:
+        link_filters.append(AlertCategory.alert_id.in_(db.query(Alert.id).filter(*alert_filters)))
+    return link_filters
+
 
 def get_alerts_grouped_by_category_with_zipcodes(
     db: Session,
     state: Optional[str] = None,
     severity: Optional[AlertSeverity] = None,
     category: Optional[str] = None,
+    **page_options,
 ) -> List[Dict[str, Any]]:
     """
     Extended version of get_alerts_grouped_by_category that includes detailed zipcode information
-    grouped by state and county/zone.
+    grouped by state and county/zone. `page_options` are those of get_category_risk_page.
     """
+    return get_category_risk_page(db, state=state, severity=severity, category=category, **page_options)[0]
+
+
+def get_category_risk_page(
+    db: Session,
+    state: Optional[str] = None,
+    severity: Optional[AlertSeverity] = None,
+    category: Optional[str] = None,
+    include: Optional[Iterable[str]] = None,
+    fields: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None,
+    alerts_limit: Optional[int] = None,
+    policyholders_limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of the categories with their alerts and zipcode details, and the cursor of
+    the next page of categories (None on the last one).
+
+    - state / severity / category: keep the alerts of a state code and of a severity,
+      and the category of that name ("all" or None for no filter).
+    - include: levels of CATEGORY_RISK_INCLUDES to load, each implying the ones before
+      it; everything by default. The queries of the levels left out are not run.
+    - fields: ALERT_FIELDS to serialize (all by default); only their columns are read.
+    - limit / alerts_limit / policyholders_limit: page sizes of the categories, of the
+      alerts of each category and of the policyholders of each zipcode. Truncated
+      lists get a cat_events_next_cursor / policyholders_next_cursor.
+    - cursor: a cursor returned by a previous page, which narrows this page to the
+      continuation of its list. Raises ValueError for an invalid cursor, include or field.
+    """
+    include = resolve_category_risk_includes(include)
+    if fields is not None:
+        fields = set(fields)
+        unknown = fields - set(ALERT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown field {', '.join(sorted(unknown))}, expected {', '.join(ALERT_FIELDS)}")
+    position = decode_cursor(cursor) if cursor else {"k": None}
+
     results = []
-    categories = db.query(Category).filter(Category.status == True).all()
+    categories_query = _categories_query(db, category)
+    if position["k"] == "categories":
+        categories_query = categories_query.filter(Category.id > position["after"])
+    elif position["k"] == "alerts":
+        categories_query = categories_query.filter(Category.id == position["category"])
+    elif position["k"] == "policyholders":
+        categories_query = categories_query.filter(Category.id.in_(
+            db.query(AlertCategory.category_id).filter(AlertCategory.alert_id == position["alert"])
+        ))
+    if limit and position["k"] in (None, "categories"):
+        categories_query = categories_query.limit(limit + 1)
+    categories = categories_query.all()
+    next_cursor = None
+    if limit and position["k"] in (None, "categories") and len(categories) > limit:
+        categories = categories[:limit]
+        next_cursor = encode_cursor({"k": "categories", "after": categories[-1].id})
+    category_ids = [cat.id for cat in categories]
+
+    # Alerts of the categories, by mapped event then id; an alert appears once per
+    # mapped event name found in its event_type
+    link_filters = _link_filters(db, category_ids, state, severity)
+    # The counts cover the whole filtered lists, whatever the page
+    count_filters = list(link_filters)
+    if position["k"] == "alerts":
+        after_event_id, after_alert_id = position["after"]
+        link_filters.append(or_(
+            AlertCategory.event_id > after_event_id,
+            and_(AlertCategory.event_id == after_event_id, AlertCategory.alert_id > after_alert_id)
+        ))
+    elif position["k"] == "policyholders":
+        link_filters.append(AlertCategory.alert_id == position["alert"])
+
+    try:
+        # Start with basic query and always join with State; one indexed join over the
+        # links written at ingestion loads the alerts of every category
+        if alerts_limit:
+            # At most alerts_limit + 1 links per category (the extra one tells that a
+            # next page exists)
+            rank = func.row_number().over(
+                partition_by=AlertCategory.category_id, order_by=(AlertCategory.event_id, AlertCategory.alert_id)
+            ).label("rank")
+            ranked = db.query(
+                AlertCategory.category_id, AlertCategory.event_id, AlertCategory.alert_id, rank
+            ).filter(*link_filters).subquery()
+            base_query = (
+                db.query(ranked.c.category_id, ranked.c.event_id, Alert)
+                .join(Alert, Alert.id == ranked.c.alert_id)
+                .filter(ranked.c.rank <= alerts_limit + 1)
+                .order_by(ranked.c.category_id, ranked.c.event_id, Alert.id)
+            )
+        else:
+            base_query = (
+                db.query(AlertCategory.category_id, AlertCategory.event_id, Alert)
+                .join(Alert, Alert.id == AlertCategory.alert_id)
+                .filter(*link_filters)
+                .order_by(AlertCategory.category_id, AlertCategory.event_id, Alert.id)
+            )
+        # The state is only read by the affected areas
+        base_query = base_query.options(
+            joinedload(Alert.state) if "affected_areas" in include else lazyload(Alert.state)
+        )
+        if fields is not None:
+            base_query = base_query.options(load_only(
+                Alert.id, Alert.state_id, *[ALERT_FIELDS[name][0] for name in fields]
+            ))
+
+        links = []
+        if categories and "alerts" in include:
+            links = base_query.all()
+
+    except Exception as e:
+        logger.error(f"Error building alert query: {str(e)}")
+        raise
+
+    matched_by_category = defaultdict(list)
+    for category_id, event_id, alert in links:
+        matched_by_category[category_id].append((event_id, alert))
+    next_alert_cursors = {}
+    if alerts_limit:
+        for category_id, matched in matched_by_category.items():
+            if len(matched) > alerts_limit:
+                del matched[alerts_limit:]
+                event_id, alert = matched[-1]
+                next_alert_cursors[category_id] = encode_cursor(
+                    {"k": "alerts", "category": category_id, "after": [event_id, alert.id]}
+                )
 
-    for cat in categories:
-        # Get all event names mapped to this category
-        event_names = (
-            db.query(Event.name)
-            .join(CategoryEventMapping, CategoryEventMapping.event_id == Event.id)
-            .filter(CategoryEventMapping.category_id == cat.id)
+    # Whole lists count themselves, the others are counted in one grouped query
+    counts = None
+    if categories and ("alerts" not in include or alerts_limit or position["k"] in ("alerts", "policyholders")):
+        counts = dict(
+            db.query(AlertCategory.category_id, func.count())
+            .filter(*count_filters)
+            .group_by(AlertCategory.category_id)
             .all()
         )
 
-        event_names = [name[0] for name in event_names if name[0]]
-        try:
-            # Start with basic query and always join with State
-            base_query = db.query(Alert).options(joinedload(Alert.state))
-            
-            # Add state filter if provided
-            # # Add joins and filters
-            # if state and state != "all":
-            #     base_query = (
-            #         base_query
-            #         .join(State, Alert.state_id == State.id)
-            #         .filter(State.code == state)
-            #     )
-            # if severity and severity != "all":
-            #     base_query = base_query.filter(Alert.severity == severity)
-
-            logger.info("Built basic query without filters")
-                
-        except Exception as e:
-            logger.error(f"Error building alert query: {str(e)}")
-            raise
-
-        matched_alerts = []
-        for event_name in event_names:
-            alerts = base_query.filter(Alert.event_type.ilike(f"%{event_name}%")).all()
-            matched_alerts.extend(alerts)
-
-        active_count = len(matched_alerts)
-
-        # Process affected areas with detailed information
-        # state_details = {}
-        # for alert in matched_alerts:
-        #     if not alert.state_id:
-        #         continue
-
-        #     try:
-        #         # Get state from database if it's not loaded
-        #         if alert.state_id:
-        #             if not alert.state:
-        #                 state = db.query(State).filter(State.id == alert.state_id).first()
-        #             else:
-        #                 state = alert.state
-
-        #             if not state:
-        #                 logger.warning(f"No state found for alert {alert.id} with state_id {alert.state_id}")
-        #                 continue
-
-        #             state_code = state.code
-        #             logger.debug(f"Processing state {state_code} for alert {alert.id}")
-        #         else:
-        #             logger.warning(f"No state_id for alert {alert.id}")
-        #             continue
-        #     except Exception as e:
-        #         logger.error(f"Error processing state for alert {alert.id}: {str(e)}")
-        #         continue
-        #     if state_code not in state_details:
-        #         state_details[state_code] = {
-        #             "state": state_code,
-        #             "county_zone": [],
-        #         }
-
-        #     # Get affected areas for this alert
-        #     affected_areas = (
-        #         db.query(AlertAffectedArea)
-        #         .filter(AlertAffectedArea.alert_id == alert.id)
-        #         .all()
-        #     )
-
-            # Process each affected area
-            # processed_zones = set()  # Track processed zones to avoid duplicates
-            # for area in affected_areas:
-            #     if not area.zone_county_id or area.zone_county_id in processed_zones:
-            #         continue
-
-            #     processed_zones.add(area.zone_county_id)
-            #     zone_county = db.query(ZoneCounty).filter(ZoneCounty.id == area.zone_county_id).first()
-            #     if not zone_county:
-            #         continue
-
-            #     # Get all zipcodes for this zone/county
-            #     zipcode_areas = (
-            #         db.query(AlertAffectedArea)
-            #         .filter(
-            #             and_(
-            #                 AlertAffectedArea.alert_id == alert.id,
-            #                 AlertAffectedArea.zone_county_id == zone_county.id,
-            #                 AlertAffectedArea.region_type == AreaRegionType.ZIPCODE
-            #             )
-            #         )
-            #         .all()
-            #     )
-
-            #     zipcode_details = []
-            #     policyholders_info = []
-            #     for zip_area in zipcode_areas:
-            #         if not zip_area.zipcode_id:
-            #             continue
-
-            #         zipcode = db.query(Zipcode).filter(Zipcode.id == zip_area.zipcode_id).first()
-            #         if zipcode:
-            #             # Get actual policyholder count for this zipcode
-            #             policyholder_count = db.query(Policyholder).filter(
-            #                 Policyholder.zipcode_id == zip_area.zipcode_id,
-            #                 Policyholder.status == True
-            #             ).count()
-                        
-            #             if policyholder_count > 0:
-            #                 zipcode_details.append(zipcode.code)
-            #                 policyholders_info.append({
-            #                     "zipcode": zipcode.code,
-            #                     "policyholder_count": policyholder_count,
-            #                     "policyholders": [
-            #                         {
-            #                             "id": p.id,
-            #                             "policy_id": p.policy_id,
-            #                             "name": p.name,
-            #                             "email": p.email,
-            #                             "phoneno": p.phoneno,
-            #                             "address": p.address,
-            #                             "state": db.query(State).filter(State.id == p.state_id).first().name if p.state_id else None,
-            #                             "county": db.query(ZoneCounty).filter(ZoneCounty.id == p.county_id).first().code if p.county_id else None,
-            #                             "claims": p.claims,
-            #                             "premium": p.premium
-            #                         }
-            #                         for p in db.query(Policyholder).filter(
-            #                             Policyholder.zipcode_id == zip_area.zipcode_id,
-            #                             Policyholder.status == True
-            #                         ).all()
-            #                     ]
-            #                 })
-
-            #     if zipcode_details:  # Only add if there are zipcodes with policyholders
-            #         zone_info = {
-            #             "type": zone_county.type.value,
-            #             "name": zone_county.name,
-            #             "code": zone_county.code,
-            #             "zipcodes": zipcode_details,
-            #             "policyholders_info": policyholders_info
-            #         }
-            #         state_details[state_code]["county_zone"].append(zone_info)
-
-        # Convert state_details to list and calculate totals
-        # affected_areas = list(state_details.values())
-
-        # Assign dynamic class based on activeCount
-        # active_class = (
-        #     "bg-red-600" if active_count >= 100
-        #     else "bg-orange-500" if active_count >= 50
-        #     else "bg-yellow-400" if active_count >= 10
-        #     else "bg-green-400"
-        # )
+    # Hierarchy of every matched alert, loaded once for all categories
+    unique_alerts = list({
+        alert.id: alert for matched in matched_by_category.values() for _, alert in matched
+    }.values())
+    hierarchies = {}
+    if "affected_areas" in include and unique_alerts:
+        hierarchies = load_alert_hierarchies(
+            db, unique_alerts,
+            include_policyholders="policyholders" in include,
+            policyholders_limit=policyholders_limit,
+            policyholders_after=(
+                (position["zipcode"], position["after"]) if position["k"] == "policyholders" else None
+            ),
+        )
+    serialized = {
+        alert.id: _alert_dict(
+            alert, hierarchies.get(alert.id, []) if "affected_areas" in include else None, fields
+        )
+        for alert in unique_alerts
+    }
+
+    for cat in categories:
+        matched_alerts = [alert for _, alert in matched_by_category.get(cat.id, [])]
+        active_count = counts.get(cat.id, 0) if counts is not None else len(matched_alerts)
 
         # Convert Alert objects to dictionaries
-        serialized_alerts = [alert_to_dict(alert, db) for alert in matched_alerts]
+        serialized_alerts = [serialized[alert.id] for alert in matched_alerts]
         
-        results.append({
+        category_result = {
             "cat_id": cat.id,
             # "imageUrl": cat.image_url,
             "cat_title": cat.name,
@@ -317,7 +489,123 @@ def get_alerts_grouped_by_category_with_zipcodes(
             # "activeClass": active_class,
             # "affectedAreas": affected_areas,
             # "lastViewed": 'Just now',
-            "cat_events": serialized_alerts
-        })
+        }
+        if "alerts" in include:
+            category_result["cat_events"] = serialized_alerts
+            if cat.id in next_alert_cursors:
+                category_result["cat_events_next_cursor"] = next_alert_cursors[cat.id]
+        results.append(category_result)
+
+    return results, next_cursor
+
+
+def _category_header(cat: Category, active_count: int) -> Dict[str, Any]:
+    return {
+        "cat_id": cat.id,
+        "cat_title": cat.name,
+        "cat_description": cat.description,
+        "activeCount": active_count,
+    }
+
 
-    return results
+def iter_category_risk(
+    db: Session,
+    state: Optional[str] = None,
+    severity: Optional[AlertSeverity] = None,
+    category: Optional[str] = None,
+    include: Optional[Iterable[str]] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Same content as get_category_risk_page with the same filters and include, one item
+    at a time: ("category", header) for every active category by id, followed by
+    ("alert", alert dict) for each of its alerts. The alerts are read through a
+    server-side cursor `batch_size` at a time, each batch with one hierarchy load.
+    Nothing references a batch once it is written (the session's identity map is
+    weak), so memory does not grow with the number of alerts.
+    """
+    include = resolve_category_risk_includes(include)
+    batch_size = batch_size or settings.CATEGORY_RISK_STREAM_BATCH_SIZE
+    categories = _categories_query(db, category).all()
+    category_ids = [cat.id for cat in categories]
+    if not categories:
+        return
+    link_filters = _link_filters(db, category_ids, state, severity)
+    counts = dict(
+        db.query(AlertCategory.category_id, func.count())
+        .filter(*link_filters)
+        .group_by(AlertCategory.category_id)
+        .all()
+    )
+    headers = iter([_category_header(cat, counts.get(cat.id, 0)) for cat in categories])
+    if "alerts" not in include:
+        yield from (("category", header) for header in headers)
+        return
+
+    with_areas = "affected_areas" in include
+    links = (
+        db.query(AlertCategory.category_id, AlertCategory.event_id, Alert)
+        .join(Alert, Alert.id == AlertCategory.alert_id)
+        # The state is only read by the affected areas
+        .options(joinedload(Alert.state) if with_areas else lazyload(Alert.state))
+        .filter(*link_filters)
+        .order_by(AlertCategory.category_id, AlertCategory.event_id, Alert.id)
+        .yield_per(batch_size)
+    )
+    current_id = None
+    rows = iter(links)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        hierarchies = {}
+        if with_areas:
+            hierarchies = load_alert_hierarchies(
+                db, list({alert.id: alert for _, _, alert in batch}.values()),
+                include_policyholders="policyholders" in include,
+            )
+        for category_id, _, alert in batch:
+            # Categories without alerts are written as they are passed
+            while current_id != category_id:
+                header = next(headers)
+                current_id = header["cat_id"]
+                yield "category", header
+            yield "alert", _alert_dict(alert, hierarchies.get(alert.id, []) if with_areas else None)
+    for header in headers:
+        yield "category", header
+
+
+def stream_category_risk_ndjson(db: Session, **options) -> Iterator[bytes]:
+    """Newline-delimited JSON: a category header line, then one {"cat_id", "cat_event"}
+    line per alert of the category. `options` are those of iter_category_risk."""
+    current_id = None
+    for kind, item in iter_category_risk(db, **options):
+        if kind == "category":
+            current_id = item["cat_id"]
+            line = item
+        else:
+            line = {"cat_id": current_id, "cat_event": item}
+        yield json.dumps(line, separators=(",", ":")).encode() + b"\n"
+
+
+def stream_category_risk_json(db: Session, **options) -> Iterator[bytes]:
+    """The JSON array returned by get_category_risk_page, written incrementally: each
+    category object is opened with its header and its cat_events array is filled one
+    alert at a time. `options` are those of iter_category_risk."""
+    with_alerts = "alerts" in resolve_category_risk_includes(options.get("include"))
+    yield b"["
+    first_category = True
+    first_alert = True
+    for kind, item in iter_category_risk(db, **options):
+        if kind == "category":
+            if with_alerts:
+                opening = json.dumps(item, separators=(",", ":"))[:-1] + ',"cat_events":['
+                yield (b"" if first_category else b"]},") + opening.encode()
+            else:
+                yield (b"" if first_category else b",") + json.dumps(item, separators=(",", ":")).encode()
+            first_category = False
+            first_alert = True
+        else:
+            yield (b"" if first_alert else b",") + json.dumps(item, separators=(",", ":")).encode()
+            first_alert = False
+    yield b"]}]" if with_alerts and not first_category else b"]"
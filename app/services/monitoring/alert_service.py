@@ -4,24 +4,57 @@ from sqlalchemy.orm import Session
 from app.models.monitoring.alert import Alert, AlertSeverity, AlertStatus
 from app.models.common.category import Category
 from app.schemas.monitoring.alert import AlertCreate
-from typing import List, Optional, Tuple, Set, Dict, Any
-from app.models.common.category_event_mappings import CategoryEventMapping
-from app.models.common.events import Event
+from typing import List, Optional, Tuple, Set, Dict, Any, Iterable, Iterator, AsyncIterator
+from app.models.monitoring.alert_category import AlertCategory
 from app.models.common.state import State
 from app.models.common.zones_counties import ZoneCounty, RegionType
 from app.models.monitoring.alert_affected_area import AlertAffectedArea, RegionType as AreaRegionType
 from app.models.common.zipcodes import Zipcode
-from app.models.monitoring.alert_sync_log import AlertSyncLog
+from app.models.monitoring.alert_sync_log import AlertSyncLog, SyncStatus
 from app.services.monitoring.alert_zipcode_service import process_zipcodes_with_dataset
+from app.services.monitoring.zipcode_index import refresh_county_zip_index
+from app.services.monitoring.ugc_zipcode_service import resolve_ugc_zipcodes, refresh_ugc_zipcodes_version
+from app.services.monitoring.ugc_cache import ugc_cache, refresh_ugc_cache, ResolvedUgc
+from app.services.monitoring.geometry_targeting import refresh_zip_centroid_grid, resolve_geometry_zipcodes
+from app.services.monitoring.affected_area_service import zone_storage_enabled, zone_area_type, get_zone_zipcodes
+from app.services.monitoring.alert_category_service import refresh_event_matcher, link_alert_categories
+from app.core.config import settings
+from app.services.monitoring.weather_client import send_with_retry, WeatherFeedError
+from app.services.monitoring.alert_sync_worker import run_in_ingest_worker
+from app.services.monitoring.sync_metrics import StageTimer, track_sync, sync_stage, percentile
+from app.services.monitoring.policyholder_service import mock_policyholder_count, mock_policyholder_values
+from app.services.monitoring.alert_bulk_service import persist_alerts_bulk, load_stored_alerts
+from app.db.bulk_writer import write_rows
 import random
 from collections import defaultdict
 import logging
 from app.models.common.policyholders import Policyholder
-import string
-import uuid
+import hashlib
+import tempfile
+import time
+import json
+import itertools
+import asyncio
+import ijson
 
 logger = logging.getLogger(__name__)
 
+ALERTS_FEED_URL = "https://api.weather.gov/alerts/active"
+# Bytes read at a time from a spooled feed body
+FEED_SPOOL_READ_BYTES = 64 * 1024
+
+# Validators (ETag, Last-Modified, body hash) of the last feed response whose
+# alerts were committed, keyed by request URL.
+_feed_validators: Dict[str, Dict[str, Optional[str]]] = {}
+# Validators of the most recent fetch; promoted once its alerts are committed so
+# that a failed sync is retried on the next poll instead of answered with a 304.
+_pending_validators: Dict[str, Dict[str, Optional[str]]] = {}
+
+
+class FeedBodyUnchanged(Exception):
+    """Raised at the end of a streamed feed whose body repeats the last processed one."""
+
+
 def map_severity(cap_severity: str) -> AlertSeverity:
     """Map weather.gov severity to AlertSeverity enum.
     Normalizes input to uppercase to ensure consistent behavior across environments."""
@@ -35,30 +68,948 @@ def map_severity(cap_severity: str) -> AlertSeverity:
     normalized_severity = cap_severity.upper() if cap_severity else "MINOR"
     return severity_map.get(normalized_severity, AlertSeverity.LOW)
 
-async def fetch_weather_alerts() -> List[dict]:
+def _conditional_headers(url: str) -> Dict[str, str]:
+    """Build request headers, adding If-None-Match/If-Modified-Since when we have validators."""
+    headers = {"Accept": "application/geo+json"}
+    validators = _feed_validators.get(url) or {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def _feed_unchanged(url: str, response: httpx.Response) -> bool:
+    """Check whether a feed response repeats the last processed one.
+    A 304 is authoritative; otherwise fall back to comparing body hashes and
+    stage the new validators until the alerts they describe are committed."""
+    if response.status_code == 304:
+        return True
+
+    return _same_feed_body(url, {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": hashlib.sha256(response.content).hexdigest(),
+    })
+
+def _same_feed_body(url: str, validators: Dict[str, Optional[str]]) -> bool:
+    """Compare the body hash of a fetch with the last processed one, keeping the
+    fresh validators when it matches and staging them otherwise."""
+    previous = _feed_validators.get(url)
+    if previous and previous.get("body_hash") == validators["body_hash"]:
+        # Same content under new validators, keep the fresh ETag/Last-Modified
+        _feed_validators[url] = validators
+        return True
+
+    _pending_validators[url] = validators
+    return False
+
+def _accept_pending_validators() -> None:
+    """Remember the validators of the fetch whose alerts were just committed."""
+    _feed_validators.update(_pending_validators)
+    _pending_validators.clear()
+
+async def fetch_weather_alerts(timings: Optional[Dict[str, float]] = None) -> Optional[List[dict]]:
+    """Fetch active alerts from weather.gov using a conditional request.
+    Returns None when the feed has not changed since the last processed fetch,
+    an empty list for an empty feed, and raises WeatherFeedError when the fetch fails.
+    Fetch and parse durations (seconds) are added to `timings` when given."""
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    response = await send_with_retry(ALERTS_FEED_URL, _conditional_headers(ALERTS_FEED_URL))
+    timings["fetch"] = time.perf_counter() - started
+    if _feed_unchanged(ALERTS_FEED_URL, response):
+        print("Weather.gov feed not modified since last fetch")
+        return None
+    started = time.perf_counter()
+    try:
+        # Decoding a multi-megabyte feed would stall the event loop
+        data = await asyncio.to_thread(response.json)
+    except ValueError as e:
+        raise WeatherFeedError(f"Invalid JSON in weather.gov feed: {str(e)}") from e
+    timings["parse"] = time.perf_counter() - started
+    features = data.get("features", [])
+    print(f"Fetched {len(features)} alerts from weather.gov")
+    return features
+
+def load_state_codes(db: Session) -> List[str]:
+    """Codes of the configured states, the areas requested in per-state fetch mode."""
+    return [code for (code,) in db.query(State.code).order_by(State.code).all()]
+
+async def _fetch_state_alerts(state_code: str, semaphore: asyncio.Semaphore) -> Optional[List[dict]]:
+    """Fetch the active alerts of one state (area) with its own conditional validators.
+    Returns None when that state's feed has not changed since it was last processed."""
+    url = f"{ALERTS_FEED_URL}?area={state_code}"
+    async with semaphore:
+        response = await send_with_retry(url, _conditional_headers(url))
+    if _feed_unchanged(url, response):
+        return None
+    try:
+        data = await asyncio.to_thread(response.json)
+    except ValueError as e:
+        raise WeatherFeedError(f"Invalid JSON in weather.gov feed for {state_code}: {str(e)}") from e
+    return data.get("features", [])
+
+async def fetch_weather_alerts_by_state(
+    state_codes: List[str],
+    timings: Optional[Dict[str, float]] = None
+) -> Optional[List[dict]]:
+    """Fetch active alerts with one area-scoped request per state, at most
+    ALERT_FETCH_CONCURRENCY in flight, merged and deduplicated by feature id (alerts
+    spanning several states are returned once per state). Only states whose feed
+    changed contribute features; returns None when none of them changed.
+    The wall time of all requests, JSON decoding included, is added to `timings` as fetch."""
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(settings.ALERT_FETCH_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_fetch_state_alerts(state_code, semaphore) for state_code in state_codes)
+    )
+    timings["fetch"] = time.perf_counter() - started
+
+    changed = [features for features in results if features is not None]
+    if not changed:
+        print("Weather.gov feeds not modified since last fetch for any state")
+        return None
+
+    merged = {}
+    for features in changed:
+        for feature in features:
+            merged.setdefault(feature.get("id") or id(feature), feature)
+    print(
+        f"Fetched {len(merged)} alerts from weather.gov "
+        f"({len(changed)} of {len(state_codes)} state feeds changed)"
+    )
+    return list(merged.values())
+
+async def _parse_features(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Features of a feed body parsed chunk by chunk; only the features of the
+    current chunk are held in memory at any time."""
+    features = ijson.sendable_list()
+    parser = ijson.items_coro(features, "features.item", use_float=True)
+    async for chunk in chunks:
+        parser.send(chunk)
+        for feature in features:
+            yield feature
+        del features[:]
+    parser.close()
+    for feature in features:
+        yield feature
+
+def _response_validators(response: httpx.Response, body_hash: str) -> Dict[str, Optional[str]]:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": body_hash,
+    }
+
+async def _iter_feed_features(response: httpx.Response, url: str) -> AsyncIterator[dict]:
+    """Parse features out of a streamed feed response as the body arrives.
+    Raises FeedBodyUnchanged after the last feature when the body hash matches the
+    last processed feed."""
+    body_hash = hashlib.sha256()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        async for chunk in response.aiter_bytes():
+            body_hash.update(chunk)
+            yield chunk
+
+    count = 0
+    try:
+        async for feature in _parse_features(chunks()):
+            count += 1
+            yield feature
+        print(f"Streamed {count} alerts from weather.gov")
+        # The hash is only known once the whole body arrived; the sync is still
+        # uncommitted then, so an identical feed is rolled back and recorded as such
+        if _same_feed_body(url, _response_validators(response, body_hash.hexdigest())):
+            raise FeedBodyUnchanged(url)
+    except (httpx.HTTPError, ijson.JSONError) as e:
+        raise WeatherFeedError(f"Error streaming weather.gov feed: {str(e)}") from e
+    finally:
+        await response.aclose()
+
+async def _spool_feed_body(response: httpx.Response) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """Download a feed body into a spooled file (memory up to ALERT_FEED_SPOOL_BYTES,
+    disk beyond) and return it rewound with the hash of the raw bytes."""
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.ALERT_FEED_SPOOL_BYTES)
+    body_hash = hashlib.sha256()
+    try:
+        async for chunk in response.aiter_bytes():
+            body_hash.update(chunk)
+            spool.write(chunk)
+    except httpx.HTTPError as e:
+        spool.close()
+        raise WeatherFeedError(f"Error streaming weather.gov feed: {str(e)}") from e
+    finally:
+        await response.aclose()
+    spool.seek(0)
+    return spool, body_hash.hexdigest()
+
+async def _iter_spooled_features(spool: tempfile.SpooledTemporaryFile) -> AsyncIterator[dict]:
+    """Parse features out of a spooled feed body, as incrementally as from the network."""
+    async def chunks() -> AsyncIterator[bytes]:
+        while True:
+            chunk = spool.read(FEED_SPOOL_READ_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+    count = 0
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://api.weather.gov/alerts/active",
-                headers={"Accept": "application/geo+json"}
+        async for feature in _parse_features(chunks()):
+            count += 1
+            yield feature
+        print(f"Parsed {count} alerts from the spooled weather.gov feed")
+    except ijson.JSONError as e:
+        raise WeatherFeedError(f"Invalid JSON in weather.gov feed: {str(e)}") from e
+    finally:
+        spool.close()
+
+async def open_weather_alert_stream() -> Optional[AsyncIterator[dict]]:
+    """Open the alerts feed for incremental parsing using a conditional request.
+    Returns None when the feed is not modified, otherwise an async iterator that
+    yields features while the body is still downloading.
+
+    A response without ETag and Last-Modified carries nothing but its body to tell
+    whether it changed, so that body is spooled and hashed before anything is parsed:
+    an unchanged feed then costs its download only, a changed one is parsed from the
+    spool."""
+    response = await send_with_retry(
+        ALERTS_FEED_URL,
+        _conditional_headers(ALERTS_FEED_URL),
+        stream=True
+    )
+    if response.status_code == 304:
+        await response.aclose()
+        print("Weather.gov feed not modified since last fetch")
+        return None
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        return _iter_feed_features(response, ALERTS_FEED_URL)
+
+    spool, body_hash = await _spool_feed_body(response)
+    if _same_feed_body(ALERTS_FEED_URL, _response_validators(response, body_hash)):
+        spool.close()
+        print("Weather.gov feed body unchanged since last fetch")
+        return None
+    return _iter_spooled_features(spool)
+
+def iterate_from_loop(features: AsyncIterator[dict], loop: asyncio.AbstractEventLoop) -> Iterator[dict]:
+    """Consume an async iterator owned by `loop` from a worker thread, one item at a time."""
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(features.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(features.aclose(), loop).result()
+
+async def run_weather_alert_sync() -> Optional[dict]:
+    """Fetch the alerts feed and process it on the ingestion worker with its own session,
+    one request per configured state when ALERT_FETCH_BY_STATE is on, streaming it when
+    ALERT_FEED_STREAMING is on. The event loop only does network I/O and awaits
+    completion. A failed fetch is recorded in the sync log and re-raised as
+    WeatherFeedError."""
+    # Network stages measured on the event loop, stored with the sync log
+    timings: Dict[str, float] = {}
+    try:
+        if settings.ALERT_FETCH_BY_STATE:
+            state_codes = await run_in_ingest_worker(load_state_codes)
+            alerts = await fetch_weather_alerts_by_state(state_codes, timings)
+            return await run_in_ingest_worker(process_weather_alerts, alerts, timings)
+
+        if not settings.ALERT_FEED_STREAMING:
+            alerts = await fetch_weather_alerts(timings)
+            return await run_in_ingest_worker(process_weather_alerts, alerts, timings)
+
+        started = time.perf_counter()
+        features = await open_weather_alert_stream()
+        timings["fetch"] = time.perf_counter() - started
+        if features is None:
+            return await run_in_ingest_worker(process_weather_alerts, None, timings)
+        # Parsing stays on the event loop, the blocking pipeline pulls from the worker
+        loop = asyncio.get_running_loop()
+
+        def process_stream(db: Session):
+            stream = iterate_from_loop(features, loop)
+            try:
+                return process_weather_alerts(db, stream, timings)
+            finally:
+                # Close from this thread; closing on the loop thread would deadlock
+                stream.close()
+
+        return await run_in_ingest_worker(process_stream)
+    except WeatherFeedError as e:
+        print(f"❌ Error fetching weather alerts: {str(e)}")
+        await run_in_ingest_worker(record_failed_sync, str(e))
+        raise
+
+def record_not_modified_sync(db: Session, timer: Optional[StageTimer] = None) -> None:
+    """Record a sync that was short-circuited because the feed was unchanged."""
+    sync_log = AlertSyncLog(total_alerts=0, status=SyncStatus.NOT_MODIFIED)
+    if timer is not None:
+        sync_log.duration_ms = timer.duration_ms()
+        sync_log.stage_timings = timer.stage_ms()
+        sync_log.statement_count = timer.statement_count
+    db.add(sync_log)
+    db.commit()
+
+def _store_sync_timings(
+    db: Session,
+    sync_log: AlertSyncLog,
+    timer: StageTimer,
+    rows_written: Dict[str, int]
+) -> None:
+    """Persist the stage timings, statement count and rows written of a committed sync."""
+    sync_log.duration_ms = timer.duration_ms()
+    sync_log.stage_timings = timer.stage_ms()
+    sync_log.statement_count = timer.statement_count
+    sync_log.rows_written = rows_written
+    db.commit()
+
+def get_sync_timings(db: Session, limit: int = 50) -> Dict[str, Any]:
+    """Timings of the most recent completed syncs with p50/p95/p99 per stage,
+    for the whole sync and for the statement count."""
+    sync_logs = (
+        db.query(AlertSyncLog)
+        .filter(AlertSyncLog.status == SyncStatus.COMPLETED, AlertSyncLog.duration_ms.isnot(None))
+        .order_by(AlertSyncLog.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    series = defaultdict(list)
+    for sync_log in sync_logs:
+        series["duration_ms"].append(sync_log.duration_ms)
+        series["statement_count"].append(sync_log.statement_count or 0)
+        for stage, stage_ms in (sync_log.stage_timings or {}).items():
+            series[f"stages.{stage}"].append(stage_ms)
+
+    return {
+        "syncs": [
+            {
+                "id": sync_log.id,
+                "sync_timestamp": sync_log.sync_timestamp.isoformat() if sync_log.sync_timestamp else None,
+                "total_alerts": sync_log.total_alerts,
+                "duration_ms": sync_log.duration_ms,
+                "stages_ms": sync_log.stage_timings,
+                "statement_count": sync_log.statement_count,
+                "rows_written": sync_log.rows_written,
+                "ugc_cache_hits": sync_log.ugc_cache_hits,
+                "ugc_cache_misses": sync_log.ugc_cache_misses,
+            }
+            for sync_log in sync_logs
+        ],
+        "percentiles": {
+            name: {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for name, values in series.items()
+        },
+    }
+
+def record_failed_sync(db: Session, error_message: str) -> None:
+    """Record a sync that could not run because the feed fetch failed."""
+    db.add(AlertSyncLog(total_alerts=0, status=SyncStatus.FETCH_FAILED, error_message=error_message))
+    db.commit()
+
+def _validate_alerts(
+    alerts: Iterable[dict],
+    valid_states: Dict[str, State],
+    counters: Dict[str, int],
+    unique_states: Set[str]
+) -> Iterator[Tuple[dict, dict, str, List[str], str]]:
+    """Validation stage: yield (feature, properties, external_id, ugc_codes, state_code)
+    for every alert that has the data we need and belongs to a known state."""
+    for feature in alerts:
+        counters["total_alerts"] += 1
+        try:
+            properties = feature.get("properties", {})
+            external_id = feature.get("id")
+            geocode = properties.get("geocode", {})
+            ugc_codes = geocode.get("UGC", [])
+            
+            # Basic data validation
+            if not external_id:
+                print("Missing external_id")
+                counters["ignored_by_missing_data"] += 1
+                continue
+                
+            if not properties:
+                print(f"Missing properties for alert {external_id}")
+                counters["ignored_by_missing_data"] += 1
+                continue
+                
+            if not ugc_codes:
+                print(f"Missing UGC codes for alert {external_id}")
+                counters["ignored_by_missing_data"] += 1
+                continue
+            
+            # Check state validity
+            state_code = ugc_codes[0][:2].upper()
+            unique_states.add(state_code)
+            
+            if state_code not in valid_states:
+                # print(f"Invalid state code: {state_code}")
+                counters["ignored_by_state"] += 1
+                continue
+            
+            # Validate required fields
+            title = properties.get("headline") or properties.get("event")
+            if not title:
+                print(f"Missing title for alert {external_id}")
+                counters["ignored_by_missing_data"] += 1
+                continue
+                
+        except Exception as e:
+            print(f"Error validating alert: {str(e)}")
+            counters["error_count"] += 1
+            continue
+
+        counters["valid_alerts"] += 1
+        yield feature, properties, external_id, ugc_codes, state_code
+
+def alert_content_hash(properties: dict, ugc_codes: List[str], geometry: Optional[dict] = None) -> str:
+    """Stable hash of the alert properties we store or derive rows from: severity,
+    UGC list (order-insensitive), headline and expiry, plus the polygon when alerts
+    are targeted by geometry. Equal hashes mean no writes."""
+    content = {
+        "severity": properties.get("severity"),
+        "ugc": sorted(ugc_codes),
+        "headline": properties.get("headline"),
+        "expires": properties.get("expires"),
+    }
+    if geometry is not None:
+        content["geometry"] = geometry
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+def _match_existing_alerts(
+    db: Session,
+    validated: Iterable[Tuple[dict, dict, str, List[str], str]],
+    counters: Dict[str, int]
+) -> Iterator[Tuple[dict, dict, str, List[str], str, str, Optional[int]]]:
+    """Change detection stage: look up only the incoming external IDs, one chunk at a
+    time, drop alerts whose content hash is unchanged and tag the rest with the id of
+    the stored alert to update (None for new alerts)."""
+    for chunk in _batched(validated, settings.ALERT_LOOKUP_CHUNK_SIZE):
+        stored = load_stored_alerts(db, [item[2] for item in chunk])
+        for feature, properties, external_id, ugc_codes, state_code in chunk:
+            geometry = feature.get("geometry") if settings.ALERT_GEOMETRY_TARGETING else None
+            content_hash = alert_content_hash(properties, ugc_codes, geometry)
+            alert_id, stored_hash = stored.get(external_id, (None, None))
+            if alert_id is not None and stored_hash == content_hash:
+                print(f"⏩ Skipping unchanged alert: {external_id}")
+                counters["unchanged_count"] += 1
+                continue
+            yield feature, properties, external_id, ugc_codes, state_code, content_hash, alert_id
+
+def _resolve_alerts(
+    matched: Iterable[Tuple[dict, dict, str, List[str], str, str, Optional[int]]],
+    valid_states: Dict[str, State],
+    counters: Dict[str, int]
+) -> Iterator[Tuple[AlertCreate, dict, List[Tuple[str, str, RegionType, str, State]], Optional[int], Optional[Set[str]]]]:
+    """Resolution stage: build the AlertCreate payload, parse the UGC codes into
+    (ugc_code, state_code, region_type, region_code, state) tuples and find the
+    zipcodes inside the alert polygon. Yields
+    (alert_data, properties, regions, stored_alert_id, target_zipcodes), where
+    target_zipcodes is None when the alert is expanded from its UGC codes only."""
+    for feature, properties, external_id, ugc_codes, state_code, content_hash, stored_alert_id in matched:
+        try:
+            # Extract alert data
+            title = properties.get("headline") or properties.get("event")
+            desc = properties.get("description") or properties.get("text") or ""
+            event = properties.get("event") or "Unknown Event"
+            
+            # Parse event timestamp
+            try:
+                event_time = properties.get("sent") or properties.get("effective") or datetime.utcnow().isoformat()
+                if isinstance(event_time, str):
+                    event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+            except Exception as e:
+                print(f"Error parsing event time for {external_id}: {str(e)}")
+                event_time = datetime.utcnow()
+            
+            # Create alert with proper status
+            alert_data = AlertCreate(
+                title=title,
+                description=desc,
+                severity=map_severity(properties.get("severity", "Minor")),
+                state_id=valid_states[state_code].id,
+                source="weather.gov",
+                external_id=external_id,
+                event_timestamp=event_time,
+                event_type=event,
+                status=AlertStatus.NEW,
+                content_hash=content_hash
+            )
+        except Exception as e:
+            print(f"❌ Error creating alert data: {str(e)}")
+            counters["error_count"] += 1
+            continue
+
+        regions = []
+        for ugc_code in ugc_codes:
+            region_state_code, region_type, region_code = process_ugc_code(ugc_code)
+            if not all([region_state_code, region_type, region_code]):
+                print(f"Invalid UGC code: {ugc_code}")
+                continue
+            
+            # Get state FIPS code for this region
+            state = valid_states.get(region_state_code)
+            if not state or not state.fips:
+                print(f"Missing state FIPS for {region_state_code}")
+                continue
+            
+            regions.append((ugc_code, region_state_code, region_type, region_code, state))
+
+        try:
+            target_zipcodes = resolve_geometry_zipcodes(feature.get("geometry"))
+        except Exception as e:
+            print(f"Error matching the polygon of {external_id}, using its UGC codes: {str(e)}")
+            target_zipcodes = None
+        if target_zipcodes is not None:
+            print(f"Targeting {len(target_zipcodes)} zipcodes inside the polygon of {external_id}")
+
+        yield alert_data, properties, regions, stored_alert_id, target_zipcodes
+
+def _plan_affected_areas(
+    db: Session,
+    alert_id: int,
+    properties: dict,
+    regions: List[Tuple[str, str, RegionType, str, State]],
+    existing_zones: Dict[str, ZoneCounty],
+    zipcode_summary: Dict[str, int],
+    target_zipcodes: Optional[Set[str]] = None
+) -> Optional[Tuple[List[dict], Dict[int, ZoneCounty], Dict[str, ResolvedUgc]]]:
+    """Resolve the zones, zipcodes and affected-area rows of one alert. Zipcodes are
+    limited to `target_zipcodes` (those inside the alert polygon) when given. Returns
+    the affected-area rows, the zone/county of every alerted zipcode id and the UGC codes
+    resolved without the cache, or None when none of the alert's zones is valid."""
+    # Process all zones in batch with validation
+    successful_zones = []
+    
+    for ugc_code, state_code, region_type, region_code, state in regions:
+        # Create region_fips (state_fips + region_code)
+        region_fips = f"{state.fips}{region_code}"
+        print(f"Created region_fips: {region_fips} from state FIPS {state.fips} and region code {region_code}")
+        
+        # Get or create zone/county using cached data
+        zone_county = existing_zones.get(ugc_code)
+        if not zone_county:
+            try:
+                zone_county = ZoneCounty(
+                    code=ugc_code,
+                    name=f"{state_code} {region_type.name} {region_code}",
+                    fips=region_fips,
+                    type=region_type,
+                    state_id=state.id,
+                    status=True
+                )
+                db.add(zone_county)
+                existing_zones[ugc_code] = zone_county
+            except Exception as e:
+                print(f"Error creating zone/county {ugc_code}: {str(e)}")
+                continue
+        
+        successful_zones.append((zone_county, region_type))
+    
+    if not successful_zones:
+        return None
+
+    with sync_stage("ugc_resolution"):
+        db.flush()  # Ensure all zones have IDs
+    
+    affected_areas = []  # For storing all affected areas
+    zipcode_zones = {}  # Zone/county of every alerted zipcode id
+    resolved_ugcs = {}  # UGC codes resolved for this alert, cached once it is stored
+
+    # Zones already resolved by an earlier alert or sync skip the zipcode lookups
+    cached_zones = {}
+    for zone_county, _ in successful_zones:
+        if zone_county.fips:
+            cached = ugc_cache.get(zone_county.code, zone_county.id)
+            if cached is not None:
+                cached_zones[zone_county.code] = cached
+
+    # Zipcodes of every other zone of the alert: one join of the zone <-> zipcode
+    # association, then one UGC lookup for the zones it does not map yet
+    with sync_stage("zipcode_resolution"):
+        mapped_zones = get_zone_zipcodes(
+            db, [zone_county.id for zone_county, _ in successful_zones if zone_county.code not in cached_zones]
+        )
+        ugc_zipcodes = resolve_ugc_zipcodes(db, [
+            zone_county for zone_county, _ in successful_zones
+            if zone_county.code not in cached_zones and zone_county.id not in mapped_zones
+        ])
+    
+    # Process each zone individually
+    for zone_county, region_type in successful_zones:
+        try:
+            # Each zone has its own FIPS code that can be used to fetch zipcodes
+            if zone_county.fips:
+                cached = cached_zones.get(zone_county.code)
+                if cached is not None:
+                    print(f"Using cached zipcodes for zone {zone_county.code}")
+                    zipcodes = cached.zipcodes
+                    zipcode_summary["processed_same_codes"] += 1
+                    if zipcodes:
+                        zipcode_summary["found_zipcodes"] += len(zipcodes)
+                        zipcode_summary["existing_mappings"] += len(zipcodes)
+                    else:
+                        zipcode_summary["skipped_same_codes"] += 1
+                elif zone_county.id in mapped_zones:
+                    zipcodes = mapped_zones[zone_county.id]
+                    zipcode_summary["processed_same_codes"] += 1
+                    zipcode_summary["found_zipcodes"] += len(zipcodes)
+                    zipcode_summary["existing_mappings"] += len(zipcodes)
+                    resolved_ugcs[zone_county.code] = ResolvedUgc(zone_county.id, zipcodes)
+                else:
+                    print(f"Processing zone {zone_county.code} with FIPS {zone_county.fips}")
+                    # Pass only the one zone and its FIPS code
+                    with sync_stage("zipcode_resolution"):
+                        zipcode_rows, zip_summary = process_zipcodes_with_dataset(
+                            db, 
+                            properties, 
+                            [zone_county],  # Pass just this one zone
+                            [zone_county.fips],  # Pass just this zone's FIPS code
+                            ugc_zipcodes.get(zone_county.code, set())
+                        )
+                    
+                    # Update zipcode summary totals for this zone
+                    for key in zipcode_summary:
+                        # Map old keys to new keys for backward compatibility
+                        if key == "processed_same_codes":
+                            zipcode_summary[key] += zip_summary.get("processed_region_fips_codes", 0)
+                        elif key == "skipped_same_codes":
+                            zipcode_summary[key] += zip_summary.get("skipped_region_fips_codes", 0)
+                        else:
+                            zipcode_summary[key] += zip_summary.get(key, 0)
+
+                    zipcodes = tuple((zipcode.code, zipcode.id) for zipcode in zipcode_rows)
+                    resolved_ugcs[zone_county.code] = ResolvedUgc(zone_county.id, zipcodes)
+
+                if target_zipcodes is not None:
+                    zipcodes = tuple(pair for pair in zipcodes if pair[0] in target_zipcodes)
+                elif zipcodes and zone_storage_enabled():
+                    # The whole zone is alerted: one zone/county row, its zipcodes are
+                    # read back through the zone -> zipcode mapping
+                    print(f"Adding affected area for {len(zipcodes)} zipcodes of zone/county {zone_county.code}")
+                    for _, zipcode_id in zipcodes:
+                        zipcode_zones[zipcode_id] = zone_county
+                    affected_areas.append({
+                        "alert_id": alert_id,
+                        "zipcode_id": None,
+                        "zone_county_id": zone_county.id,
+                        "region_type": zone_area_type(region_type)
+                    })
+                    continue
+                
+                # Create affected areas for this zone and its zipcodes
+                for zip_code, zipcode_id in zipcodes:
+                    print(f"Adding affected area for zipcode {zip_code} in zone/county {zone_county.code}")
+                    zipcode_zones[zipcode_id] = zone_county
+                    affected_areas.append({
+                        "alert_id": alert_id,
+                        "zipcode_id": zipcode_id,
+                        "zone_county_id": zone_county.id,
+                        "region_type": AreaRegionType.ZIPCODE
+                    })
+            else:
+                print(f"Zone {zone_county.code} has no FIPS code, skipping")
+                
+        except Exception as e:
+            print(f"Error processing zipcodes for zone {zone_county.code}: {str(e)}")
+            # Continue to next zone even if one fails
+            continue
+    
+    # If no zipcodes were found at all, add zone/county areas
+    if not zipcode_zones:
+        print("No zipcodes found for any zone, adding zone/county areas")
+        for zone_county, region_type in successful_zones:
+            affected_areas.append({
+                "alert_id": alert_id,
+                "zipcode_id": None,
+                "zone_county_id": zone_county.id,
+                "region_type": zone_area_type(region_type)
+            })
+
+    return affected_areas, zipcode_zones, resolved_ugcs
+
+def _stage_resolved_ugcs(resolved_ugcs: Dict[str, ResolvedUgc]) -> None:
+    for ugc_code, resolved in resolved_ugcs.items():
+        ugc_cache.stage(ugc_code, resolved)
+
+def _mock_policyholders(zipcode_zones: Dict[int, ZoneCounty]) -> List[dict]:
+    """Generate 1-2 mock policyholder rows for every alerted zipcode."""
+    policyholders = []
+    for zipcode_id, zone_county in zipcode_zones.items():
+        for _ in range(mock_policyholder_count()):
+            policyholders.append(mock_policyholder_values(zipcode_id, zone_county))
+    return policyholders
+
+def _area_key(area: dict) -> Tuple[Optional[int], Optional[int], AreaRegionType]:
+    return area["zone_county_id"], area["zipcode_id"], area["region_type"]
+
+def _persist_alert(
+    db: Session,
+    alert_data: AlertCreate,
+    properties: dict,
+    regions: List[Tuple[str, str, RegionType, str, State]],
+    existing_zones: Dict[str, ZoneCounty],
+    zipcode_summary: Dict[str, int],
+    write_summary: Dict[str, int],
+    target_zipcodes: Optional[Set[str]] = None
+) -> bool:
+    """Persistence stage: write one alert with its zones, zipcodes and affected areas
+    inside its own savepoint. Returns True when the alert was stored."""
+    title = alert_data.title
+    external_id = alert_data.external_id
+
+    # Use nested transaction for atomic alert creation
+    with db.begin_nested() as alert_savepoint:
+        try:
+            db_alert = Alert(**alert_data.dict())
+            db.add(db_alert)
+            db.flush()
+            
+            planned = _plan_affected_areas(
+                db, db_alert.id, properties, regions, existing_zones, zipcode_summary, target_zipcodes
+            )
+            if planned is None:
+                print(f"❌ No valid zones for alert: {title}")
+                alert_savepoint.rollback()
+                return False
+            affected_areas, zipcode_zones, resolved_ugcs = planned
+            
+            # Save policyholders and affected areas with the configured bulk writer
+            written_policyholders = write_rows(db, Policyholder, _mock_policyholders(zipcode_zones))
+            written_areas = write_rows(db, AlertAffectedArea, affected_areas)
+            link_alert_categories(db, [(db_alert.id, db_alert.event_type)])
+            
+            alert_savepoint.commit()
+            _stage_resolved_ugcs(resolved_ugcs)
+            write_summary["policyholders"] += written_policyholders
+            write_summary["alert_affected_areas"] += written_areas
+            print(f"✅ Successfully processed alert: {title}")
+            return True
+                
+        except Exception as e:
+            print(f"❌ Error processing alert {external_id}: {str(e)}")
+            alert_savepoint.rollback()
+            return False
+
+def _update_alert(
+    db: Session,
+    alert_id: int,
+    alert_data: AlertCreate,
+    properties: dict,
+    regions: List[Tuple[str, str, RegionType, str, State]],
+    existing_zones: Dict[str, ZoneCounty],
+    zipcode_summary: Dict[str, int],
+    write_summary: Dict[str, int],
+    target_zipcodes: Optional[Set[str]] = None
+) -> bool:
+    """Persistence stage for a stored alert whose content changed: update its columns
+    and apply the difference between its stored and its new affected areas inside its
+    own savepoint. The alert's status is kept. Returns True when the alert was updated."""
+    title = alert_data.title
+    external_id = alert_data.external_id
+
+    with db.begin_nested() as alert_savepoint:
+        try:
+            planned = _plan_affected_areas(
+                db, alert_id, properties, regions, existing_zones, zipcode_summary, target_zipcodes
+            )
+            if planned is None:
+                print(f"❌ No valid zones for alert: {title}")
+                alert_savepoint.rollback()
+                return False
+            affected_areas, zipcode_zones, resolved_ugcs = planned
+
+            values = alert_data.dict(exclude={"status", "external_id"})
+            db.query(Alert).filter(Alert.id == alert_id).update(values, synchronize_session=False)
+
+            # Diff the stored affected areas against the new ones
+            stored_areas = {
+                (zone_county_id, zipcode_id, region_type): area_id
+                for area_id, zone_county_id, zipcode_id, region_type in db.query(
+                    AlertAffectedArea.id,
+                    AlertAffectedArea.zone_county_id,
+                    AlertAffectedArea.zipcode_id,
+                    AlertAffectedArea.region_type
+                ).filter(AlertAffectedArea.alert_id == alert_id).all()
+            }
+            new_keys = {_area_key(area) for area in affected_areas}
+            removed_ids = [area_id for key, area_id in stored_areas.items() if key not in new_keys]
+            added_areas = [area for area in affected_areas if _area_key(area) not in stored_areas]
+            if removed_ids:
+                db.query(AlertAffectedArea).filter(
+                    AlertAffectedArea.id.in_(removed_ids)
+                ).delete(synchronize_session=False)
+
+            # Only zipcodes that newly entered the alert get mock policyholders, those of
+            # newly added zipcode rows and those of newly added zone/county rows
+            added_zone_ids = {area["zone_county_id"] for area in added_areas if area["zipcode_id"] is None}
+            added_zipcodes = {
+                zipcode_id: zone_county for zipcode_id, zone_county in zipcode_zones.items()
+                if zone_county.id in added_zone_ids
+                and (zone_county.id, zipcode_id, AreaRegionType.ZIPCODE) not in stored_areas
+            }
+            added_zipcodes.update({
+                area["zipcode_id"]: zipcode_zones[area["zipcode_id"]]
+                for area in added_areas if area["zipcode_id"] is not None
+            })
+            written_policyholders = write_rows(db, Policyholder, _mock_policyholders(added_zipcodes))
+            written_areas = write_rows(db, AlertAffectedArea, added_areas)
+            link_alert_categories(db, [(alert_id, alert_data.event_type)], replace=True)
+
+            alert_savepoint.commit()
+            _stage_resolved_ugcs(resolved_ugcs)
+            write_summary["policyholders"] += written_policyholders
+            write_summary["alert_affected_areas"] += written_areas
+            print(
+                f"🔄 Updated alert: {title} "
+                f"(+{len(added_areas)} / -{len(removed_ids)} affected areas)"
+            )
+            return True
+
+        except Exception as e:
+            print(f"❌ Error updating alert {external_id}: {str(e)}")
+            alert_savepoint.rollback()
+            return False
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most `size` items."""
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+def _persist_or_update_alert(
+    db: Session,
+    alert_data: AlertCreate,
+    properties: dict,
+    regions: List[Tuple[str, str, RegionType, str, State]],
+    stored_alert_id: Optional[int],
+    existing_zones: Dict[str, ZoneCounty],
+    zipcode_summary: Dict[str, int],
+    write_summary: Dict[str, int],
+    counters: Dict[str, int],
+    target_zipcodes: Optional[Set[str]] = None
+) -> None:
+    """Insert a new alert or update a changed one, keeping the counters."""
+    if stored_alert_id is None:
+        if _persist_alert(
+            db, alert_data, properties, regions, existing_zones, zipcode_summary, write_summary, target_zipcodes
+        ):
+            counters["processed_count"] += 1
+        else:
+            counters["error_count"] += 1
+    elif _update_alert(
+        db, stored_alert_id, alert_data, properties, regions, existing_zones,
+        zipcode_summary, write_summary, target_zipcodes
+    ):
+        counters["updated_count"] += 1
+    else:
+        counters["error_count"] += 1
+
+def _persist_alert_batch(
+    db: Session,
+    batch: List[Tuple[AlertCreate, dict, List[Tuple[str, str, RegionType, str, State]], Optional[int], Optional[Set[str]]]],
+    existing_zones: Dict[str, ZoneCounty],
+    zipcode_summary: Dict[str, int],
+    write_summary: Dict[str, int],
+    counters: Dict[str, int]
+) -> None:
+    """Bulk persistence stage: write the new alerts of a batch with set-based statements,
+    falling back to one savepoint per alert if the batch fails so errors stay isolated
+    per alert. Changed alerts are updated one by one."""
+    new_alerts = []
+    for alert_data, properties, regions, stored_alert_id, target_zipcodes in batch:
+        if stored_alert_id is None:
+            new_alerts.append((alert_data, properties, regions, target_zipcodes))
+        else:
+            _persist_or_update_alert(
+                db, alert_data, properties, regions, stored_alert_id,
+                existing_zones, zipcode_summary, write_summary, counters, target_zipcodes
             )
-            response.raise_for_status()
-            data = response.json()
-            features = data.get("features", [])
-            print(f"Fetched {len(features)} alerts from weather.gov")
-            return features
+    if not new_alerts:
+        return
+    batch = new_alerts
+
+    try:
+        summary = persist_alerts_bulk(db, batch, existing_zones)
     except Exception as e:
-        print(f"Error fetching weather alerts: {str(e)}")
-        return []
+        print(f"❌ Bulk write failed for {len(batch)} alerts, retrying one by one: {str(e)}")
+        for alert_data, properties, regions, target_zipcodes in batch:
+            if _persist_alert(
+                db, alert_data, properties, regions, existing_zones, zipcode_summary, write_summary, target_zipcodes
+            ):
+                counters["processed_count"] += 1
+            else:
+                counters["error_count"] += 1
+        return
+
+    existing_zones.update(summary["new_zones"])
+    counters["processed_count"] += summary["processed_count"]
+    counters["error_count"] += summary["error_count"]
+    counters["ignored_by_missing_data"] += summary["skipped_existing"]
+    for key, value in summary["zipcode_summary"].items():
+        zipcode_summary[key] += value
+    for key, value in summary["rows_written"].items():
+        write_summary[key] += value
+
+def process_weather_alerts(
+    db: Session,
+    alerts: Optional[Iterable[dict]],
+    timings: Optional[Dict[str, float]] = None
+) -> Optional[List[dict]]:
+    """Process incoming weather alerts and create/update database records.
+    Alerts flow through a validate -> resolve -> persist generator pipeline, so a
+    streamed feed is written while it is still being downloaded.
+    Passing None (feed not modified), or a stream ending in FeedBodyUnchanged, only
+    records the outcome in the sync log.
+    `timings` holds stages measured before processing (fetch, parse) in seconds;
+    the sync log stores them with the per-stage times of the pipeline."""
+    timer = StageTimer()
+    timer.add_premeasured(timings or {})
+    with track_sync(timer):
+        try:
+            return _process_weather_alerts(db, alerts, timer)
+        except FeedBodyUnchanged:
+            # A streamed feed only turns out to be unchanged at its end; nothing
+            # it wrote was committed
+            db.rollback()
+            ugc_cache.discard_pending()
+            print("Weather.gov feed body unchanged since last fetch, skipping alert processing")
+            record_not_modified_sync(db, timer)
+            return None
+
+def _process_weather_alerts(
+    db: Session,
+    alerts: Optional[Iterable[dict]],
+    timer: StageTimer
+) -> Optional[List[dict]]:
+    if alerts is None:
+        print("Weather.gov feed not modified, skipping alert processing")
+        record_not_modified_sync(db, timer)
+        return None
 
-def process_weather_alerts(db: Session, alerts: List[dict]) -> Optional[List[dict]]:
-    """Process incoming weather alerts and create/update database records."""
     # Counters for tracking
-    processed_count = 0
-    ignored_by_state = 0
-    ignored_by_missing_data = 0
-    error_count = 0
-    total_alerts = len(alerts) if alerts else 0
+    counters = {
+        "total_alerts": 0,
+        "valid_alerts": 0,
+        "processed_count": 0,
+        "updated_count": 0,
+        "unchanged_count": 0,
+        "ignored_by_state": 0,
+        "ignored_by_missing_data": 0,
+        "error_count": 0,
+    }
     
     # Zipcodes summary tracking
     zipcode_summary = {
@@ -68,333 +1019,100 @@ def process_weather_alerts(db: Session, alerts: List[dict]) -> Optional[List[dic
         "created_mappings": 0,
         "existing_mappings": 0
     }
+
+    # Rows written per high-volume table by the configured bulk writer
+    write_summary = {
+        "writer": settings.ALERT_BULK_WRITER,
+        "alert_affected_areas": 0,
+        "policyholders": 0
+    }
     
-    if total_alerts == 0:
+    # Peek at the first alert so empty feeds return early, lists and streams alike.
+    # Pulling from a streamed feed downloads and parses it, so that time is "parse".
+    alerts = timer.timed_iter("parse", alerts)
+    first_alert = next(alerts, None)
+    if first_alert is None:
         print("No alerts to process")
+        _accept_pending_validators()
         return None
+    alerts = itertools.chain([first_alert], alerts)
 
-    print(f"Starting to process {total_alerts} alerts...")
+    print("Starting to process alerts...")
     
     try:
-        # Pre-load all states into memory with their FIPS codes
-        print("Loading states data...")
-        valid_states = {
-            state.code: state for state in db.query(State).all()
-        }
-        if not valid_states:
-            print("❌ No states found in database")
-            return None
-        
-        # Ensure all states have FIPS codes
-        states_without_fips = [state.code for state in valid_states.values() if not state.fips]
-        if states_without_fips:
-            print(f"⚠️ Warning: Some states are missing FIPS codes: {', '.join(states_without_fips)}")
-        
-        # Pre-load existing zone/county data
-        print("Loading zones/counties data...")
-        existing_zones = {
-            zone.code: zone for zone in db.query(ZoneCounty).all()
-        }
+        with timer.stage("preload"):
+            # Pre-load all states into memory with their FIPS codes
+            print("Loading states data...")
+            valid_states = {
+                state.code: state for state in db.query(State).all()
+            }
+            if not valid_states:
+                print("❌ No states found in database")
+                return None
+            
+            # Ensure all states have FIPS codes
+            states_without_fips = [state.code for state in valid_states.values() if not state.fips]
+            if states_without_fips:
+                print(f"⚠️ Warning: Some states are missing FIPS codes: {', '.join(states_without_fips)}")
+            
+            # Pre-load existing zone/county data
+            print("Loading zones/counties data...")
+            existing_zones = {
+                zone.code: zone for zone in db.query(ZoneCounty).all()
+            }
+            zones_before = len(existing_zones)
+
+            # Reference data index, rebuilt only when the zipcode dataset was re-imported
+            refresh_county_zip_index(db)
+            refresh_ugc_zipcodes_version(db)
+            refresh_ugc_cache(db)
+            refresh_zip_centroid_grid(db)
+            refresh_event_matcher(db)
         
         # Track unique states for reporting
         unique_states = set()
         
-        # First pass - quick validation and statistics
-        print("Performing initial validation...")
-        valid_alerts = []
-        for feature in alerts:
-            try:
-                properties = feature.get("properties", {})
-                external_id = feature.get("id")
-                geocode = properties.get("geocode", {})
-                ugc_codes = geocode.get("UGC", [])
-                
-                # Basic data validation
-                if not external_id:
-                    print("Missing external_id")
-                    ignored_by_missing_data += 1
-                    continue
-                    
-                if not properties:
-                    print(f"Missing properties for alert {external_id}")
-                    ignored_by_missing_data += 1
-                    continue
-                    
-                if not ugc_codes:
-                    print(f"Missing UGC codes for alert {external_id}")
-                    ignored_by_missing_data += 1
-                    continue
-                
-                # Check state validity
-                state_code = ugc_codes[0][:2].upper()
-                unique_states.add(state_code)
-                
-                if state_code not in valid_states:
-                    # print(f"Invalid state code: {state_code}")
-                    ignored_by_state += 1
-                    continue
-                
-                # Validate required fields
-                title = properties.get("headline") or properties.get("event")
-                if not title:
-                    print(f"Missing title for alert {external_id}")
-                    ignored_by_missing_data += 1
-                    continue
-                
-                valid_alerts.append((feature, properties, external_id, ugc_codes, state_code))
-                
-            except Exception as e:
-                print(f"Error validating alert: {str(e)}")
-                error_count += 1
-                continue
-        
+        # Validate -> match stored alerts -> resolve -> persist, one alert at a time
+        print("\nProcessing alerts...")
+        validated = timer.timed_iter(
+            "validation", _validate_alerts(alerts, valid_states, counters, unique_states)
+        )
+        matched = timer.timed_iter("change_detection", _match_existing_alerts(db, validated, counters))
+        resolved = timer.timed_iter("ugc_resolution", _resolve_alerts(matched, valid_states, counters))
+        if settings.ALERT_INGEST_MODE == "bulk":
+            for batch in _batched(resolved, settings.ALERT_BULK_BATCH_SIZE):
+                with timer.stage("db_writes"):
+                    _persist_alert_batch(db, batch, existing_zones, zipcode_summary, write_summary, counters)
+        else:
+            for alert_data, properties, regions, stored_alert_id, target_zipcodes in resolved:
+                with timer.stage("db_writes"):
+                    _persist_or_update_alert(
+                        db, alert_data, properties, regions, stored_alert_id,
+                        existing_zones, zipcode_summary, write_summary, counters, target_zipcodes
+                    )
+
+        total_alerts = counters["total_alerts"]
+        processed_count = counters["processed_count"]
+        updated_count = counters["updated_count"]
+        unchanged_count = counters["unchanged_count"]
+        ignored_by_state = counters["ignored_by_state"]
+        ignored_by_missing_data = counters["ignored_by_missing_data"]
+        error_count = counters["error_count"]
+
         missing_states = unique_states - valid_states.keys()
-        print(f"\nFound {len(valid_alerts)} valid alerts to process")
+        print(f"\nFound {counters['valid_alerts']} valid alerts out of {total_alerts}")
         
         if missing_states:
             print("\n🔍 State Validation Report:")
             print(f"Found {len(unique_states)} unique states in alerts")
             print(f"Missing {len(missing_states)} states from database: {', '.join(sorted(missing_states))}")
-        
-        # Batch check existing alerts for efficiency
-        print("Checking for existing alerts...")
-        existing_alert_ids = {
-            id[0] for id in db.query(Alert.external_id).all()
-        }
-        
-        # Main processing loop with transaction management
-        print("\nProcessing alerts...")
-        for feature, properties, external_id, ugc_codes, state_code in valid_alerts:
-            if external_id in existing_alert_ids:
-                print(f"⏩ Skipping existing alert: {external_id}")
-                ignored_by_missing_data += 1
-                continue
-                
-            try:
-                # Extract alert data
-                title = properties.get("headline") or properties.get("event")
-                desc = properties.get("description") or properties.get("text") or ""
-                event = properties.get("event") or "Unknown Event"
-                
-                # Parse event timestamp
-                try:
-                    event_time = properties.get("sent") or properties.get("effective") or datetime.utcnow().isoformat()
-                    if isinstance(event_time, str):
-                        event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
-                except Exception as e:
-                    print(f"Error parsing event time for {external_id}: {str(e)}")
-                    event_time = datetime.utcnow()
-                
-                # Create alert with proper status
-                alert_data = AlertCreate(
-                    title=title,
-                    description=desc,
-                    severity=map_severity(properties.get("severity", "Minor")),
-                    state_id=valid_states[state_code].id,
-                    source="weather.gov",
-                    external_id=external_id,
-                    event_timestamp=event_time,
-                    event_type=event,
-                    status=AlertStatus.NEW
-                )
-                
-                # Use nested transaction for atomic alert creation
-                with db.begin_nested() as alert_savepoint:
-                    try:
-                        db_alert = Alert(**alert_data.dict())
-                        db.add(db_alert)
-                        db.flush()
-                        
-                        # Process all zones in batch with validation
-                        successful_zones = []
-                        region_fips_codes = []  # To store state_fips + region_code values
-                        
-                        for ugc_code in ugc_codes:
-                            state_code, region_type, region_code = process_ugc_code(ugc_code)
-                            if not all([state_code, region_type, region_code]):
-                                print(f"Invalid UGC code: {ugc_code}")
-                                continue
-                            
-                            # Get state FIPS code for this region
-                            state = valid_states.get(state_code)
-                            if not state or not state.fips:
-                                print(f"Missing state FIPS for {state_code}")
-                                continue
-                            
-                            # Create region_fips (state_fips + region_code)
-                            region_fips = f"{state.fips}{region_code}"
-                            print(f"Created region_fips: {region_fips} from state FIPS {state.fips} and region code {region_code}")
-                            region_fips_codes.append(region_fips)
-                            
-                            # Get or create zone/county using cached data
-                            zone_county = existing_zones.get(ugc_code)
-                            if not zone_county:
-                                try:
-                                    zone_county = ZoneCounty(
-                                        code=ugc_code,
-                                        name=f"{state_code} {region_type.name} {region_code}",
-                                        fips=region_fips,
-                                        type=region_type,
-                                        state_id=state.id,
-                                        status=True
-                                    )
-                                    db.add(zone_county)
-                                    existing_zones[ugc_code] = zone_county
-                                except Exception as e:
-                                    print(f"Error creating zone/county {ugc_code}: {str(e)}")
-                                    continue
-                            
-                            successful_zones.append((zone_county, region_type))
-                        
-                        # Process zipcodes one zone at a time if we have valid zones
-                        if successful_zones:
-                            db.flush()  # Ensure all zones have IDs
-                            
-                            all_zipcodes = []  # Collect all zipcodes from all zones
-                            affected_areas = []  # For storing all affected areas
-                            
-                            # Process each zone individually
-                            for zone_county, region_type in successful_zones:
-                                try:
-                                    # Each zone has its own FIPS code that can be used to fetch zipcodes
-                                    if zone_county.fips:
-                                        print(f"Processing zone {zone_county.code} with FIPS {zone_county.fips}")
-                                        # Pass only the one zone and its FIPS code
-                                        zipcodes, zip_summary = process_zipcodes_with_dataset(
-                                            db, 
-                                            properties, 
-                                            [zone_county],  # Pass just this one zone
-                                            [zone_county.fips]  # Pass just this zone's FIPS code
-                                        )
-                                        
-                                        # Update zipcode summary totals for this zone
-                                        for key in zipcode_summary:
-                                            # Map old keys to new keys for backward compatibility
-                                            if key == "processed_same_codes":
-                                                zipcode_summary[key] += zip_summary.get("processed_region_fips_codes", 0)
-                                            elif key == "skipped_same_codes":
-                                                zipcode_summary[key] += zip_summary.get("skipped_region_fips_codes", 0)
-                                            else:
-                                                zipcode_summary[key] += zip_summary.get(key, 0)
-                                        
-                                        # Add zipcodes for this zone to the overall list
-                                        all_zipcodes.extend(zipcodes)
-                                        
-                                        # Create affected areas and mock policyholders for this zone and its zipcodes
-                                        
-                                        for zipcode in zipcodes:
-                                            print(f"Processing zipcode {zipcode.code} in zone/county {zone_county.code}")
-                                            
-                                            # Generate 1-2 mock policyholders for this zipcode
-                                            for _ in range(random.randint(1, 2)):
-                                                # Generate random mock data
-                                                name = f"Test Policy {random.choice(string.ascii_uppercase)}{random.randint(1000, 9999)}"
-                                                policy_id = f"POL-{str(uuid.uuid4())[:8].upper()}"
-                                                claims = random.randint(0, 5)
-                                                premium = round(random.uniform(500.0, 5000.0), 2)
-
-                                                addresses = [
-                                                    {"address": f"{data['address']}, {data['state']}, {data['zipcode']}, {data['county']}"}
-                                                    for data in [
-                                                        {"address": "1600 Amphitheatre Parkway", "state": "California", "zipcode": "94043", "county": "Santa Clara"},
-                                                        {"address": "350 Fifth Avenue", "state": "New York", "zipcode": "10118", "county": "New York"},
-                                                    ]
-                                                ]
-
-                                                email_phone_map = {
-                                                    "mohan@pionedata.com": "8940026533",
-                                                    "mouli@pionedata.com": "9003274650",
-                                                    "roshini@pionedata.com": "9363793428",
-                                                    "sarala@pionedata.com": "9345012271",
-                                                    "deepak@pionedata.com": "6379453546"
-                                                }
-
-                                                # Pick a random email and its corresponding phone
-                                                selected_email = random.choice(list(email_phone_map.keys()))
-                                                selected_phoneno = email_phone_map[selected_email]
-
-                                                selected = random.choice(addresses)
-                                                
-                                                # Create policyholder record
-                                                policyholder = Policyholder(
-                                                    policy_id=policy_id,
-                                                    name=name,
-                                                    zipcode_id=zipcode.id,
-                                                    claims=claims,
-                                                    premium=premium,
-                                                    status=True,
-                                                    state_id=zone_county.state_id,
-                                                    county_id=zone_county.id,
-                                                    address=selected["address"],
-                                                    email=selected_email,
-                                                    phoneno=selected_phoneno
-                                                )
-                                                db.add(policyholder)
-                                            
-                                            print(f"Printed Zipcode Id: {zipcode.id}")
-                                            print(f"Adding affected area for zipcode {zipcode.code} in zone/county {zone_county.code}")
-                                            affected_areas.append(
-                                                AlertAffectedArea(
-                                                    alert_id=db_alert.id,
-                                                    zipcode_id=zipcode.id,
-                                                    zone_county_id=zone_county.id,
-                                                    region_type=AreaRegionType.ZIPCODE
-                                                )
-                                            )
-                                    else:
-                                        print(f"Zone {zone_county.code} has no FIPS code, skipping")
-                                        
-                                except Exception as e:
-                                    print(f"Error processing zipcodes for zone {zone_county.code}: {str(e)}")
-                                    # Continue to next zone even if one fails
-                                    continue
-                            
-                            # Save all affected areas in one bulk operation
-                            if affected_areas:
-                                db.bulk_save_objects(affected_areas)
-                                db.flush()
-                            
-                            # If no zipcodes were found at all, add zone/county areas
-                            if not all_zipcodes:
-                                print("No zipcodes found for any zone, adding zone/county areas")
-                                zone_areas = []
-                                for zone_county, region_type in successful_zones:
-                                    area_type = AreaRegionType.ZONE if region_type == RegionType.ZONE else AreaRegionType.COUNTY
-                                    zone_areas.append(
-                                        AlertAffectedArea(
-                                            alert_id=db_alert.id,
-                                            zone_county_id=zone_county.id,
-                                            region_type=area_type
-                                        )
-                                    )
-                                    
-                                if zone_areas:
-                                    db.bulk_save_objects(zone_areas)
-                                    db.flush()
-                            
-                            alert_savepoint.commit()
-                            processed_count += 1
-                            print(f"✅ Successfully processed alert: {title}")
-                        else:
-                            print(f"❌ No valid zones for alert: {title}")
-                            alert_savepoint.rollback()
-                            error_count += 1
-                            
-                    except Exception as e:
-                        print(f"❌ Error processing alert {external_id}: {str(e)}")
-                        alert_savepoint.rollback()
-                        error_count += 1
-                        continue
-                        
-            except Exception as e:
-                print(f"❌ Error creating alert data: {str(e)}")
-                error_count += 1
-                continue
 
         # Create single sync log entry and commit all changes together
         sync_log = AlertSyncLog(
             total_alerts=total_alerts,
             processed_count=processed_count,
+            updated_count=updated_count,
+            unchanged_count=unchanged_count,
             ignored_by_state=ignored_by_state,
             ignored_by_missing_data=ignored_by_missing_data,
             error_count=error_count,
@@ -404,22 +1122,39 @@ def process_weather_alerts(db: Session, alerts: List[dict]) -> Optional[List[dic
             skipped_same_codes=zipcode_summary["skipped_same_codes"],
             found_zipcodes=zipcode_summary["found_zipcodes"],
             created_zipcode_mappings=zipcode_summary["created_mappings"],
-            used_zipcode_mappings=zipcode_summary["existing_mappings"]
+            used_zipcode_mappings=zipcode_summary["existing_mappings"],
+            ugc_cache_hits=ugc_cache.hits,
+            ugc_cache_misses=ugc_cache.misses
         )
         db.add(sync_log)
 
         # Single commit for both alerts and sync log
-        db.commit()
+        with timer.stage("commit"):
+            db.commit()
+        _accept_pending_validators()
+        ugc_cache.promote()
+
+        # Timings include the commit, so they are stored right after it
+        rows_written = {
+            "alerts": processed_count + updated_count,
+            "zones_counties": len(existing_zones) - zones_before,
+            "zipcodes": zipcode_summary["created_mappings"],
+            "alert_affected_areas": write_summary["alert_affected_areas"],
+            "policyholders": write_summary["policyholders"],
+        }
+        _store_sync_timings(db, sync_log, timer, rows_written)
 
         # Print summary
         print("\n📊 Alert Processing Summary:")
-        if processed_count > 0:
+        if processed_count > 0 or updated_count > 0:
             print(f"Total Alerts: {total_alerts}")
             print(f"Processed: {processed_count} ✅")
+            print(f"Updated: {updated_count} 🔄")
         else:
             print(f"No new alerts processed")
             print(f"Total Alerts: {total_alerts}")
         
+        print(f"Unchanged: {unchanged_count} ⏩")
         print(f"Ignored Alerts:")
         print(f"  - By State ({len(missing_states)} missing states): {ignored_by_state} 🌎")
         print(f"  - By Missing/Invalid Data: {ignored_by_missing_data} ⏩")
@@ -432,28 +1167,49 @@ def process_weather_alerts(db: Session, alerts: List[dict]) -> Optional[List[dic
         print(f"Found zipcodes in dataset: {zipcode_summary['found_zipcodes']}")
         print(f"Created new zipcode mappings: {zipcode_summary['created_mappings']}")
         print(f"Used existing zipcode mappings: {zipcode_summary['existing_mappings']}")
+        print(f"UGC cache: {ugc_cache.hits} hits, {ugc_cache.misses} misses ({len(ugc_cache)} cached)")
+
+        print(f"\n📊 Rows written ({write_summary['writer']}):")
+        print(f"Affected areas: {write_summary['alert_affected_areas']}")
+        print(f"Policyholders: {write_summary['policyholders']}")
+
+        print(f"\n⏱ Stage timings ({sync_log.duration_ms:.0f} ms, {sync_log.statement_count} statements):")
+        for stage, stage_ms in sync_log.stage_timings.items():
+            print(f"  - {stage}: {stage_ms:.1f} ms")
 
-        # Return categorized alerts and zipcode summary only if some were processed
-        if processed_count > 0:
-            from app.services.monitoring.alert_group_service import get_alerts_grouped_by_category_with_zipcodes
-            grouped_alerts = get_alerts_grouped_by_category_with_zipcodes(db)
+        # Return categorized alerts and zipcode summary only if some were written; they
+        # are materialized once here as the snapshot the category-risk endpoint serves
+        if processed_count > 0 or updated_count > 0:
+            from app.services.monitoring.category_risk_snapshot_service import build_category_risk_snapshot
+            snapshot = build_category_risk_snapshot(db, sync_log.id)
             
             # Add zipcode summary to the response
             result = {
-                "alerts": grouped_alerts,
+                "alerts": snapshot.payload,
+                "snapshot_version": snapshot.id,
                 "zipcode_summary": {
                     "processed_region_fips_codes": zipcode_summary["processed_same_codes"],
                     "skipped_region_fips_codes": zipcode_summary["skipped_same_codes"],
                     "found_zipcodes": zipcode_summary["found_zipcodes"],
                     "created_mappings": zipcode_summary["created_mappings"],
                     "existing_mappings": zipcode_summary["existing_mappings"]
+                },
+                "write_summary": write_summary,
+                "timings": {
+                    "duration_ms": sync_log.duration_ms,
+                    "stages_ms": sync_log.stage_timings,
+                    "statement_count": sync_log.statement_count,
+                    "rows_written": sync_log.rows_written
                 }
             }
             return result
 
+    except FeedBodyUnchanged:
+        raise
     except Exception as e:
         print(f"❌ Critical error in alert processing: {str(e)}")
         db.rollback()
+        ugc_cache.discard_pending()
         raise
     
     return None
@@ -470,42 +1226,47 @@ def get_alerts_grouped_by_category(
     results = []
     categories = db.query(Category).filter(Category.status == True).all()
 
-    for cat in categories:
-        # Get all event names mapped to this category
-        event_names = (
-            db.query(Event.name)
-            .join(CategoryEventMapping, CategoryEventMapping.event_id == Event.id)
-            .filter(CategoryEventMapping.category_id == cat.id)
-            .all()
-        )
-
-        # Flatten and lowercase names
-        event_names = [name[0] for name in event_names if name[0]]
+    # Alerts of every category in one join over the links written at ingestion; an
+    # alert appears once per mapped event name found in its event_type
+    links_query = (
+        db.query(AlertCategory.category_id, AlertCategory.event_id, Alert)
+        .join(Alert, Alert.id == AlertCategory.alert_id)
+        .filter(AlertCategory.category_id.in_([cat.id for cat in categories]))
+    )
 
-        # Create base query for alerts
-        base_query = db.query(Alert)
+    # Apply state filter if provided
+    if state and state != "all":
+        links_query = links_query.join(State, State.id == Alert.state_id).filter(State.code == state)
 
-        # Apply state filter if provided
-        if state and state != "all":
-            base_query = base_query.join(State).filter(State.code == state)
+    # Apply severity filter if provided
+    if severity and severity != "all":
+        links_query = links_query.filter(Alert.severity == severity)
 
-        # Apply severity filter if provided
-        if severity and severity != "all":
-            base_query = base_query.filter(Alert.severity == severity)
+    alerts_by_category = defaultdict(list)
+    if categories:
+        for category_id, _, alert in links_query.order_by(
+            AlertCategory.category_id, AlertCategory.event_id, Alert.id
+        ).all():
+            alerts_by_category[category_id].append(alert)
 
-        matched_alerts = []
-        for event_name in event_names:
-            alerts = base_query.filter(Alert.event_type.ilike(f"%{event_name}%")).all()
-            matched_alerts.extend(alerts)
+    # Codes of the states of every matched alert, in one query
+    state_ids = {
+        alert.state_id for alerts in alerts_by_category.values() for alert in alerts if alert.state_id
+    }
+    state_codes_by_id = dict(
+        db.query(State.id, State.code).filter(State.id.in_(state_ids)).all()
+    ) if state_ids else {}
 
+    for cat in categories:
+        matched_alerts = alerts_by_category.get(cat.id, [])
         active_count = len(matched_alerts)
 
         # Extract unique states and get their codes from the states table
-        state_ids = list({alert.state_id for alert in matched_alerts if alert.state_id})
-        state_codes = []
-        if state_ids:
-            states = db.query(State).filter(State.id.in_(state_ids)).all()
-            state_codes = [state.code for state in states]
+        state_codes = [
+            state_codes_by_id[state_id]
+            for state_id in {alert.state_id for alert in matched_alerts if alert.state_id}
+            if state_id in state_codes_by_id
+        ]
 
         # Build affected_areas as JSON array with random policyholder counts
         affected_areas = [
@@ -545,8 +1306,9 @@ def process_ugc_code(code: str) -> Tuple[str, RegionType, str]:
     """Process a UGC code into state code, region type, and region code.
     UGC format: SS[CZ]nnn where SS=state, C=county, Z=zone, nnn=number.
     
-    The region_code can be combined with state FIPS to create a region_fips code
-    that can be used to lookup zipcodes in the zipcode dataset.
+    For county codes the region_code combined with state FIPS is the county FIPS code.
+    Zone numbers are not FIPS codes; zones resolve to zipcodes through the NWS
+    zone-county correlation (see ugc_zipcode_service).
     """
     
     if not code or len(code) < 6:
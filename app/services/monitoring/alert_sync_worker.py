@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.monitoring.sync_metrics import LoopLagMonitor
+
+logger = logging.getLogger(__name__)
+
+# A single worker serializes syncs (background job and manual trigger) and keeps
+# all blocking SQLAlchemy work off the event loop.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-ingest")
+
+loop_lag_monitor = LoopLagMonitor(interval=settings.ALERT_LOOP_LAG_SAMPLE_SECONDS)
+
+
+def _call_with_session(func: Callable[..., Any], *args: Any) -> Any:
+    """Run `func(db, *args)` with a session owned by the worker thread."""
+    db = SessionLocal()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+async def run_in_ingest_worker(func: Callable[..., Any], *args: Any) -> Any:
+    """Run `func(db, *args)` on the ingestion worker with its own session.
+    The event loop only awaits completion."""
+    loop = asyncio.get_running_loop()
+    loop_lag_monitor.active_syncs += 1
+    try:
+        return await loop.run_in_executor(_executor, _call_with_session, func, *args)
+    finally:
+        loop_lag_monitor.active_syncs -= 1
+
+
+def submit_to_ingest_worker(func: Callable[..., Any], *args: Any) -> Future:
+    """Queue `func(db, *args)` on the ingestion worker without waiting for it, for
+    work a request triggers but should not pay for. Failures are logged."""
+    future = _executor.submit(_call_with_session, func, *args)
+
+    def log_failure(done: Future) -> None:
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Error in {getattr(func, '__name__', func)} on the ingest worker: {done.exception()}")
+
+    future.add_done_callback(log_failure)
+    return future
+
+
+def shutdown_ingest_worker() -> None:
+    """Wait for a running sync to finish and stop the worker thread."""
+    _executor.shutdown(wait=True)
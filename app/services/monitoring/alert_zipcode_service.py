@@ -1,48 +1,63 @@
 from sqlalchemy.orm import Session
 from app.models.common.zones_counties import ZoneCounty
 from app.models.common.zipcodes import Zipcode
-from app.models.common.zipcode_dataset import ZipCodeDataset
-from app.models.common.zipcode2_dataset import ZipCode2Dataset
-from typing import List, Set
+from app.services.monitoring.zipcode_backends import ZipcodeBackend, get_zipcode_backend
+from app.services.monitoring.zipcode_index import get_county_zip_index
+from app.services.monitoring.affected_area_service import store_zone_zipcodes
+from typing import List, Set, Dict, Iterable, Optional
 import logging
 from sqlalchemy.exc import IntegrityError
 
 
 logger = logging.getLogger(__name__)
 
+def get_active_zipcode_backend() -> ZipcodeBackend:
+    """The configured zipcode backend, served from its in-memory snapshot when loaded."""
+    index = get_county_zip_index()
+    if index is not None:
+        return index
+    return get_zipcode_backend()
+
 def get_zipcodes_by_region_fips(db: Session, region_fips_codes: List[str]) -> Set[str]:
     """
-    Get zipcodes from zipcode_dataset table using region FIPS codes (state FIPS + region code)
+    Get zipcodes using region FIPS codes (state FIPS + region code) from the
+    configured zipcode backend (ZIPCODE_BACKEND)
     """
     try:
         if not region_fips_codes:
             return set()
         
         print(f"Fetching zipcodes for region FIPS codes: {region_fips_codes}")
-            
-        # Single query for all region FIPS codes
-        zipcodes = db.query(ZipCodeDataset.zip).filter(
-            ZipCodeDataset.county_fips.in_(region_fips_codes)
-        ).all()
 
-        # Alternative query for zipcode2_dataset if needed
-        # zipcodes = db.query(ZipCode2Dataset.zip_code).filter(
-        #     ZipCode2Dataset.primary_county_code.in_(region_fips_codes)
-        # ).all()
-        
-        return {z[0] for z in zipcodes}
+        # Single lookup for all region FIPS codes
+        zipcodes_by_fips = get_active_zipcode_backend().zipcodes_by_fips(db, region_fips_codes)
+        return set().union(*zipcodes_by_fips.values())
     except Exception as e:
         logger.error(f"Error getting zipcodes for region FIPS codes {region_fips_codes}: {str(e)}")
         return set()
 
+def get_zipcodes_by_region_fips_map(db: Session, region_fips_codes: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Same lookup as get_zipcodes_by_region_fips, keyed by region FIPS code so that
+    every zone of a whole batch of alerts resolves in a single query.
+    """
+    region_fips_codes = list(set(region_fips_codes))
+    if not region_fips_codes:
+        return {}
+
+    return get_active_zipcode_backend().zipcodes_by_fips(db, region_fips_codes)
+
 def process_zipcodes_with_dataset(
     db: Session, 
     properties: dict,
     zone_counties: List[ZoneCounty],
-    region_fips_codes: List[str] = None
+    region_fips_codes: List[str] = None,
+    dataset_zipcodes: Optional[Set[str]] = None
 ) -> tuple[List[Zipcode], dict]:
     """
     Process and create/update zipcodes for multiple zones/counties using region_fips codes.
+    `dataset_zipcodes` skips the region FIPS lookup when the zipcodes are already
+    resolved (e.g. from the UGC -> zipcode lookup).
     Returns tuple of (list of associated zipcodes, summary dict).
     """
     result_zipcodes = []
@@ -65,7 +80,8 @@ def process_zipcodes_with_dataset(
         summary["processed_region_fips_codes"] = len(region_fips_codes)
             
         # Get zipcodes from dataset for all region FIPS codes
-        dataset_zipcodes = get_zipcodes_by_region_fips(db, region_fips_codes)
+        if dataset_zipcodes is None:
+            dataset_zipcodes = get_zipcodes_by_region_fips(db, region_fips_codes)
         
         if not dataset_zipcodes:
             print(f"No zipcodes found in dataset for region FIPS codes: {region_fips_codes}")
@@ -80,49 +96,30 @@ def process_zipcodes_with_dataset(
                 Zipcode.code.in_(dataset_zipcodes)
             ).all()
         }
-        
-        # Track processed zip-zone combinations to avoid duplicates
-        processed_combinations = set()
-        new_zipcodes = []
-        
-        # Process zipcodes in batch
-        for zip_code in dataset_zipcodes:
-            for zone_county in zone_counties:
-                # Skip if we've already processed this combination
-                combo = (zip_code, zone_county.id)
-                if combo in processed_combinations:
-                    continue
-                    
-                processed_combinations.add(combo)
-                existing = existing_zipcodes.get(zip_code)
-                
-                if existing:
-                    # Always reuse the existing mapping
-                    result_zipcodes.append(existing)
-                    summary["existing_mappings"] += 1
-                else:
-                    # Create new zipcode
-                    new_zipcode = Zipcode(
-                        code=zip_code,
-                        name=f"ZIP {zip_code}",
-                        zone_county_id=zone_county.id,
-                        status=True
-                    )
-                    new_zipcodes.append(new_zipcode)
-                    summary["created_mappings"] += 1
-        
-        # Bulk insert new zipcodes
+        summary["existing_mappings"] = len(existing_zipcodes)
+        result_zipcodes.extend(existing_zipcodes.values())
+
+        # New zipcodes keep the first zone/county that needed them
+        new_zipcodes = [
+            Zipcode(code=zip_code, name=f"ZIP {zip_code}", zone_county_id=zone_counties[0].id, status=True)
+            for zip_code in sorted(set(dataset_zipcodes) - set(existing_zipcodes))
+        ]
         if new_zipcodes:
             try:
-                # Instead of bulk_save_objects, use add_all to get IDs back
-                for zipcode in new_zipcodes:
-                    db.add(zipcode)
+                db.add_all(new_zipcodes)
                 db.flush()
                 print(f"Successfully created {len(new_zipcodes)} new zipcode mappings")
+                summary["created_mappings"] = len(new_zipcodes)
                 result_zipcodes.extend(new_zipcodes)
             except Exception as e:
                 logger.error(f"Error inserting zipcodes: {str(e)}")
                 raise
+
+        # Every zone/county gets all the zipcodes in the zone <-> zipcode association,
+        # so the next alerts resolve it with one join
+        store_zone_zipcodes(db, [
+            (zone_county.id, zipcode.id) for zone_county in zone_counties for zipcode in result_zipcodes
+        ])
                 
         # Log summary
         print(
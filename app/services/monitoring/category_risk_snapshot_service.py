@@ -0,0 +1,110 @@
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+import json
+import logging
+import time
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.monitoring.category_risk_snapshot import CategoryRiskSnapshot
+from app.services.monitoring.alert_group_service import get_alerts_grouped_by_category_with_zipcodes
+from app.services.monitoring.alert_sync_worker import submit_to_ingest_worker
+
+logger = logging.getLogger(__name__)
+
+# Payload shapes materialized by every build, keyed by their deepest include level:
+# the whole hierarchy, and the default one without individual policyholders
+SNAPSHOT_INCLUDES = ("policyholders", "affected_areas")
+
+# (version, serialized payload) of the last snapshot of each shape read or built by this process
+_latest: Dict[str, Tuple[int, bytes]] = {}
+
+
+def snapshot_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _serialize(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _without_policyholders(value: Any) -> Any:
+    """Copy of a payload without the individual policyholders lists."""
+    if isinstance(value, dict):
+        return {key: _without_policyholders(item) for key, item in value.items() if key != "policyholders"}
+    if isinstance(value, list):
+        return [_without_policyholders(item) for item in value]
+    return value
+
+
+def build_category_risk_snapshot(db: Session, sync_log_id: Optional[int] = None) -> CategoryRiskSnapshot:
+    """
+    Compute the grouped category-risk hierarchy, store it as a new snapshot version of
+    every SNAPSHOT_INCLUDES shape and commit. Snapshots of a shape beyond the
+    CATEGORY_RISK_SNAPSHOTS_KEPT most recent ones are deleted. Run once per sync that
+    wrote alerts and after the alert categories change. Returns the whole hierarchy.
+    """
+    started = time.perf_counter()
+    payload = get_alerts_grouped_by_category_with_zipcodes(db)
+    build_ms = (time.perf_counter() - started) * 1000
+    alert_count = sum(len(category["cat_events"]) for category in payload)
+
+    # The lighter shapes are derived from the whole hierarchy, without querying again
+    payloads = {"policyholders": payload, "affected_areas": _without_policyholders(payload)}
+    snapshots = {}
+    for include in SNAPSHOT_INCLUDES:
+        snapshots[include] = CategoryRiskSnapshot(
+            sync_log_id=sync_log_id,
+            include=include,
+            payload=payloads[include],
+            alert_count=alert_count,
+            build_ms=build_ms
+        )
+        db.add(snapshots[include])
+    db.flush()
+    for include in SNAPSHOT_INCLUDES:
+        stale_ids = [
+            snapshot_id for (snapshot_id,) in db.query(CategoryRiskSnapshot.id)
+            .filter(CategoryRiskSnapshot.include == include)
+            .order_by(CategoryRiskSnapshot.id.desc())
+            .offset(settings.CATEGORY_RISK_SNAPSHOTS_KEPT)
+            .all()
+        ]
+        if stale_ids:
+            db.query(CategoryRiskSnapshot).filter(
+                CategoryRiskSnapshot.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+    db.commit()
+
+    for include, snapshot in snapshots.items():
+        _latest[include] = (snapshot.id, _serialize(payloads[include]))
+    snapshot = snapshots["policyholders"]
+    print(f"Built category-risk snapshot v{snapshot.id}: {alert_count} alerts in {build_ms:.0f} ms")
+    return snapshot
+
+
+def schedule_category_risk_snapshot_rebuild() -> Future:
+    """Rebuild the snapshot on the ingestion worker, after the syncs queued before it,
+    once categories, events or their mappings changed. The caller does not wait, the
+    new version (and ETag) is served when the build commits."""
+    return submit_to_ingest_worker(build_category_risk_snapshot)
+
+
+def get_latest_category_risk_snapshot(db: Session, include: str = "policyholders") -> Tuple[int, bytes]:
+    """
+    Version and serialized payload of the latest snapshot of the `include` shape (one
+    of SNAPSHOT_INCLUDES). One indexed query when this process already holds that
+    version, the snapshot row otherwise; a first snapshot is built when none exists yet.
+    """
+    if include not in SNAPSHOT_INCLUDES:
+        raise ValueError(f"No snapshot of the {include!r} shape, expected one of {', '.join(SNAPSHOT_INCLUDES)}")
+    version = db.query(func.max(CategoryRiskSnapshot.id)).filter(CategoryRiskSnapshot.include == include).scalar()
+    if version is None:
+        build_category_risk_snapshot(db)
+        return _latest[include]
+    if include not in _latest or _latest[include][0] != version:
+        payload = db.query(CategoryRiskSnapshot.payload).filter(CategoryRiskSnapshot.id == version).scalar()
+        _latest[include] = (version, _serialize(payload))
+    return _latest[include]
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.db.bulk_writer import write_rows
+from app.db.lookups import lookup_chunks, matches_any
+from app.models.common.county_zipcode import CountyZipcode
+from app.models.common.zipcode_dataset import ZipCodeDataset
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered per bulk write while rebuilding county_zipcodes
+REBUILD_BATCH_SIZE = 10000
+
+
+def county_zipcode_rows(
+    zip_code: str,
+    county_fips: Optional[str],
+    county_fips_all: Optional[str],
+    county_weights: Optional[dict]
+) -> List[dict]:
+    """
+    Expand one zipcode_dataset row into one (county_fips, zip, weight) row per county.
+    county_fips_all is pipe separated and county_weights maps county FIPS to the
+    percentage of the zip code in that county. Counties without a weight share the
+    zip code evenly; a row without county_fips_all keeps its primary county.
+    """
+    counties = [fips.strip() for fips in (county_fips_all or "").split("|") if len(fips.strip()) == 5]
+    if not counties and county_fips and len(county_fips) == 5:
+        counties = [county_fips]
+    counties = list(dict.fromkeys(counties))
+
+    weights = county_weights if isinstance(county_weights, dict) else {}
+    rows = []
+    for fips in counties:
+        try:
+            weight = float(weights[fips]) / 100
+        except (KeyError, TypeError, ValueError):
+            weight = 1.0 / len(counties)
+        rows.append({"county_fips": fips, "zip": zip_code, "weight": weight})
+    return rows
+
+
+def _iter_county_zipcode_rows(db: Session) -> Iterator[dict]:
+    rows = db.query(
+        ZipCodeDataset.zip,
+        ZipCodeDataset.county_fips,
+        ZipCodeDataset.county_fips_all,
+        ZipCodeDataset.county_weights
+    ).yield_per(REBUILD_BATCH_SIZE)
+    for zip_code, county_fips, county_fips_all, county_weights in rows:
+        yield from county_zipcode_rows(zip_code, county_fips, county_fips_all, county_weights)
+
+
+def rebuild_county_zipcodes(db: Session) -> int:
+    """Rebuild the county -> zip inverted index from zipcode_dataset with bulk writes
+    and commit. Run after every dataset import. Returns the number of rows."""
+    db.query(CountyZipcode).delete(synchronize_session=False)
+    # Read everything first: the rows are written on the same connection
+    rows = list(_iter_county_zipcode_rows(db))
+    written = 0
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        written += write_rows(db, CountyZipcode, rows[start:start + REBUILD_BATCH_SIZE])
+    db.commit()
+    print(f"Indexed {written} county -> zipcode rows")
+    return written
+
+
+def get_county_zipcode_weights(db: Session, county_fips_codes: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Zip codes of several counties with the share of each zip code inside the county,
+    keyed by county FIPS; one indexed read per lookup chunk."""
+    result = defaultdict(dict)
+    for chunk in lookup_chunks(list(set(county_fips_codes))):
+        for county_fips, zip_code, weight in db.query(
+            CountyZipcode.county_fips, CountyZipcode.zip, CountyZipcode.weight
+        ).filter(matches_any(db, CountyZipcode.county_fips, chunk)).all():
+            result[county_fips][zip_code] = weight
+    return dict(result)
@@ -0,0 +1,19 @@
+from typing import Dict, Iterable
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.db.lookups import lookup_chunks, matches_any
+from app.models.common.zipcode_exposure import ZipcodeExposure
+
+logger = logging.getLogger(__name__)
+
+
+def get_zipcode_exposures(db: Session, zipcode_ids: Iterable[int]) -> Dict[int, ZipcodeExposure]:
+    """Policyholder totals of several zipcodes keyed by zipcode id, read by primary key.
+    Zipcodes without active policyholders may be missing or have a zero count."""
+    exposures = {}
+    for chunk in lookup_chunks(list({zipcode_id for zipcode_id in zipcode_ids if zipcode_id})):
+        for exposure in db.query(ZipcodeExposure).filter(matches_any(db, ZipcodeExposure.zipcode_id, chunk)).all():
+            exposures[exposure.zipcode_id] = exposure
+    return exposures
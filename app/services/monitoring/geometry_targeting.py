@@ -0,0 +1,164 @@
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+import math
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.common.dataset_version_service import get_dataset_version
+from app.services.monitoring.zipcode_backends import ZipcodeBackend, get_zipcode_backend
+
+logger = logging.getLogger(__name__)
+
+
+def points_in_ring(lngs: np.ndarray, lats: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """
+    Even-odd ray casting of many points against one closed or open ring of
+    (lng, lat) vertices. Loops over the edges, every edge test is vectorized over
+    all points. Returns a boolean mask.
+    """
+    inside = np.zeros(len(lngs), dtype=bool)
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    for ax, ay, bx, by in zip(x1, y1, x2, y2):
+        if ay == by:
+            continue
+        crosses = (ay > lats) != (by > lats)
+        x_cross = ax + (lats - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (lngs < x_cross)
+    return inside
+
+
+def geometry_polygons(geometry: Optional[dict]) -> List[List[np.ndarray]]:
+    """Rings of every polygon of a GeoJSON Polygon/MultiPolygon (outer ring first,
+    then holes); empty for any other geometry."""
+    if not isinstance(geometry, dict):
+        return []
+    coordinates = geometry.get("coordinates") or []
+    if geometry.get("type") == "Polygon":
+        polygons = [coordinates]
+    elif geometry.get("type") == "MultiPolygon":
+        polygons = coordinates
+    else:
+        return []
+
+    result = []
+    for polygon in polygons:
+        try:
+            rings = [np.asarray(ring, dtype=float)[:, :2] for ring in polygon]
+        except (TypeError, ValueError, IndexError):
+            continue
+        if rings and len(rings[0]) >= 3:
+            result.append(rings)
+    return result
+
+
+class ZipCentroidGrid:
+    """
+    Zip code centroids of one zipcode backend bucketed into a uniform lat/lng grid.
+
+    Points are sorted by grid cell so every cell is one slice of the arrays. A polygon
+    lookup only tests the points of the cells its bounding box covers.
+    """
+
+    def __init__(
+        self, version: int, rows: List[Tuple[str, float, float]], cell_degrees: float,
+        source: Optional[ZipcodeBackend] = None,
+    ):
+        self.source = source
+        self.version = version
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+        rows = [
+            (zip_code, lat, lng) for zip_code, lat, lng in rows
+            if zip_code and lat is not None and lng is not None
+        ]
+        lats = np.fromiter((lat for _, lat, _ in rows), dtype=float, count=len(rows))
+        lngs = np.fromiter((lng for _, _, lng in rows), dtype=float, count=len(rows))
+        zips = np.array([zip_code for zip_code, _, _ in rows], dtype=object)
+
+        rows_index = np.floor(lats / cell_degrees).astype(np.int64)
+        cols_index = np.floor(lngs / cell_degrees).astype(np.int64)
+        order = np.lexsort((cols_index, rows_index))
+        self._lats, self._lngs, self._zips = lats[order], lngs[order], zips[order]
+        rows_index, cols_index = rows_index[order], cols_index[order]
+
+        if len(order):
+            boundaries = np.flatnonzero((np.diff(rows_index) != 0) | (np.diff(cols_index) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts, ends):
+                self._cells[(int(rows_index[start]), int(cols_index[start]))] = (int(start), int(end))
+
+    @classmethod
+    def build(cls, db: Session, source: ZipcodeBackend) -> "ZipCentroidGrid":
+        started = time.perf_counter()
+        version = get_dataset_version(db, source.dataset)
+        rows = list(source.zipcode_centroids(db))
+        grid = cls(version, rows, settings.ALERT_GEOMETRY_GRID_DEGREES, source)
+        print(
+            f"Built zipcode centroid grid of {source.name} v{version}: {len(grid)} centroids "
+            f"in {len(grid._cells)} cells in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return grid
+
+    def __len__(self) -> int:
+        return len(self._zips)
+
+    def _candidates(self, outer_ring: np.ndarray) -> np.ndarray:
+        """Indexes of the points in the grid cells covered by the ring's bounding box."""
+        min_lng, min_lat = outer_ring.min(axis=0)
+        max_lng, max_lat = outer_ring.max(axis=0)
+        slices = []
+        for row in range(math.floor(min_lat / self.cell_degrees), math.floor(max_lat / self.cell_degrees) + 1):
+            for col in range(math.floor(min_lng / self.cell_degrees), math.floor(max_lng / self.cell_degrees) + 1):
+                cell = self._cells.get((row, col))
+                if cell is not None:
+                    slices.append(np.arange(*cell))
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def zipcodes_in_geometry(self, geometry: Optional[dict]) -> Set[str]:
+        """Zip codes whose centroid lies inside a GeoJSON Polygon/MultiPolygon."""
+        zipcodes = set()
+        for rings in geometry_polygons(geometry):
+            candidates = self._candidates(rings[0])
+            if not len(candidates):
+                continue
+            lngs, lats = self._lngs[candidates], self._lats[candidates]
+            inside = points_in_ring(lngs, lats, rings[0])
+            for hole in rings[1:]:
+                inside &= ~points_in_ring(lngs, lats, hole)
+            zipcodes.update(self._zips[candidates[inside]])
+        return zipcodes
+
+
+# Grid shared by all syncs; replaced as a whole when the dataset version changes
+_grid: Optional[ZipCentroidGrid] = None
+
+
+def refresh_zip_centroid_grid(db: Session) -> Optional[ZipCentroidGrid]:
+    """Build the grid of the configured zipcode backend on first use and rebuild it when
+    its dataset was re-imported. One primary-key lookup otherwise; None when targeting
+    is disabled."""
+    global _grid
+    if not settings.ALERT_GEOMETRY_TARGETING:
+        return None
+    source = get_zipcode_backend()
+    if _grid is None or _grid.source is not source or _grid.version != get_dataset_version(db, source.dataset):
+        _grid = ZipCentroidGrid.build(db, source)
+    return _grid
+
+
+def resolve_geometry_zipcodes(geometry: Optional[dict]) -> Optional[Set[str]]:
+    """
+    Zip codes targeted by an alert polygon, or None when the alert has to be expanded
+    from its UGC codes: targeting is disabled, the alert has no polygon, or no zip code
+    centroid falls inside it (a polygon smaller than a zip code).
+    """
+    if not settings.ALERT_GEOMETRY_TARGETING or _grid is None or not geometry:
+        return None
+    zipcodes = _grid.zipcodes_in_geometry(geometry)
+    return zipcodes or None
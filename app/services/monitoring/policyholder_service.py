@@ -0,0 +1,49 @@
+import random
+import string
+import uuid
+from typing import Any, Dict
+
+from app.models.common.zones_counties import ZoneCounty
+
+# Sample contact data used for the mock policyholders generated during ingestion
+MOCK_ADDRESSES = [
+    {"address": f"{data['address']}, {data['state']}, {data['zipcode']}, {data['county']}"}
+    for data in [
+        {"address": "1600 Amphitheatre Parkway", "state": "California", "zipcode": "94043", "county": "Santa Clara"},
+        {"address": "350 Fifth Avenue", "state": "New York", "zipcode": "10118", "county": "New York"},
+    ]
+]
+
+MOCK_EMAIL_PHONE_MAP = {
+    "mohan@pionedata.com": "8940026533",
+    "mouli@pionedata.com": "9003274650",
+    "roshini@pionedata.com": "9363793428",
+    "sarala@pionedata.com": "9345012271",
+    "deepak@pionedata.com": "6379453546"
+}
+
+
+def mock_policyholder_count() -> int:
+    """Number of mock policyholders to generate for one alerted zipcode (1-2)."""
+    return random.randint(1, 2)
+
+
+def mock_policyholder_values(zipcode_id: int, zone_county: ZoneCounty) -> Dict[str, Any]:
+    """Column values for one random mock policyholder in a zipcode of `zone_county`."""
+    # Pick a random email and its corresponding phone
+    selected_email = random.choice(list(MOCK_EMAIL_PHONE_MAP.keys()))
+    selected = random.choice(MOCK_ADDRESSES)
+
+    return {
+        "policy_id": f"POL-{str(uuid.uuid4())[:8].upper()}",
+        "name": f"Test Policy {random.choice(string.ascii_uppercase)}{random.randint(1000, 9999)}",
+        "zipcode_id": zipcode_id,
+        "claims": random.randint(0, 5),
+        "premium": round(random.uniform(500.0, 5000.0), 2),
+        "status": True,
+        "state_id": zone_county.state_id,
+        "county_id": zone_county.id,
+        "address": selected["address"],
+        "email": selected_email,
+        "phoneno": MOCK_EMAIL_PHONE_MAP[selected_email],
+    }
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Number of loop lag samples kept per bucket (idle / during sync)
+LAG_SAMPLE_WINDOW = 3000
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values`, or None when there are no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class LoopLagMonitor:
+    """Measure event loop responsiveness by timing how late a periodic sleep wakes up.
+
+    Every request served by the loop pays at least this lag, so comparing the
+    percentiles sampled while an alert sync runs against idle samples shows
+    whether ingestion is leaking onto the loop.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active_syncs = 0
+        self._samples: Dict[str, Deque[float]] = {
+            "idle": deque(maxlen=LAG_SAMPLE_WINDOW),
+            "sync": deque(maxlen=LAG_SAMPLE_WINDOW),
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = (time.perf_counter() - started - self.interval) * 1000
+            bucket = "sync" if self.active_syncs else "idle"
+            self._samples[bucket].append(max(lag_ms, 0.0))
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Lag percentiles in milliseconds for idle periods and for periods with a running sync."""
+        result = {}
+        for bucket, samples in self._samples.items():
+            values = list(samples)
+            result[bucket] = {
+                "samples": len(values),
+                "p50_ms": percentile(values, 50),
+                "p99_ms": percentile(values, 99),
+                "max_ms": max(values) if values else None,
+            }
+        return result
+
+
+class StageTimer:
+    """Wall time per ingestion stage plus the number of SQL statements of one sync.
+
+    Stages nest: entering a stage pauses the enclosing one, so every stage reports
+    its exclusive time even when generator stages pull from each other.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.statement_count = 0
+        self._stack: List[List] = []  # [stage, started]
+        self._started = time.perf_counter()
+        self._premeasured = 0.0
+
+    def _enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.seconds[parent[0]] += now - parent[1]
+        self._stack.append([name, now])
+
+    def _exit(self) -> None:
+        now = time.perf_counter()
+        name, started = self._stack.pop()
+        self.seconds[name] += now - started
+        if self._stack:
+            self._stack[-1][1] = now
+
+    @contextmanager
+    def stage(self, name: str):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Attribute the time spent producing each item of `items` to `name`."""
+        items = iter(items)
+        while True:
+            self._enter(name)
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield item
+
+    def stage_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.seconds.items()}
+
+    def duration_ms(self) -> float:
+        """Time since the timer was created plus any pre-measured stages (fetch, parse)."""
+        elapsed = time.perf_counter() - self._started
+        return round((elapsed + self._premeasured) * 1000, 3)
+
+    def add_premeasured(self, stages: Dict[str, float]) -> None:
+        """Add stages measured before this timer existed, e.g. the fetch on the event loop."""
+        for name, seconds in stages.items():
+            self.seconds[name] += seconds
+            self._premeasured += seconds
+
+
+# Timer of the sync running on the current thread (the ingestion worker)
+_active_timer: ContextVar[Optional[StageTimer]] = ContextVar("active_sync_timer", default=None)
+
+
+@contextmanager
+def track_sync(timer: StageTimer):
+    """Make `timer` the target of sync_stage() and of statement counting."""
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
+
+
+@contextmanager
+def sync_stage(name: str):
+    """Time a block under `name` on the active sync timer; a no-op outside a sync."""
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    timer = _active_timer.get()
+    if timer is not None:
+        timer.statement_count += 1
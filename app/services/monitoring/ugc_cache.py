@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.common.dataset_version_service import (
+    get_dataset_versions, ZIPCODE_DATASET, ZIPCODE2_DATASET, UGC_ZIPCODES, ZONES_ZIPCODES
+)
+
+logger = logging.getLogger(__name__)
+
+# Datasets a cached resolution is derived from; bumping any of them empties the cache
+CACHE_DATASETS = (ZIPCODE_DATASET, ZIPCODE2_DATASET, UGC_ZIPCODES, ZONES_ZIPCODES)
+
+
+class ResolvedUgc(NamedTuple):
+    """A UGC code resolved down to database ids: its zone/county and every
+    (zip code, zipcode id) pair of the area."""
+    zone_county_id: int
+    zipcodes: Tuple[Tuple[str, int], ...]
+
+
+class UgcResolutionCache:
+    """
+    LRU cache of resolved UGC codes shared by the alerts of a sync and across syncs.
+
+    Entries resolved during a sync reference rows written in its transaction, so they
+    are staged and only promoted once the sync commits; staged entries already serve
+    the following alerts of the same sync. Entries expire after `ttl_seconds` and the
+    whole cache is dropped when the version stamp of the reference data changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[Tuple[int, ...]] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, ResolvedUgc]]" = OrderedDict()
+        self._pending: Dict[str, ResolvedUgc] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def set_version(self, version: Tuple[int, ...]) -> None:
+        """Drop every entry when the reference data changed since they were resolved."""
+        if version != self.version:
+            if self._entries:
+                print(f"Reference data changed, dropping {len(self._entries)} cached UGC resolutions")
+            self._entries.clear()
+            self._pending.clear()
+            self.version = version
+
+    def get(self, ugc_code: str, zone_county_id: int) -> Optional[ResolvedUgc]:
+        """Cached resolution of `ugc_code`, None on a miss. An entry whose zone/county
+        is not the current one is stale and counts as a miss."""
+        if not self.enabled:
+            return None
+        resolved = self._pending.get(ugc_code)
+        if resolved is None:
+            cached = self._entries.get(ugc_code)
+            if cached is not None:
+                cached_at, resolved = cached
+                if time.monotonic() - cached_at > self.ttl_seconds:
+                    del self._entries[ugc_code]
+                    resolved = None
+                else:
+                    self._entries.move_to_end(ugc_code)
+        if resolved is None or resolved.zone_county_id != zone_county_id:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return resolved
+
+    def stage(self, ugc_code: str, resolved: ResolvedUgc) -> None:
+        """Keep a resolution made by the running sync until it commits."""
+        if self.enabled:
+            self._pending[ugc_code] = resolved
+
+    def promote(self) -> None:
+        """The sync committed: its staged resolutions become regular entries."""
+        now = time.monotonic()
+        for ugc_code, resolved in self._pending.items():
+            self._entries[ugc_code] = (now, resolved)
+            self._entries.move_to_end(ugc_code)
+        self._pending.clear()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard_pending(self) -> None:
+        """The sync rolled back: forget what it resolved."""
+        self._pending.clear()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+ugc_cache = UgcResolutionCache(settings.UGC_CACHE_MAX_ENTRIES, settings.UGC_CACHE_TTL_SECONDS)
+
+
+def refresh_ugc_cache(db: Session) -> UgcResolutionCache:
+    """Start a sync: check the reference data version stamp (one query) and reset
+    the hit/miss counters."""
+    versions = get_dataset_versions(db, CACHE_DATASETS)
+    ugc_cache.set_version(tuple(versions[name] for name in CACHE_DATASETS))
+    ugc_cache.discard_pending()
+    ugc_cache.reset_counters()
+    return ugc_cache
@@ -0,0 +1,147 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Union
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.common.nws_zone_county import NwsZoneCounty
+from app.models.common.ugc_zipcode import UgcZipcode
+from app.models.common.zones_counties import ZoneCounty, RegionType
+from app.services.common.dataset_version_service import get_dataset_version, bump_dataset_version, UGC_ZIPCODES
+from app.db.lookups import lookup_chunks, matches_any
+from app.services.monitoring.alert_zipcode_service import get_zipcodes_by_region_fips_map
+from app.services.monitoring.affected_area_service import rebuild_zipcode_zone_county
+from app.services.monitoring.zipcode_backends import get_zipcode_backend
+
+logger = logging.getLogger(__name__)
+
+# Version of ugc_zipcodes seen by the current sync; 0 means it was never built
+_ugc_zipcodes_version = 0
+
+# County UGCs come from the county -> zip pairs of the zipcode backend (state FIPS +
+# county number), zone UGCs from the NWS zone-county correlation. A zone's weight adds
+# up the shares of the zip code in every county the zone overlaps.
+REBUILD_UGC_ZIPCODES_SQL = """
+INSERT INTO ugc_zipcodes (ugc_code, zip, weight)
+SELECT s.code || 'C' || substr(c.county_fips, 3, 3), c.zip, c.weight
+FROM ({county_zipcodes}) c
+JOIN states s ON s.fips = substr(c.county_fips, 1, 2)
+UNION ALL
+SELECT z.ugc_code, c.zip, CASE WHEN sum(c.weight) > 1 THEN 1.0 ELSE sum(c.weight) END
+FROM nws_zone_counties z
+JOIN ({county_zipcodes}) c ON c.county_fips = z.county_fips
+GROUP BY z.ugc_code, c.zip
+"""
+
+
+def parse_zone_county_file(path: Union[str, Path]) -> List[dict]:
+    """
+    Parse the NWS zone-county correlation file (bp*.dbx, pipe separated):
+    STATE|ZONE|CWA|NAME|STATE_ZONE|COUNTY|FIPS|TIME_ZONE|FE_AREA|LAT|LON
+    Returns one row per (zone UGC, county FIPS) pair.
+    """
+    rows = {}
+    skipped = 0
+    with open(path, "r", encoding="latin-1") as file:
+        for line in file:
+            fields = line.rstrip("\r\n").split("|")
+            if len(fields) < 7:
+                skipped += 1
+                continue
+            state_code, zone, cwa, zone_name, _, county_name, county_fips = (f.strip() for f in fields[:7])
+            if len(state_code) != 2 or not zone.isdigit() or not county_fips.isdigit() or len(county_fips) != 5:
+                skipped += 1
+                continue
+            ugc_code = f"{state_code.upper()}Z{int(zone):03d}"
+            rows[(ugc_code, county_fips)] = {
+                "ugc_code": ugc_code,
+                "state_code": state_code.upper(),
+                "zone_name": zone_name[:100],
+                "county_fips": county_fips,
+                "county_name": county_name[:100],
+                "cwa": cwa[:10],
+            }
+    if skipped:
+        print(f"Skipped {skipped} malformed lines in {path}")
+    return list(rows.values())
+
+
+def rebuild_ugc_zipcodes(db: Session) -> int:
+    """Recompute the ugc_code -> zip lookup from the configured zipcode backend, states
+    and nws_zone_counties in one transaction and bump its dataset version. Run after
+    the datasets or ZIPCODE_BACKEND change. Returns the number of (ugc_code, zip) pairs."""
+    db.execute(text("DELETE FROM ugc_zipcodes"))
+    db.execute(text(REBUILD_UGC_ZIPCODES_SQL.format(county_zipcodes=get_zipcode_backend().county_zipcodes_sql)))
+    count = db.query(UgcZipcode).count()
+    bump_dataset_version(db, UGC_ZIPCODES)
+    print(f"Materialized {count} UGC -> zipcode pairs")
+    return count
+
+
+def load_zone_county_file(db: Session, path: Union[str, Path]) -> int:
+    """Replace the NWS zone-county correlation with the contents of `path` and
+    rebuild the materialized UGC -> zipcode lookup and the zone <-> zipcode
+    association. Returns the rows loaded."""
+    rows = parse_zone_county_file(path)
+    if not rows:
+        raise ValueError(f"No zone-county rows found in {path}")
+    db.query(NwsZoneCounty).delete(synchronize_session=False)
+    db.bulk_insert_mappings(NwsZoneCounty, rows)
+    print(f"Loaded {len(rows)} zone-county rows from {path}")
+    rebuild_ugc_zipcodes(db)
+    rebuild_zipcode_zone_county(db)
+    return len(rows)
+
+
+def refresh_ugc_zipcodes_version(db: Session) -> int:
+    """Read the ugc_zipcodes version once per sync to know whether it can be used."""
+    global _ugc_zipcodes_version
+    _ugc_zipcodes_version = get_dataset_version(db, UGC_ZIPCODES)
+    if not _ugc_zipcodes_version:
+        logger.warning(
+            "ugc_zipcodes is not built, zone UGC codes resolve to no zipcodes; "
+            "run scripts/load_nws_zone_counties.py"
+        )
+    return _ugc_zipcodes_version
+
+
+def get_ugc_zipcode_weights(db: Session, ugc_codes: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Zip codes of several zones/counties with the share of each zip code inside the
+    area, keyed by UGC code, for exposure calculations. Requires ugc_zipcodes to be built."""
+    result = defaultdict(dict)
+    for chunk in lookup_chunks(list(set(ugc_codes))):
+        for ugc_code, zip_code, weight in db.query(
+            UgcZipcode.ugc_code, UgcZipcode.zip, UgcZipcode.weight
+        ).filter(matches_any(db, UgcZipcode.ugc_code, chunk)).all():
+            result[ugc_code][zip_code] = 1.0 if weight is None else weight
+    return dict(result)
+
+
+def resolve_ugc_zipcodes(db: Session, zones: Iterable[ZoneCounty]) -> Dict[str, Set[str]]:
+    """
+    Zip codes of every zone/county keyed by UGC code. Counties are looked up by FIPS
+    in the configured zipcode backend (from memory when its snapshot is loaded), zones
+    with one indexed read of ugc_zipcodes per lookup chunk. Until ugc_zipcodes has been
+    built zones get no zipcodes, since a zone number is not a county FIPS code.
+    """
+    zones = list(zones)
+    if not zones:
+        return {}
+
+    result = defaultdict(set)
+    counties = [zone for zone in zones if zone.type == RegionType.COUNTY and zone.fips]
+    zipcodes_by_fips = get_zipcodes_by_region_fips_map(db, {zone.fips for zone in counties})
+    for zone in counties:
+        if zone.fips in zipcodes_by_fips:
+            result[zone.code] |= zipcodes_by_fips[zone.fips]
+
+    if _ugc_zipcodes_version:
+        codes = list({zone.code for zone in zones if zone.type != RegionType.COUNTY})
+        for chunk in lookup_chunks(codes):
+            for ugc_code, zip_code in db.query(UgcZipcode.ugc_code, UgcZipcode.zip).filter(
+                matches_any(db, UgcZipcode.ugc_code, chunk)
+            ).all():
+                result[ugc_code].add(zip_code)
+    return dict(result)
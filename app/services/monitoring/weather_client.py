@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import random
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class WeatherFeedError(Exception):
+    """Raised when the weather.gov feed could not be fetched after all retries."""
+
+
+def open_weather_client() -> httpx.AsyncClient:
+    """Create the application-lifetime client used for all weather.gov requests."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=settings.WEATHER_API_HTTP2,
+            timeout=httpx.Timeout(
+                settings.WEATHER_API_TIMEOUT_SECONDS,
+                connect=settings.WEATHER_API_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.WEATHER_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEATHER_API_MAX_CONNECTIONS
+            ),
+            headers={"User-Agent": settings.WEATHER_API_USER_AGENT}
+        )
+    return _client
+
+
+async def close_weather_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_weather_client() -> httpx.AsyncClient:
+    """Return the shared client, opening it when running outside the app lifespan (scripts)."""
+    return open_weather_client()
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.WEATHER_API_BACKOFF_MAX_SECONDS)
+    ceiling = min(
+        settings.WEATHER_API_BACKOFF_MAX_SECONDS,
+        settings.WEATHER_API_BACKOFF_BASE_SECONDS * (2 ** attempt)
+    )
+    return random.uniform(0, ceiling)
+
+
+async def send_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, str]] = None,
+    stream: bool = False
+) -> httpx.Response:
+    """GET `url` on the shared client, retrying transport errors and retryable statuses.
+    Returns a successful (2xx/304) response or raises WeatherFeedError.
+    With stream=True the caller is responsible for closing the response."""
+    client = get_weather_client()
+    max_retries = settings.WEATHER_API_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            request = client.build_request("GET", url, headers=headers, params=params)
+            response = await client.send(request, stream=stream)
+            if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+                await response.aclose()
+                delay = _backoff_delay(attempt, response)
+                logger.warning(
+                    f"weather.gov returned {response.status_code} for {url}, "
+                    f"retrying in {delay:.2f}s ({attempt + 1}/{max_retries})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except httpx.TransportError as e:
+            if attempt < max_retries:
+                delay = _backoff_delay(attempt)
+                logger.warning(
+                    f"Error requesting {url}: {str(e)}, "
+                    f"retrying in {delay:.2f}s ({attempt + 1}/{max_retries})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            raise WeatherFeedError(f"Error requesting {url}: {str(e)}") from e
+        except httpx.HTTPStatusError as e:
+            await e.response.aclose()
+            raise WeatherFeedError(
+                f"weather.gov returned {e.response.status_code} for {url}"
+            ) from e
@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.common.county_zipcode import CountyZipcode
+from app.models.common.zipcode_dataset import ZipCodeDataset
+from app.models.common.zipcode2_dataset import ZipCode2Dataset
+from app.services.common.dataset_version_service import ZIPCODE_DATASET, ZIPCODE2_DATASET
+
+
+class ZipcodeBackend(ABC):
+    """
+    County FIPS -> zip codes lookups and zip code centroids against one zipcode
+    reference source.
+
+    `dataset` is the dataset_versions name bumped when the source is re-imported,
+    which tells in-memory snapshots of the source when to rebuild. A backend missing
+    one of the lookups cannot be instantiated.
+    """
+    name = ""
+    dataset = ""
+    # SELECT of every (county_fips, zip, weight) row, for set-based SQL over the source;
+    # weight is the share of the zip code in the county, 0-1
+    county_zipcodes_sql = ""
+
+    @abstractmethod
+    def zipcodes_by_fips(self, db: Session, county_fips_codes: Iterable[str]) -> Dict[str, Set[str]]:
+        """Zip codes of several counties keyed by FIPS; unknown counties are left out."""
+
+    @abstractmethod
+    def county_zipcodes(self, db: Session) -> Iterable[Tuple[str, str]]:
+        """Every (county FIPS, zip) pair, ordered by county FIPS then zip."""
+
+    @abstractmethod
+    def county_fips_codes(self, db: Session) -> List[str]:
+        """Every county FIPS code known to the source."""
+
+    @abstractmethod
+    def zipcode_centroids(self, db: Session) -> Iterable[Tuple[str, Optional[float], Optional[float]]]:
+        """Every (zip, lat, lng) centroid; lat/lng are None when the source has none."""
+
+
+class ZipcodeDatasetBackend(ZipcodeBackend):
+    """zipcode_dataset, read through its county_zipcodes inverted index, so zip codes
+    straddling a county line belong to every county listed in county_fips_all."""
+    name = "zipcode_dataset"
+    dataset = ZIPCODE_DATASET
+    county_zipcodes_sql = "SELECT county_fips, zip, weight FROM county_zipcodes"
+
+    def zipcodes_by_fips(self, db: Session, county_fips_codes: Iterable[str]) -> Dict[str, Set[str]]:
+        result = defaultdict(set)
+        rows = db.query(CountyZipcode.county_fips, CountyZipcode.zip).filter(
+            CountyZipcode.county_fips.in_(list(county_fips_codes))
+        ).all()
+        for county_fips, zip_code in rows:
+            result[county_fips].add(zip_code)
+        return dict(result)
+
+    def county_zipcodes(self, db: Session) -> Iterable[Tuple[str, str]]:
+        return (
+            db.query(CountyZipcode.county_fips, CountyZipcode.zip)
+            .order_by(CountyZipcode.county_fips, CountyZipcode.zip)
+            .yield_per(10000)
+        )
+
+    def county_fips_codes(self, db: Session) -> List[str]:
+        return [fips for (fips,) in db.query(CountyZipcode.county_fips).distinct().all()]
+
+    def zipcode_centroids(self, db: Session) -> Iterable[Tuple[str, Optional[float], Optional[float]]]:
+        return db.query(ZipCodeDataset.zip, ZipCodeDataset.lat, ZipCodeDataset.lng).all()
+
+
+class Zipcode2DatasetBackend(ZipcodeBackend):
+    """zipcode2_dataset, matched on the indexed primary_county_code column only, so
+    every zip code lies wholly in its primary county. Centroids come from geo_point."""
+    name = "zipcode2_dataset"
+    dataset = ZIPCODE2_DATASET
+    county_zipcodes_sql = (
+        "SELECT primary_county_code AS county_fips, zip_code AS zip, 1.0 AS weight FROM zipcode2_dataset "
+        "WHERE primary_county_code IS NOT NULL"
+    )
+
+    def zipcodes_by_fips(self, db: Session, county_fips_codes: Iterable[str]) -> Dict[str, Set[str]]:
+        result = defaultdict(set)
+        rows = db.query(ZipCode2Dataset.primary_county_code, ZipCode2Dataset.zip_code).filter(
+            ZipCode2Dataset.primary_county_code.in_(list(county_fips_codes))
+        ).all()
+        for county_fips, zip_code in rows:
+            result[county_fips].add(zip_code)
+        return dict(result)
+
+    def county_zipcodes(self, db: Session) -> Iterable[Tuple[str, str]]:
+        return (
+            db.query(ZipCode2Dataset.primary_county_code, ZipCode2Dataset.zip_code)
+            .order_by(ZipCode2Dataset.primary_county_code, ZipCode2Dataset.zip_code)
+            .yield_per(10000)
+        )
+
+    def county_fips_codes(self, db: Session) -> List[str]:
+        return [
+            fips for (fips,) in db.query(ZipCode2Dataset.primary_county_code).distinct().all() if fips
+        ]
+
+    def zipcode_centroids(self, db: Session) -> Iterable[Tuple[str, Optional[float], Optional[float]]]:
+        return [
+            (zip_code, *parse_geo_point(geo_point))
+            for zip_code, geo_point in db.query(ZipCode2Dataset.zip_code, ZipCode2Dataset.geo_point).all()
+        ]
+
+
+def parse_geo_point(geo_point: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """(lat, lng) of a "lat, lng" string, (None, None) when it is missing or malformed."""
+    try:
+        lat, lng = (float(part) for part in geo_point.split(","))
+    except (AttributeError, ValueError):
+        return None, None
+    return lat, lng
+
+
+ZIPCODE_BACKENDS: Dict[str, ZipcodeBackend] = {
+    backend.name: backend for backend in (ZipcodeDatasetBackend(), Zipcode2DatasetBackend())
+}
+
+
+def get_zipcode_backend(name: str = None) -> ZipcodeBackend:
+    """The backend named `name`, by default the one selected by ZIPCODE_BACKEND."""
+    name = name or settings.ZIPCODE_BACKEND
+    try:
+        return ZIPCODE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown zipcode backend {name!r}, expected one of {', '.join(ZIPCODE_BACKENDS)}")
@@ -0,0 +1,121 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.common.dataset_version_service import get_dataset_version
+from app.services.monitoring.zipcode_backends import ZipcodeBackend, get_zipcode_backend
+
+logger = logging.getLogger(__name__)
+
+
+class CountyZipIndex(ZipcodeBackend):
+    """Read-only in-memory snapshot of another zipcode backend (county FIPS -> zip codes).
+
+    Zip codes are stored as integers in one flat array, grouped by county and sorted
+    within each county; `offsets` delimits the slice of every county. A lookup is a
+    dict probe plus a slice, with no database round trip.
+    """
+
+    def __init__(self, source: ZipcodeBackend, version: int, rows: Iterable[Tuple[str, str]]):
+        self.source = source
+        self.name = f"snapshot:{source.name}"
+        self.dataset = source.dataset
+        self.version = version
+        self._slots: Dict[str, int] = {}
+        self._offsets = array("I", [0])
+        self._zips = array("I")
+
+        current_fips = None
+        skipped = 0
+        # Rows arrive ordered by county FIPS, then zip
+        for county_fips, zip_code in rows:
+            if not county_fips or not zip_code or not zip_code.isdigit() or len(zip_code) != 5:
+                skipped += 1
+                continue
+            if county_fips != current_fips:
+                if current_fips is not None:
+                    self._offsets.append(len(self._zips))
+                self._slots[county_fips] = len(self._slots)
+                current_fips = county_fips
+            self._zips.append(int(zip_code))
+        if current_fips is not None:
+            self._offsets.append(len(self._zips))
+        if skipped:
+            logger.warning(f"Skipped {skipped} {source.name} rows without a county FIPS or a 5-digit zip")
+
+    @classmethod
+    def build(cls, db: Session, source: ZipcodeBackend) -> "CountyZipIndex":
+        started = time.perf_counter()
+        version = get_dataset_version(db, source.dataset)
+        index = cls(source, version, source.county_zipcodes(db))
+        print(
+            f"Built county FIPS -> zipcode index of {source.name} v{version}: {len(index._slots)} counties, "
+            f"{len(index._zips)} zipcodes in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self._zips)
+
+    def zipcodes(self, county_fips: str) -> List[str]:
+        """Sorted zip codes of one county, empty when the county is unknown."""
+        slot = self._slots.get(county_fips)
+        if slot is None:
+            return []
+        return [f"{zip_code:05d}" for zip_code in self._zips[self._offsets[slot]:self._offsets[slot + 1]]]
+
+    def zipcodes_by_fips(self, db: Optional[Session], county_fips_codes: Iterable[str]) -> Dict[str, Set[str]]:
+        """Zip codes of several counties keyed by FIPS; unknown counties are left out.
+        Answered from memory, `db` is not used."""
+        result = {}
+        for county_fips in county_fips_codes:
+            zipcodes = self.zipcodes(county_fips)
+            if zipcodes:
+                result[county_fips] = set(zipcodes)
+        return result
+
+    def county_zipcodes(self, db: Optional[Session]) -> Iterable[Tuple[str, str]]:
+        for county_fips, slot in self._slots.items():
+            for zip_code in self._zips[self._offsets[slot]:self._offsets[slot + 1]]:
+                yield county_fips, f"{zip_code:05d}"
+
+    def county_fips_codes(self, db: Optional[Session]) -> List[str]:
+        return list(self._slots)
+
+    def zipcode_centroids(self, db: Session) -> Iterable[Tuple[str, Optional[float], Optional[float]]]:
+        """Not part of the snapshot, read from the source backend."""
+        return self.source.zipcode_centroids(db)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the index arrays."""
+        return (
+            self._zips.itemsize * len(self._zips)
+            + self._offsets.itemsize * len(self._offsets)
+        )
+
+
+# Index shared by all syncs; replaced as a whole when the dataset version changes
+_index: Optional[CountyZipIndex] = None
+
+
+def refresh_county_zip_index(db: Session) -> Optional[CountyZipIndex]:
+    """Build the index of the configured backend on first use and rebuild it when its
+    dataset was re-imported (its dataset version changed). One primary-key lookup otherwise."""
+    global _index
+    if not settings.ZIPCODE_INDEX_ENABLED:
+        return None
+    source = get_zipcode_backend()
+    if _index is None or _index.source is not source or _index.version != get_dataset_version(db, source.dataset):
+        _index = CountyZipIndex.build(db, source)
+    return _index
+
+
+def get_county_zip_index() -> Optional[CountyZipIndex]:
+    """The loaded index, or None when it is disabled or not built yet."""
+    if not settings.ZIPCODE_INDEX_ENABLED:
+        return None
+    return _index
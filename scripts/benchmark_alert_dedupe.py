@@ -0,0 +1,91 @@
+"""
+Benchmark the existing-alert lookup used by alert ingestion as the alerts table grows.
+
+Synthetic alerts are inserted with generate_series inside one transaction that is
+rolled back at the end, so the database is left untouched. At every table size the
+script times:
+  - legacy: loading every stored external_id into a Python set (the old dedupe step)
+  - bounded: load_stored_alerts for the IDs of one feed, chunked = ANY(array) lookups
+
+Usage:
+    python scripts/benchmark_alert_dedupe.py --sizes 10000 100000 1000000 10000000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.models.monitoring.alert import Alert
+from app.services.monitoring.alert_bulk_service import load_stored_alerts
+
+BENCH_PREFIX = "urn:benchmark:alert:"
+
+
+def grow_alerts(session, start: int, stop: int) -> None:
+    session.execute(
+        text(
+            "INSERT INTO alerts (title, description, status, severity, source, external_id, content_hash) "
+            "SELECT 'Benchmark alert ' || n, '', 'NEW', 'LOW', 'benchmark', :prefix || n, md5(n::text) "
+            "FROM generate_series(:start, :stop - 1) AS n"
+        ),
+        {"prefix": BENCH_PREFIX, "start": start, "stop": stop}
+    )
+    session.execute(text("ANALYZE alerts"))
+
+
+def time_call(func, repeats: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(sizes, feed_size: int, repeats: int, legacy_max: int) -> None:
+    session = SessionLocal()
+    try:
+        print(f"{'rows':>12} {'legacy ms':>12} {'bounded ms':>12}")
+        current = 0
+        for size in sorted(sizes):
+            grow_alerts(session, current, size)
+            current = size
+
+            # A feed with half of its alerts already stored and half new ones
+            stored_ids = [f"{BENCH_PREFIX}{n}" for n in range(size - feed_size // 2, size)]
+            new_ids = [f"{BENCH_PREFIX}new:{n}" for n in range(feed_size - len(stored_ids))]
+            feed_ids = stored_ids + new_ids
+
+            bounded = time_call(lambda: load_stored_alerts(session, feed_ids), repeats)
+            if size <= legacy_max:
+                legacy = time_call(
+                    lambda: {row[0] for row in session.query(Alert.external_id).all()},
+                    repeats
+                )
+                legacy_label = f"{legacy:12.1f}"
+            else:
+                legacy_label = f"{'skipped':>12}"
+            print(f"{size:>12} {legacy_label} {bounded:12.2f}")
+    finally:
+        # Never keep the synthetic rows
+        session.rollback()
+        session.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--feed-size", type=int, default=500, help="Alerts per simulated feed")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=1_000_000,
+                        help="Largest table size at which the legacy full load is timed")
+    args = parser.parse_args()
+    run(args.sizes, args.feed_size, args.repeats, args.legacy_max)
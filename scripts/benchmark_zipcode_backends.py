@@ -0,0 +1,116 @@
+"""
+Compare the county FIPS -> zipcode backends on a synthetic 1,000-alert feed.
+
+Every alert covers 1-5 counties picked from the counties known to any backend.
+For zipcode_dataset, zipcode2_dataset and an in-memory snapshot of each, the
+script reports:
+  - lookup latency: one lookup per zone, as the per-alert ingestion path does
+  - memory: table + index size for the tables, array size for the snapshots
+  - coverage: counties and zipcodes found, and zipcodes found by only one table
+
+Usage:
+    python scripts/benchmark_zipcode_backends.py --alerts 1000 --repeats 5
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.services.monitoring.zipcode_backends import ZIPCODE_BACKENDS
+from app.services.monitoring.zipcode_index import CountyZipIndex
+
+# Table (and index) holding the rows of every database backend
+BACKEND_TABLES = {
+    "zipcode_dataset": "county_zipcodes",
+    "zipcode2_dataset": "zipcode2_dataset",
+}
+
+
+def synthetic_feed(county_fips_codes, alerts: int, seed: int):
+    """Zones (county FIPS codes) of every alert in the feed."""
+    rng = random.Random(seed)
+    return [rng.sample(county_fips_codes, rng.randint(1, min(5, len(county_fips_codes)))) for _ in range(alerts)]
+
+
+def resolve_feed(session, backend, feed):
+    """Zipcodes found per county over the whole feed."""
+    found = {}
+    for zones in feed:
+        for county_fips in zones:
+            found.update(backend.zipcodes_by_fips(session, [county_fips]))
+    return found
+
+
+def median_ms(func, repeats: int):
+    timings, result = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def table_kib(session, table: str) -> float:
+    return session.execute(text("SELECT pg_total_relation_size(:table)"), {"table": table}).scalar() / 1024
+
+
+def run(alerts: int, repeats: int, seed: int) -> None:
+    session = SessionLocal()
+    try:
+        county_fips_codes = sorted({
+            fips for backend in ZIPCODE_BACKENDS.values() for fips in backend.county_fips_codes(session)
+        })
+        if not county_fips_codes:
+            print("No zipcode reference data, import it first (scripts/import_zipcodes.py)")
+            return
+        feed = synthetic_feed(county_fips_codes, alerts, seed)
+        lookups = sum(len(zones) for zones in feed)
+        print(f"Feed: {alerts} alerts, {lookups} zone lookups over {len(county_fips_codes)} counties\n")
+
+        backends = []
+        for name, backend in ZIPCODE_BACKENDS.items():
+            backends.append((backend, f"{table_kib(session, BACKEND_TABLES[name]):.0f} KiB table"))
+            build_ms, index = median_ms(lambda: CountyZipIndex.build(session, backend), 1)
+            backends.append((index, f"{index.memory_bytes() / 1024:.0f} KiB arrays, built in {build_ms:.0f} ms"))
+
+        print(f"{'backend':<28} {'median ms':>10} {'per lookup us':>14} {'counties':>9} {'zipcodes':>9}  memory")
+        found_by = {}
+        for backend, memory in backends:
+            elapsed, found = median_ms(lambda: resolve_feed(session, backend, feed), repeats)
+            found_by[backend.name] = found
+            zipcodes = set().union(*found.values()) if found else set()
+            print(
+                f"{backend.name:<28} {elapsed:10.1f} {elapsed * 1000 / lookups:14.1f} "
+                f"{len(found):>9} {len(zipcodes):>9}  {memory}"
+            )
+
+        # Coverage differences between the two tables on the same feed
+        first, second = list(ZIPCODE_BACKENDS)
+        pairs_first = {(fips, zip_code) for fips, zips in found_by[first].items() for zip_code in zips}
+        pairs_second = {(fips, zip_code) for fips, zips in found_by[second].items() for zip_code in zips}
+        print(f"\n(county, zipcode) pairs only in {first}: {len(pairs_first - pairs_second)}")
+        print(f"(county, zipcode) pairs only in {second}: {len(pairs_second - pairs_first)}")
+        print(f"Counties only in {first}: {len(set(found_by[first]) - set(found_by[second]))}")
+        print(f"Counties only in {second}: {len(set(found_by[second]) - set(found_by[first]))}")
+        for name in ZIPCODE_BACKENDS:
+            if found_by[name] != found_by[f"snapshot:{name}"]:
+                print(f"⚠️ The snapshot of {name} and the table returned different zipcodes")
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.alerts, args.repeats, args.seed)
@@ -0,0 +1,42 @@
+"""
+Rewrite the stored affected areas for ALERT_AREA_STORAGE=zone.
+
+Every zone/county of an alert whose zipcode rows cover all zipcodes of the zone in
+zipcode_zone_county is replaced by one zone/county row; its zipcodes are read back
+through the mapping. Alerts are processed in batches, one transaction each. Run it
+after `alembic upgrade head` has created and filled zipcode_zone_county, and with
+--expand to go back to one row per zipcode before switching to ALERT_AREA_STORAGE=zipcode.
+
+Usage:
+    python scripts/compact_affected_areas.py --batch-size 1000
+    python scripts/compact_affected_areas.py --expand
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.monitoring.affected_area_service import rewrite_affected_areas
+
+
+def compact_affected_areas(expand: bool, batch_size: int) -> None:
+    session = SessionLocal()
+    try:
+        rewrite_affected_areas(session, expand=expand, batch_size=batch_size)
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expand", action="store_true", help="Expand zone/county rows back to zipcode rows")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Alerts rewritten per transaction")
+    args = parser.parse_args()
+    compact_affected_areas(args.expand, args.batch_size)
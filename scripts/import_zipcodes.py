@@ -11,6 +11,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models.common.zipcode_dataset import ZipCodeDataset
 from app.db.session import SessionLocal, engine
+from app.services.common.dataset_version_service import bump_dataset_version, ZIPCODE_DATASET
+from app.services.monitoring.ugc_zipcode_service import rebuild_ugc_zipcodes
+from app.services.monitoring.affected_area_service import rebuild_zipcode_zone_county
+from app.services.monitoring.county_zipcode_service import rebuild_county_zipcodes
 
 def import_zipcodes():
     session = SessionLocal()
@@ -71,6 +75,12 @@ def import_zipcodes():
                 session.bulk_save_objects(batch)
                 session.commit()
             
+            # Let in-memory indexes, the UGC -> zipcode lookup and the zone <-> zipcode
+            # association over the dataset rebuild
+            rebuild_county_zipcodes(session)
+            bump_dataset_version(session, ZIPCODE_DATASET)
+            rebuild_ugc_zipcodes(session)
+            rebuild_zipcode_zone_county(session)
             print(f"Successfully imported {total_rows} zipcode records!")
         
     except Exception as e:
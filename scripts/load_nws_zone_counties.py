@@ -0,0 +1,32 @@
+"""
+Load the NWS zone-county correlation file and rebuild the UGC -> zipcode lookup.
+
+Download the current file (bp<date>.dbx) from
+https://www.weather.gov/gis/ZoneCounty and run:
+    python scripts/load_nws_zone_counties.py path/to/bp05mr24.dbx
+"""
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.monitoring.ugc_zipcode_service import load_zone_county_file
+
+def load_nws_zone_counties(path: str):
+    session = SessionLocal()
+    try:
+        load_zone_county_file(session, path)
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    load_nws_zone_counties(sys.argv[1])
@@ -0,0 +1,29 @@
+"""
+Rebuild the UGC -> zipcode lookup and the zone <-> zipcode association from the
+configured zipcode backend. Run after changing ZIPCODE_BACKEND:
+    ZIPCODE_BACKEND=zipcode2_dataset python scripts/rebuild_zipcode_lookups.py
+"""
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.monitoring.affected_area_service import rebuild_zipcode_zone_county
+from app.services.monitoring.ugc_zipcode_service import rebuild_ugc_zipcodes
+
+def rebuild_zipcode_lookups():
+    session = SessionLocal()
+    try:
+        rebuild_ugc_zipcodes(session)
+        rebuild_zipcode_zone_county(session)
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+if __name__ == '__main__':
+    rebuild_zipcode_lookups()
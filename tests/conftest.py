@@ -0,0 +1,207 @@
+"""
+Fixtures of the test suite: an in-memory SQLite database with every table, alerts
+ingested into it, and the process-wide caches of the ingestion services reset
+between tests. Tests marked `postgres` run against the migrated PostgreSQL database
+of TEST_POSTGRES_URL instead and are skipped without it.
+"""
+import importlib
+import os
+
+# Settings are read at import time; the configured database is never connected to
+for name, value in {
+    "DATABASE_URL": "sqlite://",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.common.category import Category
+from app.models.common.category_event_mappings import CategoryEventMapping
+from app.models.common.events import Event
+from app.models.common.state import State
+from app.models.common.zipcode_dataset import ZipCodeDataset
+from app.models.common.zipcode2_dataset import ZipCode2Dataset
+from app.services.monitoring.alert_service import process_weather_alerts
+from app.services.monitoring.county_zipcode_service import rebuild_county_zipcodes
+
+MODEL_MODULES = [
+    "app.models.auth.user",
+    "app.models.common.category",
+    "app.models.common.category_event_mappings",
+    "app.models.common.county_zipcode",
+    "app.models.common.dataset_version",
+    "app.models.common.events",
+    "app.models.common.nws_zone_county",
+    "app.models.common.policyholders",
+    "app.models.common.state",
+    "app.models.common.ugc_zipcode",
+    "app.models.common.zipcode_exposure",
+    "app.models.common.zipcode_zone_county",
+    "app.models.common.zipcodes",
+    "app.models.common.zones_counties",
+    "app.models.monitoring.alert",
+    "app.models.monitoring.alert_affected_area",
+    "app.models.monitoring.alert_category",
+    "app.models.monitoring.alert_sync_log",
+    "app.models.monitoring.category_risk_snapshot",
+]
+for module in MODEL_MODULES:
+    importlib.import_module(module)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    # Let SQLAlchemy drive the transactions so that savepoints work as on PostgreSQL
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    ZipCodeDataset.metadata.create_all(engine)
+    ZipCode2Dataset.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """
+    Engine of TEST_POSTGRES_URL with every migration applied, so triggers and
+    PostgreSQL-only statements run as in production. The URL must point to a
+    throwaway database: its public schema is dropped first.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    alembic_config = Config(os.path.join(root, "alembic.ini"))
+    alembic_config.set_main_option("script_location", os.path.join(root, "alembic"))
+    # alembic/env.py connects to the URL of the settings
+    database_url = settings.DATABASE_URL
+    settings.DATABASE_URL = url
+    try:
+        command.upgrade(alembic_config, "head")
+    finally:
+        settings.DATABASE_URL = database_url
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def pg_db(pg_engine):
+    """Session on the PostgreSQL database whose commits only release savepoints;
+    everything the test wrote is rolled back."""
+    connection = pg_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches(monkeypatch):
+    """Indexes and caches built from one test database must not leak into the next."""
+    from app.services.monitoring import (
+        alert_category_service, category_risk_snapshot_service, geometry_targeting,
+        ugc_cache, ugc_zipcode_service, zipcode_index,
+    )
+    monkeypatch.setattr(zipcode_index, "_index", None)
+    monkeypatch.setattr(ugc_zipcode_service, "_ugc_zipcodes_version", 0)
+    monkeypatch.setattr(alert_category_service, "_matcher", None)
+    monkeypatch.setattr(geometry_targeting, "_grid", None)
+    monkeypatch.setattr(category_risk_snapshot_service, "_latest", {})
+    ugc_cache.ugc_cache.version = None
+    ugc_cache.ugc_cache.set_version(None)
+    for name in ("ALERT_INGEST_MODE", "ALERT_LOOKUP_CHUNK_SIZE", "ALERT_GEOMETRY_TARGETING"):
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+
+
+EVENTS = ["Tornado Warning", "Flood Watch", "Flash Flood Warning", "Heat Advisory"]
+
+
+def alert_feature(number: int) -> dict:
+    return {
+        "id": f"urn:oid:test.{number}",
+        "properties": {
+            "headline": f"Alert {number}",
+            "event": EVENTS[number % len(EVENTS)],
+            "severity": "Severe",
+            "sent": "2025-05-23T10:00:00Z",
+            "expires": "2025-05-23T12:00:00Z",
+            # Every other alert straddles two counties of two states
+            "geocode": {"UGC": ["TXC113", "OKC015"] if number % 2 else ["TXC113"]},
+        },
+    }
+
+
+def seed_database(db, count: int) -> None:
+    """Seed states, zipcodes, categories mapped to events and `count` ingested alerts."""
+    db.add_all([State(code="TX", fips="48", name="Texas"), State(code="OK", fips="40", name="Oklahoma")])
+    for zip_code, county_fips in [("75001", "48113"), ("75002", "48113"), ("75003", "48085"), ("73001", "40015")]:
+        db.add(ZipCodeDataset(
+            zip=zip_code, county_fips=county_fips, lat=32.9, lng=-96.8,
+            county_fips_all=county_fips, county_weights={county_fips: 100},
+        ))
+    for name, event_names in [("Tornado", ["Tornado Warning"]), ("Flood", ["Flood"]), ("Heat", ["Heat"]), ("Empty", [])]:
+        category = Category(name=name, description=name, status=True)
+        db.add(category)
+        db.flush()
+        for event_name in event_names:
+            mapped_event = Event(name=event_name)
+            db.add(mapped_event)
+            db.flush()
+            db.add(CategoryEventMapping(category_id=category.id, event_id=mapped_event.id))
+    db.commit()
+
+    rebuild_county_zipcodes(db)
+    process_weather_alerts(db, [alert_feature(number) for number in range(1, count + 1)])
+
+
+@pytest.fixture
+def seed_alerts(db):
+    """seed_database on the SQLite database, `count` given by the test."""
+    def seed(count: int) -> None:
+        seed_database(db, count)
+        # Maintained by triggers on PostgreSQL
+        db.execute(text(
+            "INSERT INTO zipcode_exposure (zipcode_id, policyholder_count, total_premium, total_claims) "
+            "SELECT zipcode_id, count(*), sum(premium), sum(claims) FROM policyholders "
+            "WHERE status GROUP BY zipcode_id"
+        ))
+        db.commit()
+
+    return seed
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.models.common.policyholders import Policyholder
+from app.models.common.state import State
+from app.models.common.zipcode_dataset import ZipCodeDataset
+from app.models.common.zipcodes import Zipcode
+from app.models.common.zones_counties import ZoneCounty
+from app.models.monitoring.alert import Alert
+from app.models.monitoring.alert_affected_area import AlertAffectedArea
+from app.services.monitoring import alert_bulk_service, alert_service
+from app.services.monitoring.alert_service import process_weather_alerts
+from app.services.monitoring.county_zipcode_service import rebuild_county_zipcodes
+from conftest import alert_feature
+
+
+def seed_straddling_zipcode(db):
+    db.add(State(code="TX", fips="48", name="Texas"))
+    for zip_code, county_fips, county_fips_all in [
+        ("75001", "48113", "48113"),
+        ("75002", "48113", "48113"),
+        ("75003", "48085", "48085"),
+        # Straddles both alerted counties
+        ("75010", "48113", "48113|48085"),
+    ]:
+        db.add(ZipCodeDataset(zip=zip_code, county_fips=county_fips, lat=32.9, lng=-96.8, county_fips_all=county_fips_all))
+    db.commit()
+    rebuild_county_zipcodes(db)
+
+
+@pytest.mark.parametrize("ingest_mode", ["per_alert", "bulk"])
+def test_mock_policyholders_once_per_zipcode(db, monkeypatch, ingest_mode):
+    settings.ALERT_INGEST_MODE = ingest_mode
+    for module in (alert_service, alert_bulk_service):
+        monkeypatch.setattr(module, "mock_policyholder_count", lambda: 1)
+    seed_straddling_zipcode(db)
+
+    feature = alert_feature(1)
+    feature["properties"]["geocode"]["UGC"] = ["TXC113", "TXC085"]
+    process_weather_alerts(db, [feature])
+
+    per_zipcode = dict(
+        db.query(Zipcode.code, func.count(Policyholder.id))
+        .join(Policyholder, Policyholder.zipcode_id == Zipcode.id)
+        .group_by(Zipcode.code)
+        .all()
+    )
+    assert per_zipcode == {"75001": 1, "75002": 1, "75003": 1, "75010": 1}
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("area_storage", ["zipcode", "zone"])
+def test_server_side_expansion_matches_python(pg_db, monkeypatch, area_storage):
+    """The first alert maps its zones through the Python expansion, the second one with
+    the same UGC codes is expanded by EXPAND_UGC_CODES_SQL; both store the same rows
+    and draw 1-2 policyholders once per zipcode, from a single zone."""
+    settings.ALERT_INGEST_MODE = "bulk"
+    monkeypatch.setattr(settings, "ALERT_AREA_EXPANSION", "sql")
+    monkeypatch.setattr(settings, "ALERT_AREA_STORAGE", area_storage)
+    seed_straddling_zipcode(pg_db)
+
+    def stored_areas(alert_number):
+        return sorted(
+            pg_db.query(ZoneCounty.code, Zipcode.code, AlertAffectedArea.region_type)
+            .join(Alert, Alert.id == AlertAffectedArea.alert_id)
+            .join(ZoneCounty, ZoneCounty.id == AlertAffectedArea.zone_county_id)
+            .outerjoin(Zipcode, Zipcode.id == AlertAffectedArea.zipcode_id)
+            .filter(Alert.external_id == f"urn:oid:test.{alert_number}")
+            .all(),
+            key=str,
+        )
+
+    features = [alert_feature(number) for number in (1, 2)]
+    for feature in features:
+        feature["properties"]["geocode"]["UGC"] = ["TXC113", "TXC085"]
+    process_weather_alerts(pg_db, features[:1])
+    first_holder_id = pg_db.query(func.max(Policyholder.id)).scalar()
+    process_weather_alerts(pg_db, features[1:])
+
+    assert stored_areas(2) == stored_areas(1)
+    assert len(stored_areas(2)) == (5 if area_storage == "zipcode" else 2)
+    holders = (
+        pg_db.query(Zipcode.code, func.count(Policyholder.id), func.count(func.distinct(Policyholder.county_id)))
+        .join(Policyholder, Policyholder.zipcode_id == Zipcode.id)
+        .filter(Policyholder.id > first_holder_id)
+        .group_by(Zipcode.code)
+        .all()
+    )
+    assert sorted(code for code, _, _ in holders) == ["75001", "75002", "75003", "75010"]
+    assert all(count in (1, 2) and zones == 1 for _, count, zones in holders)
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.bulk_writer import _copy_value, copy_rows, write_rows
+from app.models.common.policyholders import Policyholder
+from app.models.common.state import State
+from app.models.common.zipcodes import Zipcode
+from app.models.common.zones_counties import RegionType, ZoneCounty
+from app.models.monitoring.alert_affected_area import AlertAffectedArea
+from conftest import seed_database
+
+
+def test_copy_value():
+    assert _copy_value(None) == ""
+    assert _copy_value("") == '""'
+    assert _copy_value(True) == '"true"'
+    assert _copy_value(RegionType.COUNTY) == '"COUNTY"'
+    assert _copy_value('12 "Main", St') == '"12 ""Main"", St"'
+
+
+def test_copy_falls_back_to_insert_on_sqlite(db, monkeypatch):
+    monkeypatch.setattr(settings, "ALERT_BULK_WRITER", "copy")
+    assert write_rows(db, State, [{"code": "TX", "fips": "48", "name": "Texas"}]) == 1
+    assert write_rows(db, State, []) == 0
+    assert db.query(State.name).all() == [("Texas",)]
+
+
+@pytest.mark.postgres
+def test_copy_rows_round_trip(pg_db):
+    copy_rows(pg_db, State, [{"code": "TX", "fips": "48", "name": 'Texas, "Lone Star"'}])
+    state_id = pg_db.query(State.id).scalar()
+    rows = [
+        {"code": "TXC113", "name": "Dallas", "fips": "48113", "type": RegionType.COUNTY,
+         "state_id": state_id, "status": True, "created_by": None},
+        {"code": "TXZ119", "name": "", "fips": "48113", "type": RegionType.ZONE,
+         "state_id": state_id, "status": False, "created_by": None},
+    ]
+    assert copy_rows(pg_db, ZoneCounty, rows) == 2
+    assert pg_db.query(State.name).scalar() == 'Texas, "Lone Star"'
+    assert pg_db.query(
+        ZoneCounty.code, ZoneCounty.name, ZoneCounty.type, ZoneCounty.status, ZoneCounty.created_by
+    ).order_by(ZoneCounty.code).all() == [
+        ("TXC113", "Dallas", RegionType.COUNTY, True, None),
+        ("TXZ119", "", RegionType.ZONE, False, None),
+    ]
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("ingest_mode", ["per_alert", "bulk"])
+def test_copy_writer_ingests_like_insert(pg_db, monkeypatch, ingest_mode):
+    """Alerts ingested with ALERT_BULK_WRITER=copy store the same affected areas and
+    one or two policyholders per alerted zipcode of each alert, as with the INSERT writer."""
+    settings.ALERT_INGEST_MODE = ingest_mode
+    monkeypatch.setattr(settings, "ALERT_BULK_WRITER", "copy")
+    seed_database(pg_db, 4)
+
+    areas = pg_db.query(AlertAffectedArea.alert_id, func.count()).group_by(AlertAffectedArea.alert_id).all()
+    # TXC113 has two zipcodes, OKC015 one
+    assert sorted(count for _, count in areas) == [2, 2, 3, 3]
+    holders = dict(
+        pg_db.query(Zipcode.code, func.count(Policyholder.id))
+        .join(Policyholder, Policyholder.zipcode_id == Zipcode.id)
+        .group_by(Zipcode.code)
+        .all()
+    )
+    alerts_per_zipcode = {"75001": 4, "75002": 4, "73001": 2}
+    assert set(holders) == set(alerts_per_zipcode)
+    assert all(alerts <= holders[code] <= 2 * alerts for code, alerts in alerts_per_zipcode.items())
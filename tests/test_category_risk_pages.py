@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.monitoring.alert_group_service import decode_cursor, encode_cursor, get_category_risk_page
+
+
+def test_cursor_round_trip():
+    for position in (
+        {"k": "categories", "after": 3},
+        {"k": "alerts", "category": 2, "after": [5, 41]},
+        {"k": "policyholders", "alert": 41, "zipcode": 7, "after": 120},
+    ):
+        cursor = encode_cursor(position)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == position
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor({"k": "zipcodes", "after": 1}),
+    encode_cursor({"k": "alerts", "after": [1, 2]}),
+    encode_cursor([1, 2]),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_pages_add_up_to_the_whole_payload(db, seed_alerts):
+    seed_alerts(9)
+    full, next_cursor = get_category_risk_page(db)
+    assert next_cursor is None
+
+    categories, cursor = [], None
+    while True:
+        page, cursor = get_category_risk_page(db, limit=2, alerts_limit=2, cursor=cursor)
+        assert len(page) <= 2
+        for category in page:
+            alerts_cursor = category.pop("cat_events_next_cursor", None)
+            while alerts_cursor:
+                (rest,), no_categories_cursor = get_category_risk_page(db, alerts_limit=2, cursor=alerts_cursor)
+                assert no_categories_cursor is None
+                category["cat_events"] += rest["cat_events"]
+                alerts_cursor = rest.get("cat_events_next_cursor")
+        categories += page
+        if not cursor:
+            break
+    assert categories == full
+
+
+def test_filters(db, seed_alerts):
+    seed_alerts(8)
+    full, _ = get_category_risk_page(db, include=["alerts"])
+    by_name = {category["cat_title"]: category for category in full}
+
+    flood, _ = get_category_risk_page(db, include=["alerts"], category="flood")
+    assert flood == [by_name["Flood"]]
+
+    none, _ = get_category_risk_page(db, include=["alerts"], state="CA", severity="HIGH")
+    assert [category["activeCount"] for category in none] == [0] * len(full)
+    assert get_category_risk_page(db, include=["alerts"], state="TX")[0] == full
+
+
+def test_unknown_include_or_field(db):
+    with pytest.raises(ValueError, match="Unknown include"):
+        get_category_risk_page(db, include=["zipcodes"])
+    with pytest.raises(ValueError, match="Unknown field"):
+        get_category_risk_page(db, fields=["zipcode"])
@@ -0,0 +1,54 @@
+from sqlalchemy.orm import sessionmaker
+
+from app.models.common.category import Category
+from app.models.common.events import Event
+from app.services.monitoring import alert_sync_worker
+from app.services.monitoring.alert_category_service import relink_events
+from app.services.monitoring.category_risk_snapshot_service import (
+    get_latest_category_risk_snapshot, schedule_category_risk_snapshot_rebuild
+)
+
+
+def test_relink_leaves_the_rebuild_to_the_worker(db, seed_alerts, monkeypatch):
+    seed_alerts(4)
+    version, _ = get_latest_category_risk_snapshot(db, "affected_areas")
+
+    flood = db.query(Event).filter(Event.name == "Flood").one()
+    flood.name = "Flash Flood"
+    db.flush()
+    relink_events(db, [flood.id])
+    assert get_latest_category_risk_snapshot(db, "affected_areas")[0] == version
+
+    # The worker's session shares the one in-memory connection
+    db.commit()
+    monkeypatch.setattr(alert_sync_worker, "SessionLocal", sessionmaker(bind=db.get_bind(), autoflush=False))
+    schedule_category_risk_snapshot_rebuild().result(timeout=30)
+    rebuilt_version, body = get_latest_category_risk_snapshot(db, "affected_areas")
+    assert rebuilt_version > version
+    assert b'"Flash Flood Warning"' in body
+
+
+def test_category_and_event_edits_schedule_a_rebuild(db, seed_alerts, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api.v1.endpoints.auth import get_current_user
+    from app.api.v1.endpoints.common import category, event
+    from app.db.session import get_db
+    from app.main import app
+
+    seed_alerts(1)
+    db.query(Category).update({"created_by": 1})
+    db.commit()
+    scheduled = []
+    for module in (category, event):
+        monkeypatch.setattr(module, "schedule_category_risk_snapshot_rebuild", lambda: scheduled.append(True))
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: type("User", (), {"id": 1})()
+    try:
+        client = TestClient(app)
+        assert client.put("/api/v1/common/categories/1", json={"name": "Tornadoes"}).status_code == 200
+        assert client.delete("/api/v1/common/categories/2").status_code == 204
+        assert client.delete("/api/v1/common/events/1").status_code == 204
+    finally:
+        app.dependency_overrides.clear()
+    assert len(scheduled) == 3
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.services.monitoring.alert_group_service import (
+    get_category_risk_page, stream_category_risk_json, stream_category_risk_ndjson
+)
+
+OPTIONS = [
+    {},
+    {"include": ["alerts"]},
+    {"include": []},
+    {"include": ["policyholders"]},
+    {"state": "OK", "include": ["alerts", "affected_areas"]},
+    {"severity": "Minor"},
+    {"category": "flood", "include": ["affected_areas"]},
+]
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_stream_matches_the_paged_payload(db, seed_alerts, options):
+    seed_alerts(6)
+    expected = get_category_risk_page(db, **options)[0]
+
+    assert json.loads(b"".join(stream_category_risk_json(db, batch_size=4, **options))) == expected
+
+    categories = []
+    for line in b"".join(stream_category_risk_ndjson(db, batch_size=4, **options)).splitlines():
+        item = json.loads(line)
+        if "cat_event" in item:
+            categories[-1]["cat_events"].append(item["cat_event"])
+        else:
+            categories.append({**item, "cat_events": []} if "cat_events" in expected[0] else item)
+    assert categories == expected
+
+
+def test_stream_endpoint_filters_and_shapes(db, seed_alerts, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api.v1.endpoints import monitoring
+    from app.main import app
+
+    seed_alerts(6)
+    # The stream's own session shares the one in-memory connection
+    db.commit()
+    monkeypatch.setattr(monitoring, "SessionLocal", sessionmaker(bind=db.get_bind(), autoflush=False))
+    client = TestClient(app)
+
+    response = client.get("/api/v1/monitoring/alerts/category-risk-with-zipcodes/stream?format=json&state=TX")
+    assert response.status_code == 200
+    expected = get_category_risk_page(db, state="TX", include=["alerts", "affected_areas"])[0]
+    assert response.json() == expected
+    # Individual policyholders are left out by default, as on the paged endpoint
+    assert '"policyholders"' not in response.text
+
+    response = client.get("/api/v1/monitoring/alerts/category-risk-with-zipcodes/stream?include=zipcodes")
+    assert response.status_code == 400
@@ -0,0 +1,61 @@
+"""
+Compacting stored zipcode rows into zone/county rows and expanding them back
+(scripts/compact_affected_areas.py) must keep the zipcodes every alert targets.
+"""
+import pytest
+
+from app.models.monitoring.alert_affected_area import AlertAffectedArea, RegionType
+from app.services.monitoring.affected_area_service import (
+    get_alerts_zone_zipcode_ids, rebuild_zipcode_zone_county, rewrite_affected_areas
+)
+from conftest import seed_database
+
+pytestmark = pytest.mark.postgres
+
+
+def stored_rows(db):
+    return sorted(
+        db.query(
+            AlertAffectedArea.alert_id, AlertAffectedArea.zone_county_id,
+            AlertAffectedArea.zipcode_id, AlertAffectedArea.region_type,
+        ).all(),
+        key=lambda row: (row[0], row[1], row[2] or 0),
+    )
+
+
+def targeted_zipcodes(db, alert_ids):
+    return {
+        alert_id: {zone: sorted(zipcodes) for zone, zipcodes in zones.items()}
+        for alert_id, zones in get_alerts_zone_zipcode_ids(db, alert_ids).items()
+    }
+
+
+def test_compact_then_expand(pg_db):
+    seed_database(pg_db, 4)
+    rebuild_zipcode_zone_county(pg_db)
+    alert_ids = sorted({row[0] for row in stored_rows(pg_db)})
+
+    # Alert 1 keeps only one of the two zipcodes of TXC113: not a fully alerted zone
+    first_alert_rows = [row for row in stored_rows(pg_db) if row[0] == alert_ids[0]]
+    partial = next(
+        row for row in first_alert_rows if sum(other[1] == row[1] for other in first_alert_rows) == 2
+    )
+    pg_db.query(AlertAffectedArea).filter(
+        AlertAffectedArea.alert_id == partial[0], AlertAffectedArea.zone_county_id == partial[1],
+        AlertAffectedArea.zipcode_id != partial[2],
+    ).delete(synchronize_session=False)
+    before = stored_rows(pg_db)
+    targeted = targeted_zipcodes(pg_db, alert_ids)
+
+    # One alert per batch, so batches start and end inside the id range
+    removed = rewrite_affected_areas(pg_db, batch_size=1)
+    compacted = stored_rows(pg_db)
+    assert removed > 0
+    assert len(compacted) == len(before) - removed
+    zipcode_rows = [row for row in compacted if row[3] == RegionType.ZIPCODE]
+    assert [row[:3] for row in zipcode_rows] == [partial[:3]]
+    assert all(row[2] is None and row[3] == RegionType.COUNTY for row in compacted if row not in zipcode_rows)
+    assert targeted_zipcodes(pg_db, alert_ids) == targeted
+
+    assert rewrite_affected_areas(pg_db, expand=True, batch_size=1) == -removed
+    assert stored_rows(pg_db) == before
@@ -0,0 +1,53 @@
+import random
+
+from app.services.monitoring.alert_category_service import EventNameMatcher
+
+MAPPINGS = [
+    (1, 1, "Tornado Warning"),
+    (1, 2, "Tornado"),
+    (1, 3, "Warning"),
+    (2, 3, "Warning"),
+    (3, 4, "Flash Flood"),
+    (3, 5, "Flood"),
+    (4, 6, "he"),
+    (4, 7, "she"),
+    (4, 8, "hers"),
+    (4, 9, "his"),
+    (5, 10, ""),
+]
+
+
+def substring_links(event_type):
+    """What the former per-name `event_type ILIKE '%name%'` queries matched."""
+    return sorted(
+        (category_id, event_id) for category_id, event_id, name in MAPPINGS
+        if name and name.lower() in (event_type or "").lower()
+    )
+
+
+def test_finds_every_contained_name():
+    matcher = EventNameMatcher(1, MAPPINGS)
+    assert matcher.event_names("Tornado Warning") == {"tornado warning", "tornado", "warning"}
+    assert matcher.event_names("FLASH FLOOD WATCH") == {"flash flood", "flood"}
+    # Overlapping names reached through failure links
+    assert matcher.event_names("ushers") == {"she", "he", "hers"}
+
+
+def test_no_event_type():
+    matcher = EventNameMatcher(1, MAPPINGS)
+    assert matcher.event_names(None) == set()
+    assert matcher.links("") == []
+
+
+def test_links_share_names_across_categories():
+    matcher = EventNameMatcher(1, MAPPINGS)
+    assert sorted(matcher.links("Severe Thunderstorm Warning")) == [(1, 3), (2, 3)]
+
+
+def test_matches_substring_search():
+    matcher = EventNameMatcher(1, MAPPINGS)
+    rng = random.Random(0)
+    alphabet = "TornadoWarningFlashFloodhershis "
+    for _ in range(2000):
+        event_type = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert sorted(matcher.links(event_type)) == substring_links(event_type)
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.common.state import State
+from app.models.monitoring.alert import Alert
+from app.models.monitoring.alert_sync_log import AlertSyncLog, SyncStatus
+from app.services.monitoring import alert_service, alert_sync_worker
+from conftest import alert_feature
+
+
+@pytest.fixture
+def feed(db, monkeypatch):
+    """Serve `feed.body` with `feed.headers` to the streamed fetch and count parsed features."""
+    class Feed:
+        body = b""
+        headers = {}
+        parsed = 0
+
+    parse_features = alert_service._parse_features
+
+    async def counting_parse_features(chunks):
+        async for feature in parse_features(chunks):
+            Feed.parsed += 1
+            yield feature
+
+    async def send_with_retry(url, headers, params=None, stream=False):
+        return httpx.Response(200, headers=Feed.headers, content=Feed.body)
+
+    monkeypatch.setattr(alert_service, "_parse_features", counting_parse_features)
+    monkeypatch.setattr(alert_service, "send_with_retry", send_with_retry)
+    monkeypatch.setattr(alert_service, "_feed_validators", {})
+    monkeypatch.setattr(alert_service, "_pending_validators", {})
+    monkeypatch.setattr(alert_sync_worker, "SessionLocal", sessionmaker(bind=db.get_bind(), autoflush=False))
+    monkeypatch.setattr(settings, "ALERT_FEED_STREAMING", True)
+    monkeypatch.setattr(settings, "ALERT_FETCH_BY_STATE", False)
+    db.add(State(code="TX", fips="48", name="Texas"))
+    db.commit()
+    return Feed
+
+
+def sync(db, feed, body_features, headers):
+    feed.body = json.dumps({"features": body_features}).encode()
+    feed.headers = headers
+    feed.parsed = 0
+    # The worker's session shares the one in-memory connection
+    db.commit()
+    asyncio.run(alert_service.run_weather_alert_sync())
+    return db.query(AlertSyncLog).order_by(AlertSyncLog.id.desc()).first().status
+
+
+def test_unchanged_feed_without_validators_is_not_parsed(db, feed):
+    features = [alert_feature(number) for number in range(1, 4)]
+    assert sync(db, feed, features, {}) == SyncStatus.COMPLETED
+    assert feed.parsed == 3
+
+    assert sync(db, feed, features, {}) == SyncStatus.NOT_MODIFIED
+    assert feed.parsed == 0
+
+    assert sync(db, feed, features + [alert_feature(4)], {}) == SyncStatus.COMPLETED
+    assert feed.parsed == 4
+    assert db.query(Alert).count() == 4
+
+
+def test_unchanged_feed_under_new_etag_is_rolled_back(db, feed):
+    features = [alert_feature(number) for number in range(1, 4)]
+    assert sync(db, feed, features, {"ETag": '"a"'}) == SyncStatus.COMPLETED
+    assert sync(db, feed, features, {"ETag": '"b"'}) == SyncStatus.NOT_MODIFIED
+    assert alert_service._feed_validators[alert_service.ALERTS_FEED_URL]["etag"] == '"b"'
+    assert db.query(Alert).count() == 3
@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.services.monitoring.geometry_targeting import ZipCentroidGrid, geometry_polygons, points_in_ring
+
+SQUARE = [[-97.0, 32.0], [-96.0, 32.0], [-96.0, 33.0], [-97.0, 33.0], [-97.0, 32.0]]
+HOLE = [[-96.6, 32.4], [-96.4, 32.4], [-96.4, 32.6], [-96.6, 32.6], [-96.6, 32.4]]
+
+# (zip, lat, lng)
+CENTROIDS = [
+    ("75001", 32.1, -96.9),  # inside the square
+    ("75002", 32.5, -96.5),  # inside the hole
+    ("75003", 32.9, -96.1),  # inside the square, another grid cell
+    ("73001", 35.4, -97.5),  # outside
+    ("75004", None, -96.5),  # no centroid
+]
+
+
+def test_points_in_ring():
+    lngs = np.array([-96.5, -95.0, -96.5])
+    lats = np.array([32.5, 32.5, 34.0])
+    assert points_in_ring(lngs, lats, np.array(SQUARE)).tolist() == [True, False, False]
+    # Open rings are closed implicitly
+    assert points_in_ring(lngs, lats, np.array(SQUARE[:-1])).tolist() == [True, False, False]
+
+
+def test_geometry_polygons():
+    assert len(geometry_polygons({"type": "Polygon", "coordinates": [SQUARE, HOLE]})) == 1
+    assert len(geometry_polygons({"type": "MultiPolygon", "coordinates": [[SQUARE], [HOLE]]})) == 2
+    assert geometry_polygons({"type": "Point", "coordinates": [-96.5, 32.5]}) == []
+    assert geometry_polygons({"type": "Polygon", "coordinates": [[[-96.5, 32.5]]]}) == []
+    assert geometry_polygons(None) == []
+
+
+def test_zipcodes_in_polygon_with_hole():
+    grid = ZipCentroidGrid(1, CENTROIDS, cell_degrees=0.5)
+    assert len(grid) == 4
+    assert grid.zipcodes_in_geometry({"type": "Polygon", "coordinates": [SQUARE]}) == {"75001", "75002", "75003"}
+    assert grid.zipcodes_in_geometry({"type": "Polygon", "coordinates": [SQUARE, HOLE]}) == {"75001", "75003"}
+
+
+def test_zipcodes_in_multipolygon():
+    grid = ZipCentroidGrid(1, CENTROIDS, cell_degrees=0.5)
+    far = [[-98.0, 35.0], [-97.0, 35.0], [-97.0, 36.0], [-98.0, 36.0]]
+    geometry = {"type": "MultiPolygon", "coordinates": [[HOLE], [far]]}
+    assert grid.zipcodes_in_geometry(geometry) == {"75002", "73001"}
+
+
+def test_grid_matches_brute_force():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(31.0, 34.0, 3000)
+    lngs = rng.uniform(-98.0, -95.0, 3000)
+    rows = [(f"{i:05d}", lat, lng) for i, (lat, lng) in enumerate(zip(lats, lngs))]
+    ring = np.array([[-97.3, 31.6], [-95.8, 32.1], [-96.2, 33.4], [-97.6, 33.0]])
+    expected = {rows[i][0] for i in np.flatnonzero(points_in_ring(lngs, lats, ring))}
+    for cell_degrees in (0.1, 0.25, 1.0):
+        grid = ZipCentroidGrid(1, rows, cell_degrees)
+        assert grid.zipcodes_in_geometry({"type": "Polygon", "coordinates": [ring.tolist()]}) == expected
@@ -0,0 +1,28 @@
+"""
+/alerts/category-risk-with-zipcodes must run at most CATEGORY_RISK_QUERY_BUDGET SQL
+statements whatever the number of alerts, zones, zipcodes and policyholders, as long
+as every lookup fits in one ALERT_LOOKUP_CHUNK_SIZE chunk. Statements are counted by
+the sync_metrics cursor hook.
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.monitoring.alert_group_service import (
+    get_alerts_grouped_by_category_with_zipcodes, CATEGORY_RISK_QUERY_BUDGET
+)
+from app.services.monitoring.sync_metrics import StageTimer, track_sync
+
+@pytest.mark.parametrize("ingest_mode", ["per_alert", "bulk"])
+@pytest.mark.parametrize("alert_count", [4, 40])
+def test_category_risk_within_query_budget(db, seed_alerts, ingest_mode, alert_count):
+    settings.ALERT_INGEST_MODE = ingest_mode
+    settings.ALERT_LOOKUP_CHUNK_SIZE = 100000
+    seed_alerts(alert_count)
+    db.expire_all()
+
+    timer = StageTimer()
+    with track_sync(timer):
+        result = get_alerts_grouped_by_category_with_zipcodes(db)
+
+    assert sum(len(category["cat_events"]) for category in result) == alert_count
+    assert timer.statement_count <= CATEGORY_RISK_QUERY_BUDGET
@@ -0,0 +1,76 @@
+import pytest
+
+from app.core.config import settings
+from app.models.common.nws_zone_county import NwsZoneCounty
+from app.models.common.state import State
+from app.models.common.zipcode_dataset import ZipCodeDataset
+from app.models.common.zipcode2_dataset import ZipCode2Dataset
+from app.services.monitoring.county_zipcode_service import rebuild_county_zipcodes
+from app.services.monitoring.geometry_targeting import refresh_zip_centroid_grid
+from app.services.monitoring.ugc_zipcode_service import get_ugc_zipcode_weights, rebuild_ugc_zipcodes
+from app.services.monitoring.zipcode_backends import (
+    ZIPCODE_BACKENDS, ZipcodeBackend, get_zipcode_backend, parse_geo_point
+)
+from app.services.monitoring.zipcode_index import CountyZipIndex
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class LookupOnlyBackend(ZipcodeBackend):
+        name = "lookup_only"
+
+        def zipcodes_by_fips(self, db, county_fips_codes):
+            return {}
+
+    with pytest.raises(TypeError, match="county_fips_codes"):
+        LookupOnlyBackend()
+
+
+def test_snapshot_of_a_backend():
+    index = CountyZipIndex(
+        ZIPCODE_BACKENDS["zipcode_dataset"], 1,
+        [("48085", "75003"), ("48113", "75001"), ("48113", "75002"), ("48113", "bad")],
+    )
+    assert index.name == "snapshot:zipcode_dataset"
+    assert index.zipcodes_by_fips(None, ["48113", "99999"]) == {"48113": {"75001", "75002"}}
+    assert list(index.county_zipcodes(None)) == [("48085", "75003"), ("48113", "75001"), ("48113", "75002")]
+    assert index.county_fips_codes(None) == ["48085", "48113"]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown zipcode backend"):
+        get_zipcode_backend("zipcode3_dataset")
+
+
+def test_parse_geo_point():
+    assert parse_geo_point("32.95, -96.83") == (32.95, -96.83)
+    assert parse_geo_point(None) == (None, None)
+    assert parse_geo_point("32.95") == (None, None)
+
+
+@pytest.mark.parametrize("backend", ["zipcode_dataset", "zipcode2_dataset"])
+def test_zones_and_polygons_follow_the_backend(db, monkeypatch, backend):
+    """County and zone UGCs and polygon centroids resolve against the selected table only;
+    each table knows a zip code the other does not."""
+    monkeypatch.setattr(settings, "ZIPCODE_BACKEND", backend)
+    monkeypatch.setattr(settings, "ALERT_GEOMETRY_TARGETING", True)
+    db.add(State(code="TX", fips="48", name="Texas"))
+    db.add(NwsZoneCounty(ugc_code="TXZ119", state_code="TX", county_fips="48113"))
+    db.add(ZipCodeDataset(
+        zip="75001", county_fips="48113", lat=32.9, lng=-96.8,
+        county_fips_all="48113", county_weights={"48113": 100},
+    ))
+    db.add(ZipCode2Dataset(zip_code="75002", primary_county_code="48113", geo_point="32.9, -96.8"))
+    db.commit()
+    rebuild_county_zipcodes(db)
+
+    rebuild_ugc_zipcodes(db)
+    expected = {"75001"} if backend == "zipcode_dataset" else {"75002"}
+    weights = get_ugc_zipcode_weights(db, ["TXC113", "TXZ119"])
+    assert {ugc_code: set(zipcodes) for ugc_code, zipcodes in weights.items()} == {
+        "TXC113": expected, "TXZ119": expected,
+    }
+
+    grid = refresh_zip_centroid_grid(db)
+    square = [[-97.0, 32.0], [-96.0, 32.0], [-96.0, 33.0], [-97.0, 33.0]]
+    assert grid.source is get_zipcode_backend()
+    assert grid.zipcodes_in_geometry({"type": "Polygon", "coordinates": [square]}) == expected
@@ -0,0 +1,72 @@
+"""
+zipcode_exposure is maintained by the statement-level triggers of migration
+20261018009 on PostgreSQL: after any insert, update, soft delete or delete of
+policyholders it must hold the totals of the active policyholders of every zipcode.
+"""
+import pytest
+from sqlalchemy import func
+
+from app.models.common.policyholders import Policyholder
+from app.models.common.zipcode_exposure import ZipcodeExposure
+from conftest import seed_database
+
+pytestmark = pytest.mark.postgres
+
+
+def exposure_totals(db):
+    """Non-zero totals; premiums summed through deltas may be off by float rounding."""
+    return {
+        zipcode_id: (count, round(premium, 2), claims)
+        for zipcode_id, count, premium, claims in db.query(
+            ZipcodeExposure.zipcode_id, ZipcodeExposure.policyholder_count,
+            ZipcodeExposure.total_premium, ZipcodeExposure.total_claims,
+        ).all()
+        if count or round(premium, 2) or claims
+    }
+
+
+def policyholder_totals(db):
+    return {
+        zipcode_id: (count, round(premium, 2), claims)
+        for zipcode_id, count, premium, claims in db.query(
+            Policyholder.zipcode_id, func.count(), func.sum(Policyholder.premium), func.sum(Policyholder.claims),
+        ).filter(Policyholder.status.is_(True)).group_by(Policyholder.zipcode_id).all()
+    }
+
+
+def test_inserts_are_summed_per_zipcode(pg_db):
+    seed_database(pg_db, 4)
+    assert len(exposure_totals(pg_db)) == 3
+    assert exposure_totals(pg_db) == policyholder_totals(pg_db)
+
+
+def test_updates_and_deletes_apply_deltas(pg_db):
+    seed_database(pg_db, 4)
+    holders = pg_db.query(Policyholder).order_by(Policyholder.id).all()
+
+    # One multi-row statement across zipcodes
+    pg_db.query(Policyholder).update({Policyholder.premium: Policyholder.premium + 100}, synchronize_session=False)
+    assert exposure_totals(pg_db) == policyholder_totals(pg_db)
+
+    # Updates that leave the totals unchanged write nothing
+    before = dict(pg_db.query(ZipcodeExposure.zipcode_id, ZipcodeExposure.updated_at).all())
+    pg_db.query(Policyholder).update({Policyholder.name: "Renamed"}, synchronize_session=False)
+    assert dict(pg_db.query(ZipcodeExposure.zipcode_id, ZipcodeExposure.updated_at).all()) == before
+
+    # Soft delete, restore, then hard delete of an inactive and an active row
+    pg_db.query(Policyholder).filter(Policyholder.id == holders[0].id).update(
+        {Policyholder.status: False}, synchronize_session=False
+    )
+    assert exposure_totals(pg_db) == policyholder_totals(pg_db)
+    pg_db.query(Policyholder).filter(Policyholder.id.in_([holders[0].id, holders[1].id])).delete(
+        synchronize_session=False
+    )
+    assert exposure_totals(pg_db) == policyholder_totals(pg_db)
+
+    # Deactivating every policyholder of a zipcode leaves no exposure
+    zipcode_id = holders[2].zipcode_id
+    pg_db.query(Policyholder).filter(Policyholder.zipcode_id == zipcode_id).update(
+        {Policyholder.status: False}, synchronize_session=False
+    )
+    assert zipcode_id not in exposure_totals(pg_db)
+    assert exposure_totals(pg_db) == policyholder_totals(pg_db)